@@ -1,4 +1,5 @@
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
@@ -21,8 +22,16 @@ def create_app(config_name='development'):
     """Application factory pattern"""
     app = Flask(__name__)
     
+    from app.utils.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    
     # Load configuration
     app.config.from_object(config[config_name])
+    
+    # Behind a reverse proxy, take the client address and scheme from its forwarded headers
+    if app.config['TRUSTED_PROXIES']:
+        proxies = app.config['TRUSTED_PROXIES']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
 
     print("USING DB:", app.config.get("SQLALCHEMY_DATABASE_URI"))
 
@@ -31,6 +40,36 @@ def create_app(config_name='development'):
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    
+    from app.utils.number_allocator import tracking_numbers, quote_numbers
+    tracking_numbers.init_app(app)
+    quote_numbers.init_app(app)
+    
+    from app.utils.password_hasher import password_hasher
+    password_hasher.init_app(app)
+    
+    from app.utils.email_domains import email_domains
+    email_domains.init_app(app)
+    
+    from app.utils.rate_limit import login_limiter
+    login_limiter.init_app(app)
+    
+    from app.utils.auth_state import auth_states
+    auth_states.init_app(app)
+    
+    from app.utils.cache import tracking_cache, quote_cache
+    tracking_cache.init_app(app)
+    quote_cache.init_app(app)
+    
+    from app.utils.quote_writer import quote_writer
+    quote_writer.init_app(app)
+    
+    from app.utils.notifications import notification_dispatcher
+    notification_dispatcher.init_app(app)
+    
+    from app.utils.compression import compression
+    compression.init_app(app)
+    
     # CORS - Allow all origins for development
     CORS(app, 
          resources={r"/api/*": {"origins": "*"}},
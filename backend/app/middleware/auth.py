@@ -1,20 +1,58 @@
 from functools import wraps
-from flask import jsonify
+from flask import jsonify, g
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
+from werkzeug.local import LocalProxy
+from app import db
 from app.models.user import User
+from app.utils.auth_state import auth_states
+
+
+def _lazy_user(user_id):
+    """Proxy that loads the User row only if the view actually touches it"""
+    def load():
+        if 'current_user' not in g:
+            g.current_user = db.session.get(User, user_id)
+        return g.current_user
+    return LocalProxy(load)
+
+
+def _authorize(roles=None):
+    """
+    Check the request's access token against the user's current auth state
+
+    Returns (current_user, None) on success or (None, error response).
+    Tokens carrying role/auth_version claims are checked against the cached
+    AuthState; older tokens fall back to loading the user.
+    """
+    verify_jwt_in_request()
+    current_user_id = get_jwt_identity()
+    claims = get_jwt()
+    
+    if 'av' not in claims:
+        current_user = User.query.get(current_user_id)
+        if not current_user or not current_user.is_active:
+            return None, (jsonify({'error': 'User not found or inactive'}), 401)
+        if roles and current_user.role not in roles:
+            return None, (jsonify({'error': 'Admin access required'}), 403)
+        return current_user, None
+    
+    state = auth_states.get(current_user_id)
+    if not state or not state.is_active:
+        return None, (jsonify({'error': 'User not found or inactive'}), 401)
+    if state.auth_version != claims['av']:
+        return None, (jsonify({'error': 'Session expired, please log in again'}), 401)
+    if roles and claims.get('role') not in roles:
+        return None, (jsonify({'error': 'Admin access required'}), 403)
+    return _lazy_user(current_user_id), None
 
 
 def jwt_required_custom(fn):
     """Custom JWT required decorator with user loading"""
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
-        
-        if not current_user or not current_user.is_active:
-            return jsonify({'error': 'User not found or inactive'}), 401
-        
+        current_user, error = _authorize()
+        if error:
+            return error
         return fn(current_user=current_user, *args, **kwargs)
     return wrapper
 
@@ -23,16 +61,9 @@ def admin_required(fn):
     """Decorator to require admin role"""
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
-        
-        if not current_user or not current_user.is_active:
-            return jsonify({'error': 'User not found or inactive'}), 401
-        
-        if current_user.role not in ['admin', 'staff']:
-            return jsonify({'error': 'Admin access required'}), 403
-        
+        current_user, error = _authorize(roles=['admin', 'staff'])
+        if error:
+            return error
         return fn(current_user=current_user, *args, **kwargs)
     return wrapper
 
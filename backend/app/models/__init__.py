@@ -1,17 +1,25 @@
 from app.models.user import User
 from app.models.shipping_method import ShippingMethod
+from app.models.rate_tier import RateTier
 from app.models.shipment import Shipment
 from app.models.tracking_event import TrackingEvent
 from app.models.quote import Quote
 from app.models.warehouse import Warehouse
+from app.models.warehouse_shipping_type import WarehouseShippingType
 from app.models.address import Address
+from app.models.catalog_version import CatalogVersion
+from app.models.notification import Notification
 
 __all__ = [
     'User',
     'ShippingMethod',
+    'RateTier',
     'Shipment',
     'TrackingEvent',
     'Quote',
     'Warehouse',
-    'Address'
+    'WarehouseShippingType',
+    'Address',
+    'CatalogVersion',
+    'Notification'
 ]
@@ -0,0 +1,13 @@
+from app import db
+from datetime import datetime
+
+
+class CatalogVersion(db.Model):
+    __tablename__ = 'catalog_versions'
+
+    name = db.Column(db.String(50), primary_key=True)  # 'shipping_methods', ...
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<CatalogVersion {self.name} v{self.version}>'
@@ -0,0 +1,47 @@
+from app import db
+from datetime import datetime
+
+
+class Notification(db.Model):
+    """Outbox row for an email or SMS, delivered by the background dispatcher"""
+    __tablename__ = 'notifications'
+    __table_args__ = (
+        # Dispatcher claim: due rows by status
+        db.Index('ix_notifications_status_next_attempt_at', 'status', 'next_attempt_at'),
+        # At most one undelivered row per coalescing key; later messages update it
+        db.Index('uq_notifications_pending_coalesce_key', 'coalesce_key', unique=True,
+                 postgresql_where=db.text("status = 'pending'")),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    channel = db.Column(db.String(10), nullable=False)  # 'email', 'sms'
+    recipient = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255))
+    body = db.Column(db.Text, nullable=False)
+    coalesce_key = db.Column(db.String(255))  # e.g. 'tracking:<tracking number>:email:<sha256 of recipient>'
+    
+    status = db.Column(db.String(20), nullable=False, default='pending')  # 'pending', 'sending', 'sent', 'failed', 'superseded'
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        """Convert notification to dictionary"""
+        return {
+            'id': self.id,
+            'channel': self.channel,
+            'recipient': self.recipient,
+            'subject': self.subject,
+            'coalesce_key': self.coalesce_key,
+            'status': self.status,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
+        }
+    
+    def __repr__(self):
+        return f'<Notification {self.channel} to {self.recipient} ({self.status})>'
@@ -0,0 +1,89 @@
+from sqlalchemy.orm import selectinload, raiseload, load_only
+from app.models.shipment import Shipment, SERIALIZERS as SHIPMENT_FIELDS
+from app.models.quote import Quote
+from app.models.warehouse import Warehouse, SERIALIZERS as WAREHOUSE_FIELDS
+from app.utils.schemas import ValidationError
+
+
+# Named eager-loading profiles. Each profile loads everything the matching
+# serializer touches and raises on any other relationship access, so a
+# missing option shows up as an error instead of a silent N+1.
+# Shipping methods come from the in-process catalog, not a relationship.
+PROFILES = {
+    Shipment: {
+        'list': lambda: [raiseload('*')],
+        'detail': lambda: [selectinload(Shipment.tracking_events), raiseload('*')],
+        'tracking': lambda: [selectinload(Shipment.tracking_events), raiseload('*')]
+    },
+    Quote: {
+        'list': lambda: [raiseload('*')],
+        'detail': lambda: [raiseload('*')]
+    }
+}
+
+
+# Sparse fieldsets: the fields ?fields= may name per model, and what each one
+# reads when it is not the column of the same name - another column, or a
+# relationship to eager-load. An empty tuple reads nothing from the row.
+FIELDSETS = {
+    Shipment: {
+        'allowed': SHIPMENT_FIELDS,
+        'columns': {'shipping_method': ('shipping_method_id',), 'tracking_events': ()},
+        'relationships': {'tracking_events': lambda: selectinload(Shipment.tracking_events)}
+    },
+    Warehouse: {
+        'allowed': WAREHOUSE_FIELDS,
+        'columns': {'shipping_method_types': ()},
+        'relationships': {'shipping_method_types': lambda: selectinload(Warehouse.shipping_types)}
+    }
+}
+
+
+def query_profile(model, profile):
+    """Return model.query with the loader options of a named profile applied"""
+    try:
+        options = PROFILES[model][profile]()
+    except KeyError:
+        raise ValueError(f"Unknown loading profile '{profile}' for {model.__name__}")
+    return model.query.options(*options)
+
+
+def parse_fields(model, value):
+    """
+    Parse a comma-separated ?fields= value against the model's allow-list
+
+    Returns a sorted tuple of field names, or None when no fields were asked
+    for. Raises ValidationError naming the unknown fields.
+    """
+    fields = {field.strip() for field in (value or '').split(',') if field.strip()}
+    if not fields:
+        return None
+    allowed = FIELDSETS[model]['allowed']
+    unknown = sorted(fields.difference(allowed))
+    if unknown:
+        raise ValidationError({'fields': f"contains unknown names: {', '.join(unknown)} "
+                                         f"(allowed: {', '.join(allowed)})"})
+    return tuple(sorted(fields))
+
+
+def fieldset_options(model, fields, required=()):
+    """
+    Loader options that fetch only what the given serialized fields read
+
+    The primary key and any required columns (such as the ones keyset
+    pagination orders by) are always loaded. Relationships are loaded only
+    when a field needs them; touching anything else raises.
+    """
+    fieldset = FIELDSETS[model]
+    columns = {'id', *required}
+    options = []
+    for field in fields:
+        columns.update(fieldset['columns'].get(field, (field,)))
+        if field in fieldset['relationships']:
+            options.append(fieldset['relationships'][field]())
+    return [load_only(*(getattr(model, column) for column in sorted(columns))), *options, raiseload('*')]
+
+
+def query_fields(model, fields, required=()):
+    """Return model.query loading only the columns behind a sparse fieldset"""
+    return model.query.options(*fieldset_options(model, fields, required))
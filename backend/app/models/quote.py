@@ -1,7 +1,8 @@
 from app import db
+from app.utils.number_allocator import quote_numbers
+from app.utils import pricing
+from app.utils.catalog import shipping_methods
 from datetime import datetime, timedelta
-import secrets
-import string
 
 
 class Quote(db.Model):
@@ -25,57 +26,32 @@ class Quote(db.Model):
     status = db.Column(db.String(20), default='draft')  # 'draft', 'sent', 'accepted', 'expired'
     valid_until = db.Column(db.Date)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-
-   
+    
+    __table_args__ = (
+        # Expiry sweep: open quotes by validity date
+        db.Index('ix_quotes_status_valid_until', 'status', 'valid_until'),
+    )
     
     @staticmethod
     def generate_quote_number():
         """Generate unique quote number"""
-        prefix = 'QT'
-        random_chars = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(8))
-        return f"{prefix}{random_chars}"
+        return quote_numbers.allocate()
     
     def calculate_chargeable_weight(self):
         """Calculate chargeable weight (higher of actual or volumetric)"""
-        if self.actual_weight and self.volume_cbm:
-            volumetric_weight = float(self.volume_cbm) * 166  # CBM to kg conversion
-            self.chargeable_weight = max(float(self.actual_weight), volumetric_weight)
-        elif self.actual_weight:
-            self.chargeable_weight = float(self.actual_weight)
+        self.chargeable_weight = pricing.chargeable_weight(self.actual_weight, self.volume_cbm)
         return self.chargeable_weight
     
     def calculate_total_cost(self):
-        """Calculate total cost based on shipping method rate"""
-        print(f"DEBUG - chargeable_weight: {self.chargeable_weight}")
-        print(f"DEBUG - rate: {self.rate}")
-        print(f"DEBUG - volume_cbm: {self.volume_cbm}")
-        
-        if self.chargeable_weight and self.rate:
-            # Get shipping method from relationship or database
-            shipping_method = self.shipping_method
-            if not shipping_method and self.shipping_method_id:
-                from app.models.shipping_method import ShippingMethod
-                shipping_method = ShippingMethod.query.get(self.shipping_method_id)
-            
-            print(f"DEBUG - shipping_method: {shipping_method}")
-            print(f"DEBUG - rate_type: {shipping_method.rate_type if shipping_method else 'None'}")
-            
-            if shipping_method:
-                if shipping_method.rate_type == 'per_kg':
-                    self.total_cost = float(self.chargeable_weight) * float(self.rate)
-                    print(f"DEBUG - Calculated per_kg: {self.total_cost}")
-                elif shipping_method.rate_type == 'per_cbm' and self.volume_cbm:
-                    self.total_cost = float(self.volume_cbm) * float(self.rate)
-                    print(f"DEBUG - Calculated per_cbm: {self.total_cost}")
-            else:
-                # Default to per_kg if shipping method not found
-                self.total_cost = float(self.chargeable_weight) * float(self.rate)
-                print(f"DEBUG - Calculated default: {self.total_cost}")
+        """Calculate total cost from the shipping method's rate table"""
+        shipping_method = shipping_methods.get(self.shipping_method_id)
+        if shipping_method:
+            result = shipping_method.rate_table.price(self.actual_weight, self.volume_cbm)
+            self.rate = result.rate
         else:
-            print(f"DEBUG - Condition failed: chargeable_weight={self.chargeable_weight}, rate={self.rate}")
-        
-        print(f"DEBUG - Final total_cost: {self.total_cost}")
+            # Default to per_kg at the quote's own rate if shipping method not found
+            result = pricing.RateTable('per_kg', self.rate).price(self.actual_weight, self.volume_cbm)
+        self.total_cost = result.total_cost
         return self.total_cost
     
     def set_validity(self, days=30):
@@ -96,7 +72,7 @@ class Quote(db.Model):
             'status': self.status,
             'valid_until': self.valid_until.isoformat() if self.valid_until else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'shipping_method': self.shipping_method.to_dict() if self.shipping_method else None
+            'shipping_method': shipping_methods.get_dict(self.shipping_method_id)
         }
     
     def __repr__(self):
@@ -0,0 +1,28 @@
+from app import db
+from datetime import datetime
+
+
+class RateTier(db.Model):
+    """A weight or volume break for a shipping method's rate"""
+    __tablename__ = 'rate_tiers'
+    __table_args__ = (
+        db.UniqueConstraint('shipping_method_id', 'min_quantity', name='uq_rate_tiers_method_min_quantity'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    shipping_method_id = db.Column(db.Integer, db.ForeignKey('shipping_methods.id', ondelete='CASCADE'),
+                                   nullable=False, index=True)
+    # Lower bound (inclusive) in the method's rate unit: kg for 'per_kg', CBM for 'per_cbm'
+    min_quantity = db.Column(db.Numeric(12, 3), nullable=False)
+    rate = db.Column(db.Numeric(10, 2), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        """Convert rate tier to dictionary"""
+        return {
+            'min_quantity': float(self.min_quantity),
+            'rate': float(self.rate)
+        }
+    
+    def __repr__(self):
+        return f'<RateTier {self.shipping_method_id} from {self.min_quantity}>'
@@ -1,11 +1,16 @@
 from app import db
+from app.utils.number_allocator import tracking_numbers
+from app.utils.catalog import shipping_methods
+from app.utils import pricing
 from datetime import datetime
-import secrets
-import string
 
 
 class Shipment(db.Model):
     __tablename__ = 'shipments'
+    __table_args__ = (
+        # Supports keyset pagination ordered by (created_at, id)
+        db.Index('ix_shipments_created_at_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     tracking_number = db.Column(db.String(50), unique=True, nullable=False, index=True)
@@ -31,64 +36,72 @@ class Shipment(db.Model):
     destination = db.Column(db.String(255))
     
     # Dates
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Never NULL: keyset pagination and its cursors order by (created_at, id)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow,
+                           server_default=db.text("(now() at time zone 'utc')"))
     estimated_delivery = db.Column(db.Date)
     actual_delivery = db.Column(db.Date)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    tracking_events = db.relationship('TrackingEvent', backref='shipment', lazy='dynamic', 
+    tracking_events = db.relationship('TrackingEvent', backref='shipment', lazy='select',
                                      cascade='all, delete-orphan', order_by='TrackingEvent.event_time')
     
     @staticmethod
     def generate_tracking_number():
         """Generate unique tracking number"""
-        prefix = 'RD'
-        random_digits = ''.join(secrets.choice(string.digits) for _ in range(7))
-        return f"{prefix}{random_digits}"
+        return tracking_numbers.allocate()
     
     def calculate_chargeable_weight(self):
         """Calculate chargeable weight (higher of actual or volumetric)"""
-        if self.actual_weight and self.volume_cbm:
-            volumetric_weight = float(self.volume_cbm) * 166  # CBM to kg conversion
-            self.chargeable_weight = max(float(self.actual_weight), volumetric_weight)
-        elif self.actual_weight:
-            self.chargeable_weight = float(self.actual_weight)
+        self.chargeable_weight = pricing.chargeable_weight(self.actual_weight, self.volume_cbm)
         return self.chargeable_weight
     
     def calculate_total_cost(self):
-        """Calculate total cost based on rate and chargeable weight"""
-        if self.chargeable_weight and self.rate:
-            self.total_cost = float(self.chargeable_weight) * float(self.rate)
+        """Calculate total cost at the shipment's own rate, or from the shipping method's rate table"""
+        if self.rate:
+            result = pricing.RateTable('per_kg', self.rate).price(self.actual_weight, self.volume_cbm)
+        else:
+            shipping_method = shipping_methods.get(self.shipping_method_id)
+            if not shipping_method:
+                return self.total_cost
+            result = shipping_method.rate_table.price(self.actual_weight, self.volume_cbm)
+            self.rate = result.rate
+        if result.total_cost is not None:
+            self.total_cost = result.total_cost
         return self.total_cost
     
-    def to_dict(self, include_events=True):
-        """Convert shipment to dictionary"""
-        data = {
-            'id': self.id,
-            'tracking_number': self.tracking_number,
-            'consignment_number': self.consignment_number,
-            'description': self.description,
-            'cartons': self.cartons,
-            'actual_weight': float(self.actual_weight) if self.actual_weight else None,
-            'volume_cbm': float(self.volume_cbm) if self.volume_cbm else None,
-            'chargeable_weight': float(self.chargeable_weight) if self.chargeable_weight else None,
-            'rate': float(self.rate) if self.rate else None,
-            'total_cost': float(self.total_cost) if self.total_cost else None,
-            'currency': self.currency,
-            'current_status': self.current_status,
-            'origin': self.origin,
-            'destination': self.destination,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'estimated_delivery': self.estimated_delivery.isoformat() if self.estimated_delivery else None,
-            'actual_delivery': self.actual_delivery.isoformat() if self.actual_delivery else None,
-            'shipping_method': self.shipping_method.to_dict() if self.shipping_method else None
-        }
-        
-        if include_events:
-            data['tracking_events'] = [event.to_dict() for event in self.tracking_events.all()]
-        
-        return data
+    def to_dict(self, include_events=True, fields=None):
+        """Convert shipment to dictionary; fields limits it to the named keys of SERIALIZERS"""
+        if fields is None:
+            fields = DETAIL_FIELDS if include_events else LIST_FIELDS
+        return {field: SERIALIZERS[field](self) for field in fields}
     
     def __repr__(self):
         return f'<Shipment {self.tracking_number}>'
+
+
+# Serialized field -> value. Also the allow-list for ?fields= sparse fieldsets.
+SERIALIZERS = {
+    'id': lambda s: s.id,
+    'tracking_number': lambda s: s.tracking_number,
+    'consignment_number': lambda s: s.consignment_number,
+    'description': lambda s: s.description,
+    'cartons': lambda s: s.cartons,
+    'actual_weight': lambda s: float(s.actual_weight) if s.actual_weight else None,
+    'volume_cbm': lambda s: float(s.volume_cbm) if s.volume_cbm else None,
+    'chargeable_weight': lambda s: float(s.chargeable_weight) if s.chargeable_weight else None,
+    'rate': lambda s: float(s.rate) if s.rate else None,
+    'total_cost': lambda s: float(s.total_cost) if s.total_cost else None,
+    'currency': lambda s: s.currency,
+    'current_status': lambda s: s.current_status,
+    'origin': lambda s: s.origin,
+    'destination': lambda s: s.destination,
+    'created_at': lambda s: s.created_at.isoformat() if s.created_at else None,
+    'estimated_delivery': lambda s: s.estimated_delivery.isoformat() if s.estimated_delivery else None,
+    'actual_delivery': lambda s: s.actual_delivery.isoformat() if s.actual_delivery else None,
+    'shipping_method': lambda s: shipping_methods.get_dict(s.shipping_method_id),
+    'tracking_events': lambda s: [event.to_dict() for event in s.tracking_events]
+}
+DETAIL_FIELDS = tuple(SERIALIZERS)
+LIST_FIELDS = tuple(field for field in SERIALIZERS if field != 'tracking_events')
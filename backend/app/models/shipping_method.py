@@ -10,7 +10,9 @@ class ShippingMethod(db.Model):
     type = db.Column(db.String(20), nullable=False)  # 'air', 'sea'
     origin = db.Column(db.String(100))
     rate_type = db.Column(db.String(20))  # 'per_kg', 'per_cbm'
-    base_rate = db.Column(db.Numeric(10, 2))
+    base_rate = db.Column(db.Numeric(10, 2))  # rate below the first tier, or for every quantity without tiers
+    minimum_charge = db.Column(db.Numeric(10, 2))
+    surcharge_percent = db.Column(db.Numeric(5, 2))  # e.g. fuel surcharge, applied after the minimum
     currency = db.Column(db.String(10), default='USD')
     transit_days_min = db.Column(db.Integer)
     transit_days_max = db.Column(db.Integer)
@@ -22,6 +24,8 @@ class ShippingMethod(db.Model):
     # Relationships
     shipments = db.relationship('Shipment', backref='shipping_method', lazy='dynamic')
     quotes = db.relationship('Quote', backref='shipping_method', lazy='dynamic')
+    rate_tiers = db.relationship('RateTier', backref='shipping_method', lazy='select',
+                                 cascade='all, delete-orphan', order_by='RateTier.min_quantity')
     
     def to_dict(self):
         """Convert shipping method to dictionary"""
@@ -32,6 +36,9 @@ class ShippingMethod(db.Model):
             'origin': self.origin,
             'rate_type': self.rate_type,
             'base_rate': float(self.base_rate) if self.base_rate else None,
+            'minimum_charge': float(self.minimum_charge) if self.minimum_charge else None,
+            'surcharge_percent': float(self.surcharge_percent) if self.surcharge_percent else None,
+            'rate_tiers': [tier.to_dict() for tier in self.rate_tiers],
             'currency': self.currency,
             'transit_days': f"{self.transit_days_min}-{self.transit_days_max} days" if self.transit_days_min and self.transit_days_max else None,
             'transit_days_min': self.transit_days_min,
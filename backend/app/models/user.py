@@ -1,6 +1,6 @@
 from app import db
+from app.utils.password_hasher import password_hasher
 from datetime import datetime
-import bcrypt
 
 
 class User(db.Model):
@@ -13,6 +13,7 @@ class User(db.Model):
     phone = db.Column(db.String(20))
     role = db.Column(db.String(20), default='customer')  # 'customer', 'admin', 'staff'
     is_active = db.Column(db.Boolean, default=True)
+    auth_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # bumped on role/active/password change
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -23,11 +24,24 @@ class User(db.Model):
     
     def set_password(self, password):
         """Hash and set password"""
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
         """Check if password matches"""
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return password_hasher.verify(password, self.password_hash)
+    
+    def rehash_password(self, password):
+        """Re-hash the current password at the configured cost; unlike set_password, existing sessions stay valid"""
+        self.password_hash = password_hasher.hash(password)
+        self._password_rehashed = True
+    
+    def password_needs_rehash(self):
+        """Check if the stored hash uses an outdated bcrypt cost"""
+        return password_hasher.needs_rehash(self.password_hash)
+    
+    def token_claims(self):
+        """Claims embedded in access tokens so requests can be authorized without a user query"""
+        return {'role': self.role, 'av': self.auth_version or 0}
     
     def to_dict(self, include_sensitive=False):
         """Convert user to dictionary"""
@@ -1,4 +1,6 @@
 from app import db
+from app.models.warehouse_shipping_type import WarehouseShippingType
+from sqlalchemy.orm import validates
 from datetime import datetime
 
 
@@ -8,47 +10,69 @@ class Warehouse(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
     type = db.Column(db.String(50))  # 'warehouse', 'office', 'pickup_point'
-    country = db.Column(db.String(100))
+    country = db.Column(db.String(100), index=True)
     address_en = db.Column(db.Text)
     address_cn = db.Column(db.Text)
     phone_1 = db.Column(db.String(20))
     phone_2 = db.Column(db.String(20))
     email = db.Column(db.String(255))
+    latitude = db.Column(db.Numeric(9, 6))
+    longitude = db.Column(db.Numeric(9, 6))
     
-    # Associations - stored as comma-separated values
+    # Associations - the shipping_types rows are authoritative and indexed for
+    # filtering; the comma-separated copy is kept in sync for older readers
     shipping_method_types = db.Column(db.String(100))  # 'air,sea'
+    shipping_types = db.relationship('WarehouseShippingType', lazy='select', cascade='all, delete-orphan',
+                                     order_by='WarehouseShippingType.shipping_type')
     
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    @staticmethod
+    def parse_shipping_types(value):
+        """Split a comma-separated shipping type string into a list of unique types"""
+        types = []
+        for shipping_type in (value or '').split(','):
+            shipping_type = shipping_type.strip()
+            if shipping_type and shipping_type not in types:
+                types.append(shipping_type)
+        return types
+    
+    @validates('shipping_method_types')
+    def _sync_shipping_types(self, key, value):
+        types = self.parse_shipping_types(value)
+        self.shipping_types = [WarehouseShippingType(shipping_type=t) for t in types]
+        return ','.join(types) or None
+    
     def get_shipping_types(self):
         """Get shipping types as list"""
-        if self.shipping_method_types:
-            return self.shipping_method_types.split(',')
-        return []
+        return [link.shipping_type for link in self.shipping_types]
     
     def set_shipping_types(self, types_list):
         """Set shipping types from list"""
-        if types_list:
-            self.shipping_method_types = ','.join(types_list)
-        else:
-            self.shipping_method_types = None
-    
-    def to_dict(self):
-        """Convert warehouse to dictionary"""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'type': self.type,
-            'country': self.country,
-            'address_en': self.address_en,
-            'address_cn': self.address_cn,
-            'phone_1': self.phone_1,
-            'phone_2': self.phone_2,
-            'email': self.email,
-            'shipping_method_types': self.get_shipping_types(),
-            'is_active': self.is_active
-        }
+        self.shipping_method_types = ','.join(types_list) if types_list else None
+    
+    def to_dict(self, fields=None):
+        """Convert warehouse to dictionary; fields limits it to the named keys of SERIALIZERS"""
+        return {field: SERIALIZERS[field](self) for field in (fields or SERIALIZERS)}
     
     def __repr__(self):
         return f'<Warehouse {self.name}>'
+
+
+# Serialized field -> value. Also the allow-list for ?fields= sparse fieldsets.
+SERIALIZERS = {
+    'id': lambda w: w.id,
+    'name': lambda w: w.name,
+    'type': lambda w: w.type,
+    'country': lambda w: w.country,
+    'address_en': lambda w: w.address_en,
+    'address_cn': lambda w: w.address_cn,
+    'phone_1': lambda w: w.phone_1,
+    'phone_2': lambda w: w.phone_2,
+    'email': lambda w: w.email,
+    'latitude': lambda w: float(w.latitude) if w.latitude is not None else None,
+    'longitude': lambda w: float(w.longitude) if w.longitude is not None else None,
+    'shipping_method_types': lambda w: w.get_shipping_types(),
+    'is_active': lambda w: w.is_active
+}
@@ -0,0 +1,16 @@
+from app import db
+
+
+class WarehouseShippingType(db.Model):
+    """A shipping type ('air', 'sea', ...) handled by a warehouse"""
+    __tablename__ = 'warehouse_shipping_types'
+    __table_args__ = (
+        # Directory filter: warehouses by shipping type
+        db.Index('ix_warehouse_shipping_types_type_warehouse', 'shipping_type', 'warehouse_id'),
+    )
+    
+    warehouse_id = db.Column(db.Integer, db.ForeignKey('warehouses.id', ondelete='CASCADE'), primary_key=True)
+    shipping_type = db.Column(db.String(20), primary_key=True)
+    
+    def __repr__(self):
+        return f'<WarehouseShippingType {self.warehouse_id} {self.shipping_type}>'
@@ -1,57 +1,125 @@
-from flask import Blueprint, request, jsonify
+from datetime import datetime, date
+from flask import Blueprint, request, jsonify, current_app, stream_with_context
+from sqlalchemy import insert, update, select, or_
 from app import db
 from app.models.shipment import Shipment
 from app.models.tracking_event import TrackingEvent
+from app.models.user import User
+from app.models.profiles import query_profile, query_fields, parse_fields
 from app.middleware.auth import admin_required
+from app.utils.cache import tracking_cache, quote_cache
+from app.utils.quote_writer import quote_writer
+from app.utils.password_hasher import password_hasher
+from app.utils.auth_state import auth_states
+from app.utils.rate_limit import login_limiter
+from app.utils.notifications import notification_dispatcher
+from app.utils.email_domains import email_domains
+from app.utils.compression import compression
+from app.utils.notifications import enqueue_coalesced
+from app.utils.email import send_tracking_update_email, tracking_update_email
+from app.utils.sms import send_tracking_update_sms, tracking_update_sms
+from app.utils.pricing import InvalidAmount
+from app.utils.schemas import (Schema, String, Integer, Boolean, List, Nested, use_schema,
+                               ValidationError, validation_error_response)
+from app.utils.pagination import keyset_page, estimated_row_count, InvalidCursor
+from app.utils.shipment_import import ShipmentSchema, import_shipments
+from app.utils.shipment_export import export_query, iter_shipments, generate_csv, generate_ndjson
 
 admin_bp = Blueprint('admin', __name__)
 
+
+class TrackingEventSchema(Schema):
+    event_type = String(max_length=50)
+    location = String(max_length=255)
+    description = String()
+    is_current = Boolean(default=False)
+
+
+class StatusUpdateSchema(TrackingEventSchema):
+    status = String(max_length=50)
+
+
+class BulkStatusSchema(Schema):
+    shipment_ids = List(Integer(), default=())
+    tracking_numbers = List(String(upper=True), default=())
+    status = String(max_length=50)
+    event = Nested(TrackingEventSchema)
+
 @admin_bp.route('/shipments', methods=['GET'])
 @admin_required
 def get_all_shipments(current_user):
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+        cursor = request.args.get('cursor')
+        total_mode = request.args.get('total')  # 'exact' or 'approximate'
+        try:
+            fields = parse_fields(Shipment, request.args.get('fields'))
+        except ValidationError as e:
+            return validation_error_response(e.errors)
         
-        pagination = Shipment.query.order_by(Shipment.created_at.desc())\
-            .paginate(page=page, per_page=per_page, error_out=False)
+        # With ?fields= only those columns are selected; the cursor needs created_at as well
+        if fields:
+            query = query_fields(Shipment, fields, required=('created_at',))
+        else:
+            query = query_profile(Shipment, 'list')
+        try:
+            items, next_cursor, prev_cursor = keyset_page(query, Shipment, per_page, cursor)
+        except InvalidCursor as e:
+            return jsonify({'error': str(e)}), 400
         
-        shipments = [s.to_dict(include_events=False) for s in pagination.items]
+        result = {
+            'shipments': [s.to_dict(include_events=False, fields=fields) for s in items],
+            'per_page': per_page,
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor
+        }
         
-        return jsonify({
-            'shipments': shipments,
-            'total': pagination.total,
-            'pages': pagination.pages,
-            'current_page': page
-        }), 200
+        if total_mode == 'exact':
+            result['total'] = Shipment.query.count()
+        elif total_mode == 'approximate':
+            result['total'] = estimated_row_count(db.session, Shipment.__tablename__)
+            result['total_is_estimate'] = True
+        
+        return jsonify(result), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/shipments/<int:shipment_id>/status', methods=['PUT'])
 @admin_required
-def update_shipment_status(current_user, shipment_id):
+@use_schema(StatusUpdateSchema)
+def update_shipment_status(current_user, shipment_id, data):
     try:
-        data = request.get_json()
         shipment = Shipment.query.get(shipment_id)
         
         if not shipment:
             return jsonify({'error': 'Shipment not found'}), 404
         
-        if 'status' in data:
+        status_changed = data['status'] is not None and data['status'] != shipment.current_status
+        if data['status'] is not None:
             shipment.current_status = data['status']
         
         # Add tracking event
-        if 'event_type' in data:
+        if data['event_type']:
             event = TrackingEvent(
                 shipment_id=shipment.id,
                 event_type=data['event_type'],
-                location=data.get('location'),
-                description=data.get('description'),
-                is_current=data.get('is_current', False)
+                location=data['location'],
+                description=data['description'],
+                is_current=data['is_current']
             )
             db.session.add(event)
         
+        # Queued in the outbox with this transaction; delivery happens in the background
+        if status_changed and shipment.user_id:
+            owner = db.session.get(User, shipment.user_id)
+            if owner:
+                send_tracking_update_email(owner.email, shipment.tracking_number, shipment.current_status,
+                                           data['location'])
+                if owner.phone:
+                    send_tracking_update_sms(owner.phone, shipment.tracking_number, shipment.current_status)
+        
         db.session.commit()
+        tracking_cache.invalidate(shipment.tracking_number)
         return jsonify({'message': 'Shipment updated successfully', 'shipment': shipment.to_dict()}), 200
     except Exception as e:
         db.session.rollback()
@@ -60,29 +128,20 @@ def update_shipment_status(current_user, shipment_id):
 
 @admin_bp.route('/shipments', methods=['POST'])
 @admin_required
-def create_shipment(current_user):
+@use_schema(ShipmentSchema)
+def create_shipment(current_user, data):
     try:
-        data = request.get_json()
-        
         # Generate tracking number
         tracking_number = Shipment.generate_tracking_number()
         
         # Create shipment
-        shipment = Shipment(
-            tracking_number=tracking_number,
-            shipping_method_id=data.get('shipping_method_id'),
-            consignment_number=data.get('consignment_number'),
-            description=data.get('description'),
-            cartons=data.get('cartons'),
-            actual_weight=data.get('actual_weight'),
-            volume_cbm=data.get('volume_cbm'),
-            origin=data.get('origin'),
-            destination=data.get('destination'),
-            current_status='pending'
-        )
+        shipment = Shipment(tracking_number=tracking_number, current_status='pending', **data)
         
         # Calculate weights and costs
-        shipment.calculate_chargeable_weight()
+        try:
+            shipment.calculate_chargeable_weight()
+        except InvalidAmount as e:
+            return validation_error_response({'chargeable_weight': str(e)})
         
         db.session.add(shipment)
         db.session.commit()
@@ -91,12 +150,13 @@ def create_shipment(current_user):
         event = TrackingEvent(
             shipment_id=shipment.id,
             event_type='Shipment Created',
-            location=data.get('origin'),
+            location=data['origin'],
             description='Shipment registered in system',
             is_current=True
         )
         db.session.add(event)
         db.session.commit()
+        tracking_cache.invalidate(shipment.tracking_number)
         
         return jsonify({
             'message': 'Shipment created successfully',
@@ -107,3 +167,189 @@ def create_shipment(current_user):
         db.session.rollback()
         print(f"Error creating shipment: {str(e)}")
         return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/shipments/bulk', methods=['POST'])
+@admin_required
+def bulk_create_shipments(current_user):
+    """Create shipments from an NDJSON (default) or CSV request body"""
+    try:
+        content_type = request.content_type or 'application/x-ndjson'
+        if not (content_type.startswith('application/x-ndjson') or content_type.startswith('text/csv')):
+            return jsonify({'error': 'Body must be application/x-ndjson or text/csv'}), 415
+        
+        results = import_shipments(
+            request.stream,
+            content_type,
+            chunk_size=current_app.config['BULK_CHUNK_SIZE'],
+            max_rows=current_app.config['BULK_MAX_ROWS']
+        )
+        created = [r['tracking_number'] for r in results if r['status'] == 'created']
+        tracking_cache.invalidate(*created)
+        
+        return jsonify({
+            'created': len(created),
+            'failed': len(results) - len(created),
+            'results': results
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+def _queue_bulk_tracking_updates(changed, status, location):
+    """Queue coalesced tracking notifications for the owners of shipments whose status changed"""
+    owner_ids = {user_id for _, user_id in changed if user_id}
+    if not owner_ids:
+        return
+    owners = {user_id: (email, phone) for user_id, email, phone in db.session.execute(
+        select(User.id, User.email, User.phone).where(User.id.in_(owner_ids))
+    )}
+    messages = []
+    for tracking_number, user_id in changed:
+        if user_id not in owners:
+            continue
+        email, phone = owners[user_id]
+        messages.append(tracking_update_email(email, tracking_number, status, location))
+        if phone:
+            messages.append(tracking_update_sms(phone, tracking_number, status))
+    enqueue_coalesced(messages)
+
+
+@admin_bp.route('/shipments/bulk-status', methods=['POST'])
+@admin_required
+@use_schema(BulkStatusSchema)
+def bulk_update_shipment_status(current_user, data):
+    """Apply one status and/or tracking event to many shipments in a single transaction"""
+    try:
+        shipment_ids = data['shipment_ids']
+        tracking_numbers = data['tracking_numbers']
+        status = data['status']
+        event = data['event']
+        
+        if not shipment_ids and not tracking_numbers:
+            return jsonify({'error': 'shipment_ids or tracking_numbers is required'}), 400
+        if len(shipment_ids) + len(tracking_numbers) > current_app.config['BULK_MAX_ROWS']:
+            return jsonify({'error': 'Too many shipments in one request'}), 400
+        if not status and not event:
+            return jsonify({'error': 'status or event is required'}), 400
+        if event is not None and not event['event_type']:
+            return jsonify({'error': 'event.event_type is required'}), 400
+        
+        conditions = []
+        if shipment_ids:
+            conditions.append(Shipment.id.in_(shipment_ids))
+        if tracking_numbers:
+            conditions.append(Shipment.tracking_number.in_(tracking_numbers))
+        
+        now = datetime.utcnow()
+        if status:
+            # Joining the table to itself returns each row's status from before the update
+            previous = Shipment.__table__.alias('previous')
+            matched = db.session.execute(
+                update(Shipment).where(or_(*conditions), previous.c.id == Shipment.id)
+                .values(current_status=status, updated_at=now)
+                .returning(Shipment.id, Shipment.tracking_number, Shipment.user_id, previous.c.current_status)
+                .execution_options(synchronize_session=False)
+            ).all()
+            # Like a single status update, only notify when the status actually changed
+            _queue_bulk_tracking_updates(
+                [(tracking_number, user_id) for _, tracking_number, user_id, previous_status in matched
+                 if previous_status != status],
+                status,
+                (event or {}).get('location')
+            )
+            matched = [(shipment_id, tracking_number) for shipment_id, tracking_number, _, _ in matched]
+        else:
+            matched = db.session.execute(
+                select(Shipment.id, Shipment.tracking_number).where(or_(*conditions))
+            ).all()
+        
+        if event and matched:
+            db.session.execute(insert(TrackingEvent), [{
+                'shipment_id': shipment_id,
+                'event_type': event['event_type'],
+                'location': event['location'],
+                'description': event['description'],
+                'is_current': event['is_current'],
+                'event_time': now,
+                'created_at': now
+            } for shipment_id, _ in matched])
+        
+        db.session.commit()
+        
+        matched_ids = {shipment_id for shipment_id, _ in matched}
+        matched_numbers = {tracking_number for _, tracking_number in matched}
+        tracking_cache.invalidate(*matched_numbers)
+        
+        return jsonify({
+            'message': 'Shipments updated successfully',
+            'updated': len(matched),
+            'events_created': len(matched) if event else 0,
+            'not_found': {
+                'shipment_ids': [i for i in shipment_ids if i not in matched_ids],
+                'tracking_numbers': [tn for tn in tracking_numbers if tn not in matched_numbers]
+            }
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/shipments/export', methods=['GET'])
+@admin_required
+def export_shipments(current_user):
+    """Stream shipments (optionally with tracking events) as CSV or NDJSON"""
+    try:
+        export_format = request.args.get('format', 'csv')
+        if export_format not in ('csv', 'ndjson'):
+            return jsonify({'error': 'format must be csv or ndjson'}), 400
+        include_events = request.args.get('include_events', 'false').lower() in ('1', 'true', 'yes')
+        
+        try:
+            created_from = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+            created_to = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+        except ValueError:
+            return jsonify({'error': 'from/to must be YYYY-MM-DD dates'}), 400
+        
+        query = export_query(
+            status=request.args.get('status'),
+            created_from=created_from,
+            created_to=created_to,
+            shipping_method_id=request.args.get('shipping_method_id', type=int),
+            include_events=include_events
+        )
+        rows = iter_shipments(query, current_app.config['EXPORT_BATCH_SIZE'], include_events)
+        
+        if export_format == 'csv':
+            body, mimetype = generate_csv(rows, include_events), 'text/csv'
+        else:
+            body, mimetype = generate_ndjson(rows), 'application/x-ndjson'
+        
+        filename = f"shipments-{datetime.utcnow():%Y%m%d%H%M%S}.{export_format}"
+        return current_app.response_class(
+            stream_with_context(body),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/cache/stats', methods=['GET'])
+@admin_required
+def get_cache_stats(current_user):
+    try:
+        return jsonify({
+            'tracking': tracking_cache.stats(),
+            'quotes': quote_cache.stats(),
+            'quote_writer': quote_writer.stats(),
+            'password_hasher': password_hasher.stats(),
+            'auth_states': auth_states.stats(),
+            'login_limiter': login_limiter.stats(),
+            'notifications': notification_dispatcher.stats(),
+            'email_domains': email_domains.stats(),
+            'compression': compression.stats()
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -2,18 +2,37 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from app import db
 from app.models.user import User
-from app.utils.validators import validate_email_address, validate_password, validate_required_fields
+from app.utils.password_hasher import PasswordHasherBusy
+from app.utils.rate_limit import login_limiter
+from app.utils.schemas import Schema, String, use_schema
+from app.utils.validators import validate_email_address
 
 auth_bp = Blueprint('auth', __name__)
 
+
+class RegisterSchema(Schema):
+    email = String(max_length=255, required=True)
+    password = String(strip=False, required=True)
+    full_name = String(max_length=255, required=True)
+    phone = String(max_length=20)
+
+
+class LoginSchema(Schema):
+    email = String(required=True)
+    password = String(strip=False, required=True)
+
+
+def _busy_response():
+    """503 telling the client to retry shortly, used when the password hashing pool is saturated"""
+    response = jsonify({'error': 'Server is busy, please try again shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+
 @auth_bp.route('/register', methods=['POST'])
-def register():
+@use_schema(RegisterSchema)
+def register(data):
     try:
-        data = request.get_json()
-        valid, message = validate_required_fields(data, ['email', 'password', 'full_name'])
-        if not valid:
-            return jsonify({'error': message}), 400
-        
         valid, email_or_error = validate_email_address(data['email'])
         if not valid:
             return jsonify({'error': email_or_error}), 400
@@ -21,34 +40,54 @@ def register():
         if User.query.filter_by(email=email_or_error).first():
             return jsonify({'error': 'Email already registered'}), 409
         
-        user = User(email=email_or_error, full_name=data['full_name'], phone=data.get('phone'))
+        user = User(email=email_or_error, full_name=data['full_name'], phone=data['phone'])
         user.set_password(data['password'])
         db.session.add(user)
         db.session.commit()
         
-        access_token = create_access_token(identity=user.id)
+        access_token = create_access_token(identity=user.id, additional_claims=user.token_claims())
         refresh_token = create_refresh_token(identity=user.id)
         
         return jsonify({'message': 'User registered successfully', 'user': user.to_dict(), 
                        'access_token': access_token, 'refresh_token': refresh_token}), 201
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return _busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @auth_bp.route('/login', methods=['POST'])
-def login():
+@use_schema(LoginSchema)
+def login(data):
     try:
-        data = request.get_json()
-        user = User.query.filter_by(email=data.get('email')).first()
+        # Throttle before the user lookup and bcrypt check
+        retry_after = login_limiter.check(request.remote_addr, data['email'])
+        if retry_after:
+            response = jsonify({'error': 'Too many login attempts, please try again later'})
+            response.headers['Retry-After'] = str(retry_after)
+            return response, 429
+        
+        user = User.query.filter_by(email=data['email']).first()
         
-        if not user or not user.check_password(data.get('password', '')):
+        if not user or not user.check_password(data['password']):
             return jsonify({'error': 'Invalid email or password'}), 401
         
-        access_token = create_access_token(identity=user.id)
+        # Upgrade hashes made with an older cost factor while we have the plain password
+        if user.password_needs_rehash():
+            try:
+                user.rehash_password(data['password'])
+                db.session.commit()
+            except PasswordHasherBusy:
+                db.session.rollback()
+        
+        access_token = create_access_token(identity=user.id, additional_claims=user.token_claims())
         refresh_token = create_refresh_token(identity=user.id)
         
         return jsonify({'message': 'Login successful', 'user': user.to_dict(),
                        'access_token': access_token, 'refresh_token': refresh_token}), 200
+    except PasswordHasherBusy:
+        return _busy_response()
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1,79 +1,147 @@
-from flask import Blueprint, request, jsonify
-from app import db
+from datetime import datetime, timedelta
+from flask import Blueprint, jsonify, current_app
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
 from app.models.quote import Quote
-from app.models.shipping_method import ShippingMethod
+from app.utils.cache import quote_cache
+from app.utils.catalog import shipping_methods
+from app.utils.quote_writer import quote_writer
+from app.utils.pricing import MILLIS, InvalidAmount
+from app.utils.schemas import Schema, Integer, Number, List, Nested, use_schema, validation_error_response
+from app.utils.vector_pricing import price_parcels
 import traceback
 
 quotes_bp = Blueprint('quotes', __name__)
 
+
+class ParcelSchema(Schema):
+    # Rounded to column precision; equal inputs share a quote cache entry
+    actual_weight = Number(minimum=0)
+    volume_cbm = Number(places=MILLIS, minimum=0)
+
+
+class QuoteSchema(ParcelSchema):
+    shipping_method_id = Integer(required=True)
+
+
+class BulkQuoteSchema(Schema):
+    parcels = List(Nested(ParcelSchema), non_empty=True, required=True)
+    shipping_method_ids = List(Integer())
+
+
+def _current_user_id():
+    """Return the JWT identity if the request carries a valid token, without loading the user"""
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+
 @quotes_bp.route('/calculate', methods=['POST'])
-def calculate_quote():
+@use_schema(QuoteSchema)
+def calculate_quote(data):
     try:
-        print("=== Quote Calculation Started ===")
-        data = request.get_json()
-        print(f"Request data: {data}")
-        
-        # Validate required fields
-        if not data or 'shipping_method_id' not in data:
-            print("Error: Missing shipping_method_id")
-            return jsonify({'error': 'Shipping method is required'}), 400
-        
-        # Get shipping method
-        shipping_method = ShippingMethod.query.get(data['shipping_method_id'])
-        print(f"Shipping method: {shipping_method}")
-        
+        # Get shipping method from one catalog snapshot so the cache key matches the rates used
+        snapshot = shipping_methods.snapshot()
+        shipping_method = shipping_methods.get(data['shipping_method_id'], snapshot)
         if not shipping_method:
-            print("Error: Shipping method not found")
             return jsonify({'error': 'Invalid shipping method'}), 404
         
-        print(f"Shipping method found: {shipping_method.name}")
+        actual_weight = data['actual_weight'] or None
+        volume_cbm = data['volume_cbm'] or None
         
-        # Create quote
-        actual_weight = float(data.get('actual_weight', 0)) if data.get('actual_weight') else None
-        volume_cbm = float(data.get('volume_cbm', 0)) if data.get('volume_cbm') else None
+        cached = quote_cache.get(shipping_method.id, snapshot.version, actual_weight, volume_cbm)
+        if cached is None:
+            quote = Quote(
+                shipping_method_id=shipping_method.id,
+                actual_weight=actual_weight,
+                volume_cbm=volume_cbm,
+                rate=shipping_method.base_rate,
+                currency=shipping_method.currency
+            )
+            try:
+                quote.calculate_chargeable_weight()
+                quote.calculate_total_cost()
+            except InvalidAmount as e:
+                return validation_error_response({'total_cost': str(e)})
+            
+            quote_data = {
+                'shipping_method': shipping_method.data,
+                'actual_weight': quote.actual_weight or None,
+                'volume_cbm': quote.volume_cbm or None,
+                'chargeable_weight': quote.chargeable_weight or None,
+                'rate': quote.rate or None,
+                'total_cost': quote.total_cost or None,
+                'currency': quote.currency
+            }
+            cached = (quote_data, quote.chargeable_weight, quote.rate, quote.total_cost)
+            quote_cache.set(shipping_method.id, snapshot.version, actual_weight, volume_cbm, cached)
+        quote_data, chargeable_weight, rate, total_cost = cached
         
-        print(f"Weight: {actual_weight}, Volume: {volume_cbm}")
+        # Persisted by the background writer; the response does not wait for the insert
+        quote_number = Quote.generate_quote_number()
+        valid_until = datetime.utcnow().date() + timedelta(days=current_app.config['QUOTE_VALIDITY_DAYS'])
+        quote_writer.submit({
+            'user_id': _current_user_id(),
+            'shipping_method_id': shipping_method.id,
+            'quote_number': quote_number,
+            'actual_weight': actual_weight,
+            'volume_cbm': volume_cbm,
+            'chargeable_weight': chargeable_weight,
+            'rate': rate,
+            'total_cost': total_cost,
+            'currency': shipping_method.currency,
+            'status': 'draft',
+            'valid_until': valid_until,
+            'created_at': datetime.utcnow()
+        })
         
-        quote = Quote(
-            shipping_method_id=shipping_method.id,
-            actual_weight=actual_weight,
-            volume_cbm=volume_cbm,
-            rate=shipping_method.base_rate,
-            currency=shipping_method.currency
-        )
+        return jsonify({
+            **quote_data,
+            'quote_number': quote_number,
+            'valid_until': valid_until
+        }), 200
         
-        print("Quote object created")
-        
-        # Calculate chargeable weight
-        quote.calculate_chargeable_weight()
-        print(f"Chargeable weight: {quote.chargeable_weight}")
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
+@quotes_bp.route('/bulk', methods=['POST'])
+@use_schema(BulkQuoteSchema)
+def calculate_bulk_quotes(data):
+    """Price many parcels against every active shipping method in one request"""
+    try:
+        max_parcels = current_app.config['QUOTE_BULK_MAX']
+        if len(data['parcels']) > max_parcels:
+            return jsonify({'error': f'At most {max_parcels} parcels per request'}), 400
         
-        # Calculate total cost
-        quote.calculate_total_cost()
-        print(f"Total cost: {quote.total_cost}")
+        parcels = [(p['actual_weight'] or None, p['volume_cbm'] or None) for p in data['parcels']]
         
-        # Return quote data
-        quote_data = {
-            'shipping_method': shipping_method.to_dict(),
-            'actual_weight': float(quote.actual_weight) if quote.actual_weight else None,
-            'volume_cbm': float(quote.volume_cbm) if quote.volume_cbm else None,
-            'chargeable_weight': float(quote.chargeable_weight) if quote.chargeable_weight else None,
-            'rate': float(quote.rate) if quote.rate else None,
-            'total_cost': float(quote.total_cost) if quote.total_cost else None,
-            'currency': quote.currency
-        }
+        methods = shipping_methods.active()
+        if data.get('shipping_method_ids'):
+            wanted = set(data['shipping_method_ids'])
+            methods = [m for m in methods if m.id in wanted]
         
-        print(f"Quote data: {quote_data}")
-        print("=== Quote Calculation Success ===")
+        chargeable, totals, rates = price_parcels(parcels, [m.rate_table for m in methods])
         
-        return jsonify(quote_data), 200  # CHANGED THIS LINE
+        results = []
+        for i, (actual_weight, volume_cbm) in enumerate(parcels):
+            results.append({
+                'parcel': i,
+                'actual_weight': actual_weight,
+                'volume_cbm': volume_cbm,
+                'chargeable_weight': int(chargeable[i]) / 100 if chargeable[i] >= 0 else None,
+                'quotes': [{
+                    'shipping_method_id': method.id,
+                    'shipping_method': method.name,
+                    'rate': int(rates[i, j]) / 100 if rates[i, j] > 0 else None,
+                    'total_cost': int(totals[i, j]) / 100 if totals[i, j] >= 0 else None,
+                    'currency': method.currency
+                } for j, method in enumerate(methods)]
+            })
         
+        return jsonify({'quotes': results}), 200
     except Exception as e:
-        print(f"=== ERROR in calculate_quote ===")
-        print(f"Error type: {type(e).__name__}")
-        print(f"Error message: {str(e)}")
-        print(f"Traceback:")
         traceback.print_exc()
-        print("=== END ERROR ===")
-        
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
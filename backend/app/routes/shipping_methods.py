@@ -1,12 +1,16 @@
 from flask import Blueprint, jsonify
-from app.models.shipping_method import ShippingMethod
+from app.utils.catalog import shipping_methods
+from app.utils.http import make_etag, is_not_modified, not_modified_response, json_body_response
 
 shipping_methods_bp = Blueprint('shipping_methods', __name__)
 
 @shipping_methods_bp.route('/', methods=['GET'])
 def get_shipping_methods():
     try:
-        methods = ShippingMethod.query.filter_by(is_active=True).all()
-        return jsonify([m.to_dict() for m in methods]), 200  # Return array directly
+        version, payload = shipping_methods.active_body()
+        etag = make_etag('shipping_methods', version)
+        if is_not_modified(etag):
+            return not_modified_response(etag)
+        return json_body_response(payload.body, etag=etag, variants=payload.variants)  # Return array directly
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
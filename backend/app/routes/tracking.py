@@ -1,31 +1,202 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import func
+from app import db
 from app.models.shipment import Shipment
+from app.models.tracking_event import TrackingEvent
+from app.models.profiles import query_profile, query_fields, parse_fields
+from app.utils.cache import tracking_cache, CachedPayload
+from app.utils.catalog import shipping_methods
+from app.utils.http import (make_etag, is_not_modified, not_modified_response, json_body_response,
+                            payload_response)
+from app.utils.schemas import Schema, String, List, Any, use_schema, ValidationError, validation_error_response
 
 tracking_bp = Blueprint('tracking', __name__)
 
+
+class TrackingSearchSchema(Schema):
+    tracking_number = String(upper=True, required=True)
+
+
+class TrackingBatchSchema(Schema):
+    # Items are checked by the view, which reports bad ones instead of rejecting the batch
+    tracking_numbers = List(Any(), required=True)
+
+
+def _tracking_validators(tracking_number):
+    """
+    Compute the tracking ETag and Last-Modified without loading the payload
+
+    Returns None when the tracking number does not exist.
+    """
+    row = db.session.query(
+        Shipment.id,
+        Shipment.updated_at,
+        func.max(TrackingEvent.id),
+        func.max(TrackingEvent.created_at)
+    ).outerjoin(TrackingEvent, TrackingEvent.shipment_id == Shipment.id)\
+        .filter(Shipment.tracking_number == tracking_number)\
+        .group_by(Shipment.id).first()
+    if row is None:
+        return None
+    return _validators(*row)
+
+
+def _validators(shipment_id, updated_at, last_event_id, last_event_at):
+    # The payload embeds shipping method data, so the catalog version is part of the tag
+    etag = make_etag('tracking', shipment_id, updated_at.isoformat() if updated_at else '', last_event_id or 0,
+                     shipping_methods.snapshot().version)
+    last_modified = max(filter(None, [updated_at, last_event_at]), default=None)
+    return etag, last_modified
+
+
+def _build_payload(shipment, data, etag=None, last_modified=None):
+    """Encode a serialized shipment (loaded with the 'tracking' profile) into a cacheable payload"""
+    if etag is None:
+        events = shipment.tracking_events
+        etag, last_modified = _validators(
+            shipment.id,
+            shipment.updated_at,
+            max((e.id for e in events), default=None),
+            max((e.created_at for e in events if e.created_at), default=None)
+        )
+    body = current_app.json.dumps_bytes({'shipment': data})
+    return CachedPayload(body, etag=etag, last_modified=last_modified)
+
+
+def _pick(data, fields):
+    """Trim a serialized shipment to a sparse fieldset"""
+    return {field: data[field] for field in fields}
+
+
+def _sparse_tracking_response(tracking_number, fields):
+    """
+    Serve only the requested fields of a tracking payload
+
+    A cached full payload is trimmed without touching the database;
+    otherwise only the columns behind the fields are selected. Partial
+    payloads are not cached.
+    """
+    payload = tracking_cache.get(tracking_number)
+    validators = (payload.etag, payload.last_modified) if payload else _tracking_validators(tracking_number)
+    if validators is None:
+        return jsonify({'error': 'Tracking number not found'}), 404
+    etag, last_modified = make_etag(validators[0], *fields), validators[1]
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    
+    if payload is not None:
+        data = _pick(current_app.json.loads(payload.body)['shipment'], fields)
+    else:
+        shipment = query_fields(Shipment, fields).filter_by(tracking_number=tracking_number).first()
+        if not shipment:
+            return jsonify({'error': 'Tracking number not found'}), 404
+        data = shipment.to_dict(fields=fields)
+    body = current_app.json.dumps_bytes({'shipment': data})
+    return json_body_response(body, etag=etag, last_modified=last_modified)
+
+
+def _tracking_response(tracking_number, fields=None):
+    """Serve the tracking payload, answering conditional requests before serializing"""
+    if fields:
+        return _sparse_tracking_response(tracking_number, fields)
+    payload = tracking_cache.get(tracking_number)
+    if payload is None:
+        generation = tracking_cache.generation()
+        validators = _tracking_validators(tracking_number)
+        if validators is None:
+            return jsonify({'error': 'Tracking number not found'}), 404
+        etag, last_modified = validators
+        if is_not_modified(etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        shipment = query_profile(Shipment, 'tracking').filter_by(tracking_number=tracking_number).first()
+        if not shipment:
+            return jsonify({'error': 'Tracking number not found'}), 404
+        payload = _build_payload(shipment, shipment.to_dict(include_events=True), etag, last_modified)
+        tracking_cache.set(tracking_number, payload, generation)
+    elif is_not_modified(payload.etag, payload.last_modified):
+        return not_modified_response(payload.etag, payload.last_modified)
+    return payload_response(payload)
+
 @tracking_bp.route('/<tracking_number>', methods=['GET'])
 def get_tracking_info(tracking_number):
     try:
-        shipment = Shipment.query.filter_by(tracking_number=tracking_number.upper()).first()
-        if not shipment:
-            return jsonify({'error': 'Tracking number not found'}), 404
-        return jsonify({'shipment': shipment.to_dict(include_events=True)}), 200
+        fields = parse_fields(Shipment, request.args.get('fields'))
+    except ValidationError as e:
+        return validation_error_response(e.errors)
+    try:
+        return _tracking_response(tracking_number.upper(), fields)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @tracking_bp.route('/search', methods=['POST'])
-def search_tracking():
+@use_schema(TrackingSearchSchema)
+def search_tracking(data):
     try:
-        data = request.get_json()
-        if not data or 'tracking_number' not in data:
-            return jsonify({'error': 'Tracking number is required'}), 400
+        fields = parse_fields(Shipment, request.args.get('fields'))
+    except ValidationError as e:
+        return validation_error_response(e.errors)
+    try:
+        return _tracking_response(data['tracking_number'], fields)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@tracking_bp.route('/batch', methods=['POST'])
+@use_schema(TrackingBatchSchema)
+def batch_tracking(data):
+    try:
+        fields = parse_fields(Shipment, request.args.get('fields'))
+    except ValidationError as e:
+        return validation_error_response(e.errors)
+    try:
+        max_batch = current_app.config['TRACKING_BATCH_MAX']
+        if len(data['tracking_numbers']) > max_batch:
+            return jsonify({'error': f'At most {max_batch} tracking numbers per request'}), 400
         
-        tracking_number = data['tracking_number'].strip().upper()
-        shipment = Shipment.query.filter_by(tracking_number=tracking_number).first()
+        # Normalize and de-duplicate while keeping the caller's order
+        tracking_numbers = []
+        invalid = []
+        for value in data['tracking_numbers']:
+            if not isinstance(value, str) or not value.strip():
+                invalid.append(value)
+                continue
+            tracking_number = value.strip().upper()
+            if tracking_number not in tracking_numbers:
+                tracking_numbers.append(tracking_number)
         
-        if not shipment:
-            return jsonify({'error': 'Tracking number not found'}), 404
+        found = {}
+        missing = []
+        for tracking_number in tracking_numbers:
+            payload = tracking_cache.get(tracking_number)
+            if payload is not None:
+                shipment_data = current_app.json.loads(payload.body)['shipment']
+                found[tracking_number] = _pick(shipment_data, fields) if fields else shipment_data
+            else:
+                missing.append(tracking_number)
+        
+        if missing and fields:
+            # Only the requested columns; partial payloads are not cached
+            shipments = query_fields(Shipment, fields, required=('tracking_number',))\
+                .filter(Shipment.tracking_number.in_(missing)).all()
+            for shipment in shipments:
+                found[shipment.tracking_number] = shipment.to_dict(fields=fields)
+        elif missing:
+            # One query for the shipments and one for all of their events
+            generation = tracking_cache.generation()
+            shipments = query_profile(Shipment, 'tracking')\
+                .filter(Shipment.tracking_number.in_(missing)).all()
+            
+            payloads = {}
+            for shipment in shipments:
+                shipment_data = shipment.to_dict(include_events=True)
+                found[shipment.tracking_number] = shipment_data
+                payloads[shipment.tracking_number] = _build_payload(shipment, shipment_data)
+            tracking_cache.set_many(payloads, generation)
         
-        return jsonify({'shipment': shipment.to_dict(include_events=True)}), 200
+        return jsonify({
+            'found': found,
+            'not_found': [tn for tn in tracking_numbers if tn not in found],
+            'invalid': invalid
+        }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
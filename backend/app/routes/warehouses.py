@@ -1,22 +1,53 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app.models.warehouse import Warehouse
+from app.models.profiles import parse_fields
+from app.utils.catalog import warehouses as warehouse_directory
+from app.utils.http import make_etag, is_not_modified, not_modified_response, json_body_response
+from app.utils.schemas import ValidationError, validation_error_response
 
 warehouses_bp = Blueprint('warehouses', __name__)
 
 @warehouses_bp.route('/', methods=['GET'])
 def get_warehouses():
     try:
-        country = request.args.get('country')
-        shipping_type = request.args.get('shipping_type')
+        country = request.args.get('country') or None
+        shipping_type = request.args.get('shipping_type') or None
+        try:
+            fields = parse_fields(Warehouse, request.args.get('fields'))
+        except ValidationError as e:
+            return validation_error_response(e.errors)
         
-        query = Warehouse.query.filter_by(is_active=True)
-        if country:
-            query = query.filter_by(country=country)
+        # The directory only changes with the warehouses catalog version
+        etag = make_etag('warehouses', warehouse_directory.snapshot().version, country, shipping_type, fields)
+        if is_not_modified(etag):
+            return not_modified_response(etag)
         
-        warehouses = query.all()
-        if shipping_type:
-            warehouses = [w for w in warehouses if shipping_type in w.get_shipping_types()]
+        version, payload = warehouse_directory.directory_body(country, shipping_type, fields)
+        etag = make_etag('warehouses', version, country, shipping_type, fields)
+        return json_body_response(payload.body, etag=etag, variants=payload.variants)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@warehouses_bp.route('/nearest', methods=['GET'])
+def get_nearest_warehouses():
+    """Closest active warehouses / pickup points to a coordinate, by great-circle distance"""
+    try:
+        try:
+            latitude = float(request.args['lat'])
+            longitude = float(request.args['lon'])
+            k = int(request.args.get('k', 5))
+        except (KeyError, ValueError):
+            return jsonify({'error': 'lat and lon are required numbers'}), 400
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return jsonify({'error': 'lat must be within [-90, 90] and lon within [-180, 180]'}), 400
+        k = min(max(k, 1), current_app.config['NEAREST_WAREHOUSES_MAX'])
         
-        return jsonify({'warehouses': [w.to_dict() for w in warehouses]}), 200
+        results = warehouse_directory.nearest(
+            latitude, longitude, k,
+            warehouse_type=request.args.get('type') or None,
+            shipping_type=request.args.get('shipping_type') or None
+        )
+        return jsonify({'warehouses': results}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,83 @@
+from collections import namedtuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from app import db
+from app.models.user import User
+from app.utils.cache import LRUCache
+
+
+AuthState = namedtuple('AuthState', ['auth_version', 'is_active', 'role'])
+
+# Changing any of these invalidates the user's existing tokens
+AUTH_ATTRIBUTES = ('role', 'is_active', 'password_hash')
+
+
+@event.listens_for(User, 'before_update')
+def _bump_auth_version(mapper, connection, user):
+    state = inspect(user)
+    # A cost upgrade at login (User.rehash_password) changes the hash but not the credential
+    rehashed = user.__dict__.pop('_password_rehashed', False)
+    if any(state.attrs[name].history.has_changes() for name in AUTH_ATTRIBUTES
+           if not (rehashed and name == 'password_hash')):
+        user.auth_version = (user.auth_version or 0) + 1
+        object_session(user).info.setdefault('auth_changed_users', set()).add(user.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_users(session):
+    auth_states.invalidate(*session.info.pop('auth_changed_users', ()))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_changed_users(session):
+    session.info.pop('auth_changed_users', None)
+
+
+class AuthStateCache:
+    """
+    Per-worker cache of each user's auth_version, is_active and role
+
+    Access tokens carry the user's role and auth_version as claims, so an
+    authorized request only needs to confirm that the version is still
+    current. That check is served from this cache. Only a miss reads the
+    three columns from the database. Deactivating a user or changing their
+    role or password bumps auth_version, so tokens issued before the change
+    are refused. This worker sees the change at once; other workers see it
+    within AUTH_CACHE_TTL seconds.
+    """
+
+    def __init__(self, app=None):
+        self.local = LRUCache()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.local = LRUCache(
+            max_entries=app.config.get('AUTH_CACHE_MAX_ENTRIES', 10000),
+            ttl=app.config.get('AUTH_CACHE_TTL', 30)
+        )
+        app.extensions['auth_states'] = self
+
+    def get(self, user_id):
+        """Return the AuthState for a user ID, or None if the user does not exist"""
+        user_id = int(user_id)
+        state = self.local.get(user_id)
+        if state is None:
+            row = db.session.query(User.auth_version, User.is_active, User.role).filter(User.id == user_id).first()
+            if row is None:
+                return None
+            state = AuthState(*row)
+            self.local.set(user_id, state)
+        return state
+
+    def invalidate(self, *user_ids):
+        """Drop cached states so the next request re-reads them"""
+        for user_id in user_ids:
+            self.local.delete(int(user_id))
+
+    def stats(self):
+        """Return hit/miss/eviction counters"""
+        return self.local.stats()
+
+
+auth_states = AuthStateCache()
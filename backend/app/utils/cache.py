@@ -0,0 +1,342 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with a per-entry TTL"""
+
+    def __init__(self, max_entries=10000, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, value = item
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store value under key, evicting the least recently used entries"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """Remove key from the cache"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """Return hit/miss/eviction counters"""
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+class MemoryBackend:
+    """Local stand-in for a shared cache backend (same interface as RedisBackend)"""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def incr(self, key):
+        """Increment the counter stored under key (no expiry) and return the new value"""
+        with self._lock:
+            item = self._data.get(key)
+            value = (item[1] if item is not None else 0) + 1
+            self._data[key] = (float('inf'), value)
+            return value
+
+
+class RedisBackend:
+    """Shared cache backend stored in Redis (requires the redis package)"""
+
+    def __init__(self, url):
+        import redis
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, value, ttl):
+        self._client.set(key, value, ex=max(int(ttl), 1))
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*keys)
+
+    def incr(self, key):
+        """Increment the counter stored under key (no expiry) and return the new value"""
+        return self._client.incr(key)
+
+
+def create_backend(url):
+    """Build a shared backend from a URL ('memory://' or 'redis://...')"""
+    if not url:
+        return None
+    if url.startswith('memory://'):
+        return MemoryBackend()
+    return RedisBackend(url)
+
+
+class CachedPayload:
+    """An encoded JSON body together with its validators and compressed variants"""
+
+    __slots__ = ('body', 'etag', 'last_modified', 'variants')
+
+    def __init__(self, body, etag=None, last_modified=None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        # Content coding -> compressed body, filled by the response compressor (per worker)
+        self.variants = {}
+
+    def to_bytes(self):
+        """Pack into a single bytes value for a shared backend"""
+        last_modified = self.last_modified.isoformat() if self.last_modified else ''
+        header = f"{self.etag or ''}\n{last_modified}\n".encode('ascii')
+        return header + self.body
+
+    @classmethod
+    def from_bytes(cls, data):
+        etag, last_modified, body = data.split(b'\n', 2)
+        return cls(
+            body,
+            etag=etag.decode('ascii') or None,
+            last_modified=datetime.fromisoformat(last_modified.decode('ascii')) if last_modified else None
+        )
+
+
+class TrackingCache:
+    """
+    Read-through cache for serialized public tracking payloads
+
+    Entries are keyed by tracking number and hold a CachedPayload.
+    A short-lived per-worker LRU (TRACKING_CACHE_TTL) sits in front of an
+    optional shared backend (TRACKING_CACHE_SHARED_TTL). Invalidation
+    deletes the shared entries and increments a generation counter in the
+    backend. Every worker checks that counter at most once per
+    TRACKING_CACHE_SYNC_INTERVAL seconds and clears its LRU when it moved,
+    so another worker serves a changed shipment for at most that long.
+    Without a shared backend there is nothing to broadcast through, and
+    other workers may serve it until their local entry expires.
+
+    A payload built from a database read is only stored if no invalidation
+    happened since the read started: callers take generation() before
+    reading and pass it to set().
+    """
+
+    key_prefix = 'tracking:'
+    generation_key = 'tracking-generation'
+
+    def __init__(self, app=None):
+        self.local = LRUCache()
+        self.backend = None
+        self.enabled = True
+        self.shared_ttl = 300
+        self.sync_interval = 1.0
+        self._generation = 0
+        self._synced_at = 0.0
+        self.shared_hits = 0
+        self.stale_writes = 0
+        self.remote_invalidations = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('TRACKING_CACHE_ENABLED', True)
+        self.local = LRUCache(
+            max_entries=app.config.get('TRACKING_CACHE_MAX_ENTRIES', 10000),
+            ttl=app.config.get('TRACKING_CACHE_TTL', 30)
+        )
+        self.shared_ttl = app.config.get('TRACKING_CACHE_SHARED_TTL', 300)
+        self.sync_interval = app.config.get('TRACKING_CACHE_SYNC_INTERVAL', 1.0)
+        self.backend = create_backend(app.config.get('CACHE_BACKEND_URL'))
+        app.extensions['tracking_cache'] = self
+
+    def _key(self, tracking_number):
+        return f"{self.key_prefix}{tracking_number}"
+
+    def generation(self):
+        """Current invalidation generation, read before building a payload from the database"""
+        if self.backend is None:
+            return self._generation
+        return int(self.backend.get(self.generation_key) or 0)
+
+    def _sync(self):
+        """Clear the local tier if invalidations happened since the last check"""
+        now = time.monotonic()
+        if self.backend is None or now - self._synced_at < self.sync_interval:
+            return
+        self._synced_at = now
+        generation = self.generation()
+        if generation != self._generation:
+            self.local.clear()
+            self._generation = generation
+            self.remote_invalidations += 1
+
+    def get(self, tracking_number):
+        """Return the cached payload for a tracking number, or None"""
+        if not self.enabled:
+            return None
+        self._sync()
+        payload = self.local.get(tracking_number)
+        if payload is not None or self.backend is None:
+            return payload
+        data = self.backend.get(self._key(tracking_number))
+        if data is None:
+            return None
+        self.shared_hits += 1
+        payload = CachedPayload.from_bytes(data)
+        self.local.set(tracking_number, payload)
+        return payload
+
+    def set(self, tracking_number, payload, generation=None):
+        """Cache the payload for a tracking number, unless entries were invalidated since generation"""
+        self.set_many({tracking_number: payload}, generation)
+
+    def set_many(self, payloads, generation=None):
+        """Cache a {tracking number: payload} dict built from one read, with a single generation check"""
+        if not self.enabled or not payloads:
+            return
+        if generation is not None and self.generation() != generation:
+            self.stale_writes += len(payloads)
+            return
+        for tracking_number, payload in payloads.items():
+            self.local.set(tracking_number, payload)
+            if self.backend is not None:
+                self.backend.set(self._key(tracking_number), payload.to_bytes(), self.shared_ttl)
+
+    def invalidate(self, *tracking_numbers):
+        """Drop cached entries for the given tracking numbers (call after the change is committed)"""
+        if not tracking_numbers:
+            return
+        for tracking_number in tracking_numbers:
+            self.local.delete(tracking_number)
+        if self.backend is None:
+            self._generation += 1
+            return
+        self.backend.delete(*[self._key(tn) for tn in tracking_numbers])
+        self.backend.incr(self.generation_key)
+
+    def stats(self):
+        """Return hit/miss counters for the local and shared tiers"""
+        data = self.local.stats()
+        data['enabled'] = self.enabled
+        data['shared_backend'] = type(self.backend).__name__ if self.backend else None
+        data['shared_hits'] = self.shared_hits
+        data['generation'] = self._generation
+        data['remote_invalidations'] = self.remote_invalidations
+        data['stale_writes'] = self.stale_writes
+        return data
+
+
+tracking_cache = TrackingCache()
+
+
+class QuoteCache:
+    """
+    Per-worker memo of calculated quote results
+
+    Keys are (shipping method id, catalog version, weight, volume), with
+    weight and volume already rounded to their column precision. A rate
+    change bumps the catalog version, so stale quotes are never served.
+    The first lookup under a new version also drops the old entries.
+    """
+
+    def __init__(self, app=None):
+        self.local = LRUCache()
+        self.enabled = True
+        self.version = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('QUOTE_CACHE_ENABLED', True)
+        self.local = LRUCache(
+            max_entries=app.config.get('QUOTE_CACHE_MAX_ENTRIES', 5000),
+            ttl=app.config.get('QUOTE_CACHE_TTL', 3600)
+        )
+        app.extensions['quote_cache'] = self
+
+    def _check_version(self, version):
+        if version != self.version:
+            self.local.clear()
+            self.version = version
+
+    def get(self, method_id, version, actual_weight, volume_cbm):
+        """Return the cached result for a quote, or None"""
+        if not self.enabled:
+            return None
+        self._check_version(version)
+        return self.local.get((method_id, version, actual_weight, volume_cbm))
+
+    def set(self, method_id, version, actual_weight, volume_cbm, result):
+        """Cache the result of a quote"""
+        if not self.enabled:
+            return
+        self._check_version(version)
+        self.local.set((method_id, version, actual_weight, volume_cbm), result)
+
+    def stats(self):
+        """Return hit/miss/eviction counters"""
+        data = self.local.stats()
+        data['enabled'] = self.enabled
+        data['catalog_version'] = self.version
+        return data
+
+
+quote_cache = QuoteCache()
@@ -0,0 +1,260 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from datetime import datetime
+from itertools import chain
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, selectinload
+from app import db
+from app.models.catalog_version import CatalogVersion
+from app.models.shipping_method import ShippingMethod
+from app.models.rate_tier import RateTier
+from app.models.warehouse import Warehouse
+from app.models.warehouse_shipping_type import WarehouseShippingType
+from app.utils.cache import CachedPayload
+from app.utils.pricing import RateTable
+from app.utils.spatial import KDTree, to_unit_vectors, chord_to_km
+
+
+# Model class -> catalog name whose version is bumped when rows of it change
+WATCHED_MODELS = {}
+# Catalog name -> in-process catalogs to refresh after a local commit
+CATALOGS = {}
+
+
+def bump_version(connection, name):
+    """Increment a catalog's version counter (creating it on first use)"""
+    stmt = insert(CatalogVersion).values(name=name, version=1, updated_at=datetime.utcnow())
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=[CatalogVersion.name],
+        set_={'version': CatalogVersion.version + 1, 'updated_at': stmt.excluded.updated_at}
+    ))
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_changed_catalogs(session, flush_context):
+    names = {WATCHED_MODELS[type(obj)] for obj in chain(session.new, session.dirty, session.deleted)
+             if type(obj) in WATCHED_MODELS}
+    if names:
+        connection = session.connection()
+        for name in names:
+            bump_version(connection, name)
+        session.info.setdefault('changed_catalogs', set()).update(names)
+
+
+@event.listens_for(Session, 'after_commit')
+def _refresh_changed_catalogs(session):
+    for name in session.info.pop('changed_catalogs', ()):
+        for catalog in CATALOGS.get(name, ()):
+            catalog.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_changed_catalogs(session):
+    session.info.pop('changed_catalogs', None)
+
+
+class VersionedCatalog(ABC):
+    """
+    Immutable in-process snapshot of a rarely changing table
+
+    The snapshot is rebuilt only when the catalog's row in catalog_versions
+    changes. That row is checked at most once per CATALOG_CHECK_INTERVAL
+    seconds. Readers always get a complete snapshot: a reload builds a new
+    object and swaps the reference.
+    """
+
+    models = ()
+    name = None
+
+    def __init__(self):
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        for model in self.models:
+            WATCHED_MODELS[model] = self.name
+        CATALOGS.setdefault(self.name, []).append(self)
+
+    @abstractmethod
+    def build(self, version):
+        """Build a snapshot for the given version"""
+
+    def current_version(self):
+        version = db.session.query(CatalogVersion.version).filter_by(name=self.name).scalar()
+        return version or 0
+
+    def snapshot(self):
+        """Return the current snapshot, reloading it if the version has moved"""
+        interval = current_app.config.get('CATALOG_CHECK_INTERVAL', 5)
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < interval:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and time.monotonic() - self._checked_at < interval:
+                return snapshot
+            version = self.current_version()
+            if snapshot is None or snapshot.version != version:
+                snapshot = self.build(version)
+                self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+            return snapshot
+
+    def invalidate(self):
+        """Force a version check on the next access"""
+        self._checked_at = 0.0
+
+
+ShippingMethodRecord = namedtuple('ShippingMethodRecord', [
+    'id', 'name', 'type', 'origin', 'rate_type', 'base_rate', 'currency', 'is_active', 'rate_table', 'data'
+])
+
+
+class ShippingMethodSnapshot:
+    """All shipping methods at one catalog version, indexed by ID"""
+
+    __slots__ = ('version', 'by_id', 'active', 'active_dicts', 'body')
+
+    def __init__(self, version, records):
+        self.version = version
+        self.by_id = {record.id: record for record in records}
+        self.active = tuple(record for record in records if record.is_active)
+        # Precomputed to_dict() output; shared between requests, so treat as read-only
+        self.active_dicts = [record.data for record in self.active]
+        self.body = None
+
+
+class ShippingMethodCatalog(VersionedCatalog):
+    models = (ShippingMethod, RateTier)
+    name = 'shipping_methods'
+
+    def build(self, version):
+        methods = ShippingMethod.query.options(selectinload(ShippingMethod.rate_tiers))\
+            .order_by(ShippingMethod.id).all()
+        records = [ShippingMethodRecord(
+            id=m.id, name=m.name, type=m.type, origin=m.origin, rate_type=m.rate_type,
+            base_rate=m.base_rate, currency=m.currency, is_active=m.is_active,
+            rate_table=RateTable(m.rate_type, m.base_rate, [(t.min_quantity, t.rate) for t in m.rate_tiers],
+                                 m.minimum_charge, m.surcharge_percent),
+            data=m.to_dict()
+        ) for m in methods]
+        return ShippingMethodSnapshot(version, records)
+
+    def get(self, method_id, snapshot=None):
+        """Return the record for a shipping method ID (from snapshot if given), or None"""
+        if method_id is None:
+            return None
+        try:
+            return (snapshot or self.snapshot()).by_id.get(int(method_id))
+        except (TypeError, ValueError):
+            return None
+
+    def get_dict(self, method_id):
+        """Return the precomputed to_dict() output for a shipping method ID, or None"""
+        record = self.get(method_id)
+        return record.data if record else None
+
+    def active(self):
+        """Return the active shipping method records"""
+        return self.snapshot().active
+
+    def active_body(self):
+        """Return (version, CachedPayload of the active methods JSON list), encoding once per snapshot"""
+        snapshot = self.snapshot()
+        if snapshot.body is None:
+            snapshot.body = CachedPayload(current_app.json.dumps_bytes(snapshot.active_dicts))
+        return snapshot.version, snapshot.body
+
+
+shipping_methods = ShippingMethodCatalog()
+
+
+class WarehouseSnapshot:
+    """Directory responses and spatial indexes at one catalog version, built per filter combination on demand"""
+
+    __slots__ = ('version', 'bodies', 'indexes')
+
+    def __init__(self, version):
+        self.version = version
+        self.bodies = {}
+        self.indexes = {}
+
+
+SpatialIndex = namedtuple('SpatialIndex', ['tree', 'warehouses'])
+
+
+class WarehouseCatalog(VersionedCatalog):
+    models = (Warehouse, WarehouseShippingType)
+    name = 'warehouses'
+    # Caps the combinations kept per version; arbitrary query strings cannot grow it further
+    max_bodies = 256
+
+    def build(self, version):
+        return WarehouseSnapshot(version)
+
+    def query(self, country=None, shipping_type=None, warehouse_type=None, fields=None):
+        """Active warehouses matching the filters, with the filtering done in SQL"""
+        if fields:
+            # Imported here: profiles imports the models, which import this module
+            from app.models.profiles import fieldset_options
+            options = fieldset_options(Warehouse, fields)
+        else:
+            options = [selectinload(Warehouse.shipping_types)]
+        query = Warehouse.query.options(*options).filter_by(is_active=True)
+        if country:
+            query = query.filter(Warehouse.country == country)
+        if warehouse_type:
+            query = query.filter(Warehouse.type == warehouse_type)
+        if shipping_type:
+            query = query.filter(Warehouse.shipping_types.any(WarehouseShippingType.shipping_type == shipping_type))
+        return query.order_by(Warehouse.id)
+
+    def directory_body(self, country=None, shipping_type=None, fields=None):
+        """
+        Return (version, CachedPayload of the JSON directory) for a filter combination
+
+        Each combination is encoded once per catalog version.
+
+        fields, a sorted tuple from parse_fields(), limits both the columns
+        selected and the keys serialized.
+        """
+        snapshot = self.snapshot()
+        key = (country, shipping_type, fields)
+        body = snapshot.bodies.get(key)
+        if body is None:
+            warehouses = self.query(country, shipping_type, fields=fields).all()
+            data = {'warehouses': [w.to_dict(fields) for w in warehouses]}
+            body = CachedPayload(current_app.json.dumps_bytes(data))
+            if len(snapshot.bodies) < self.max_bodies:
+                snapshot.bodies[key] = body
+        return snapshot.version, body
+
+    def spatial_index(self, warehouse_type=None, shipping_type=None):
+        """Return the KD-tree over located active warehouses for a filter combination"""
+        snapshot = self.snapshot()
+        key = (warehouse_type, shipping_type)
+        index = snapshot.indexes.get(key)
+        if index is None:
+            located = self.query(shipping_type=shipping_type, warehouse_type=warehouse_type)\
+                .filter(Warehouse.latitude.isnot(None), Warehouse.longitude.isnot(None)).all()
+            index = SpatialIndex(
+                tree=KDTree(to_unit_vectors([float(w.latitude) for w in located],
+                                            [float(w.longitude) for w in located])),
+                warehouses=[w.to_dict() for w in located]
+            )
+            if len(snapshot.indexes) < self.max_bodies:
+                snapshot.indexes[key] = index
+        return index
+
+    def nearest(self, latitude, longitude, k=5, warehouse_type=None, shipping_type=None):
+        """Return up to k warehouse dicts nearest to a point, each with its distance_km"""
+        index = self.spatial_index(warehouse_type, shipping_type)
+        point = to_unit_vectors([latitude], [longitude])[0]
+        return [dict(index.warehouses[i], distance_km=round(float(chord_to_km(chord)), 3))
+                for chord, i in index.tree.query(point, k)]
+
+
+warehouses = WarehouseCatalog()
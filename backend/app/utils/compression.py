@@ -0,0 +1,134 @@
+import gzip
+import threading
+import time
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - gzip only without the Brotli package
+    brotli = None
+
+
+class ResponseCompressor:
+    """
+    gzip/brotli compression of JSON responses in an after_request hook
+
+    The encoding is negotiated from Accept-Encoding (br preferred when the
+    Brotli package is installed and the client weighs both equally). Bodies
+    below COMPRESSION_MIN_SIZE bytes, streamed responses (exports) and
+    responses that are already encoded are sent as they are. A compressed
+    response carries a weak ETag, so a conditional request still matches
+    whichever encoding the client stored.
+
+    Responses built from a cached body can hand the compressor a dict that
+    lives next to that body (see json_body_response(variants=...)). Each
+    encoding is then compressed once per cached body, at the higher
+    COMPRESSION_CACHED_* levels, and reused on every later hit.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.min_size = 1024
+        self.mimetypes = frozenset(['application/json'])
+        self.levels = {'gzip': 6, 'br': 4}
+        self.cached_levels = {'gzip': 9, 'br': 9}
+        self._lock = threading.Lock()
+        self.compressed = 0
+        self.skipped_small = 0
+        self.variant_hits = 0
+        self.variants_stored = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.compress_seconds = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('COMPRESSION_ENABLED', True)
+        self.min_size = app.config.get('COMPRESSION_MIN_SIZE', 1024)
+        self.mimetypes = frozenset(app.config.get('COMPRESSION_MIMETYPES', ['application/json']))
+        self.levels = {
+            'gzip': app.config.get('COMPRESSION_GZIP_LEVEL', 6),
+            'br': app.config.get('COMPRESSION_BROTLI_QUALITY', 4)
+        }
+        self.cached_levels = {
+            'gzip': app.config.get('COMPRESSION_CACHED_GZIP_LEVEL', 9),
+            'br': app.config.get('COMPRESSION_CACHED_BROTLI_QUALITY', 9)
+        }
+        app.after_request(self.compress_response)
+        app.extensions['compression'] = self
+
+    @property
+    def encodings(self):
+        """Supported content codings, most preferred first"""
+        return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+    def compress(self, data, encoding, level):
+        """Compress bytes with a content coding ('gzip' or 'br')"""
+        if encoding == 'br':
+            return brotli.compress(data, quality=level)
+        return gzip.compress(data, compresslevel=level, mtime=0)
+
+    def _compressible(self, response):
+        return (200 <= response.status_code < 300 and response.status_code not in (204, 206)
+                and not response.direct_passthrough and not response.is_streamed
+                and 'Content-Encoding' not in response.headers
+                and response.mimetype in self.mimetypes)
+
+    def compress_response(self, response):
+        """after_request hook: compress the body if the client accepts it and it is worth it"""
+        if not self.enabled or not self._compressible(response):
+            return response
+        response.vary.add('Accept-Encoding')
+
+        body = response.get_data()
+        if len(body) < self.min_size:
+            self.skipped_small += 1
+            return response
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+
+        variants = getattr(response, 'compressed_variants', None)
+        data = variants.get(encoding) if variants is not None else None
+        started = time.perf_counter()
+        if data is not None:
+            self.variant_hits += 1
+        elif variants is not None:
+            data = variants[encoding] = self.compress(body, encoding, self.cached_levels[encoding])
+            self.variants_stored += 1
+        else:
+            data = self.compress(body, encoding, self.levels[encoding])
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.compressed += 1
+            self.bytes_in += len(body)
+            self.bytes_out += len(data)
+            self.compress_seconds += elapsed
+
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def stats(self):
+        """Return compression counters and the overall ratio for this worker"""
+        return {
+            'enabled': self.enabled,
+            'encodings': self.encodings,
+            'min_size': self.min_size,
+            'compressed': self.compressed,
+            'skipped_small': self.skipped_small,
+            'variant_hits': self.variant_hits,
+            'variants_stored': self.variants_stored,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'ratio': round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+            'compress_ms': round(self.compress_seconds * 1000, 1)
+        }
+
+
+compression = ResponseCompressor()
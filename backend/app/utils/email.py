@@ -1,38 +1,27 @@
-import os
-from flask import current_app
-# Note: For production, use Flask-Mail or SendGrid
-# This is a placeholder structure
+from app.utils.notifications import enqueue_notification, enqueue_coalesced, recipient_digest
+# Delivery happens in the background dispatcher (app/utils/notifications.py);
+# the provider is chosen with NOTIFICATION_EMAIL_PROVIDER (console, smtp, memory)
 
 
-def send_email(to, subject, body, html=None):
+def send_email(to, subject, body, html=None, coalesce_key=None, commit=False):
     """
-    Send email using configured email service
-    For production, integrate with SendGrid, AWS SES, or Flask-Mail
+    Queue an email in the notifications outbox and return the Notification
+
+    The row is committed with the caller's transaction (or immediately
+    with commit=True) and delivered by the dispatcher; nothing here waits
+    on the mail provider. html is accepted for compatibility; only the
+    text body is sent. See enqueue_notification() for coalesce_key.
     """
-    try:
-        # Placeholder for email sending logic
-        print(f"Sending email to: {to}")
-        print(f"Subject: {subject}")
-        print(f"Body: {body}")
-        
-        # TODO: Implement actual email sending
-        # Example with Flask-Mail:
-        # msg = Message(subject, recipients=[to])
-        # msg.body = body
-        # if html:
-        #     msg.html = html
-        # mail.send(msg)
-        
-        return True
-    except Exception as e:
-        print(f"Error sending email: {str(e)}")
-        return False
+    return enqueue_notification('email', to, body, subject=subject, coalesce_key=coalesce_key, commit=commit)
 
 
-def send_tracking_update_email(user_email, tracking_number, status, location):
-    """Send tracking update notification email"""
-    subject = f"Shipment Update: {tracking_number}"
-    body = f"""
+def tracking_update_email(user_email, tracking_number, status, location):
+    """Build the outbox message for a tracking update email"""
+    return {
+        'channel': 'email',
+        'recipient': user_email,
+        'subject': f"Shipment Update: {tracking_number}",
+        'body': f"""
     Your shipment {tracking_number} has been updated.
     
     Current Status: {status}
@@ -42,8 +31,15 @@ def send_tracking_update_email(user_email, tracking_number, status, location):
     
     Best regards,
     Golden Sail Logistics Team
-    """
-    return send_email(user_email, subject, body)
+    """,
+        # Updates to one shipment for one recipient within the debounce window go out as one email
+        'coalesce_key': f"tracking:{tracking_number}:email:{recipient_digest(user_email)}"
+    }
+
+
+def send_tracking_update_email(user_email, tracking_number, status, location):
+    """Queue a tracking update notification email, coalesced per shipment and recipient"""
+    return enqueue_coalesced([tracking_update_email(user_email, tracking_number, status, location)])
 
 
 def send_welcome_email(user_email, full_name):
@@ -0,0 +1,139 @@
+import queue
+import threading
+from collections import namedtuple
+from email_validator import EmailUndeliverableError
+from email_validator.deliverability import validate_email_deliverability
+from app.utils.cache import LRUCache
+
+
+DomainVerdict = namedtuple('DomainVerdict', ['deliverable', 'message'])
+
+
+class DNSResolver:
+    """Checks a domain's MX (or A/AAAA fallback) records with email_validator's DNS lookup"""
+
+    def __init__(self, app):
+        self.timeout = app.config.get('EMAIL_DOMAIN_DNS_TIMEOUT', 5)
+
+    def check(self, domain):
+        """Return a DomainVerdict, or None when DNS gave no definite answer"""
+        try:
+            info = validate_email_deliverability(domain, domain, timeout=self.timeout)
+        except EmailUndeliverableError as e:
+            return DomainVerdict(False, str(e))
+        if 'unknown-deliverability' in info:
+            return None
+        return DomainVerdict(True, None)
+
+
+class StubResolver:
+    """Local stand-in: every domain is deliverable except EMAIL_UNDELIVERABLE_DOMAINS"""
+
+    def __init__(self, app):
+        self.undeliverable = {domain.strip().lower() for domain in
+                              (app.config.get('EMAIL_UNDELIVERABLE_DOMAINS') or '').split(',') if domain.strip()}
+
+    def check(self, domain):
+        if domain in self.undeliverable:
+            return DomainVerdict(False, f"The domain name {domain} does not accept email.")
+        return DomainVerdict(True, None)
+
+
+RESOLVERS = {
+    'dns': DNSResolver,
+    'stub': StubResolver
+}
+
+
+class DomainVerdictCache:
+    """
+    Deliverability verdicts per email domain, filled in the background
+
+    Requests only read the cache. An unknown or expired domain is queued
+    for a background refresher thread, which asks the configured resolver
+    and caches the verdict for EMAIL_DOMAIN_VERDICT_TTL seconds.
+    Inconclusive lookups, such as timeouts, are not cached, so the domain is
+    retried the next time it is seen. Registration therefore never waits
+    on DNS, and an address is only refused once its domain is known to be
+    undeliverable.
+    """
+
+    def __init__(self, app=None):
+        self.verdicts = LRUCache()
+        self.resolver = None
+        self._queue = queue.Queue(maxsize=1000)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.checked = 0
+        self.dropped = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.verdicts = LRUCache(
+            max_entries=app.config.get('EMAIL_DOMAIN_CACHE_MAX_ENTRIES', 10000),
+            ttl=app.config.get('EMAIL_DOMAIN_VERDICT_TTL', 86400)
+        )
+        resolver = app.config.get('EMAIL_DOMAIN_RESOLVER', 'dns')
+        try:
+            self.resolver = RESOLVERS[resolver](app)
+        except KeyError:
+            raise ValueError(f"Unknown email domain resolver '{resolver}'")
+        self._queue = queue.Queue(maxsize=app.config.get('EMAIL_DOMAIN_QUEUE_SIZE', 1000))
+        app.extensions['email_domains'] = self
+
+    def get(self, domain):
+        """Return the cached DomainVerdict for a domain, scheduling a check if there is none"""
+        verdict = self.verdicts.get(domain)
+        if verdict is None:
+            self.schedule(domain)
+        return verdict
+
+    def schedule(self, domain):
+        """Queue a domain for the background refresher (at most once at a time)"""
+        if self.resolver is None:
+            return
+        with self._lock:
+            if domain in self._pending:
+                return
+            try:
+                self._queue.put_nowait(domain)
+            except queue.Full:
+                self.dropped += 1
+                return
+            self._pending.add(domain)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='email-domain-refresher', daemon=True)
+                self._thread.start()
+
+    def refresh(self, domain):
+        """Resolve a domain now and cache a definite verdict"""
+        verdict = self.resolver.check(domain)
+        self.checked += 1
+        if verdict is not None:
+            self.verdicts.set(domain, verdict)
+        return verdict
+
+    def _run(self):
+        while True:
+            domain = self._queue.get()
+            try:
+                self.refresh(domain)
+            except Exception:
+                pass  # Treated like an inconclusive lookup; the domain is retried when seen again
+            finally:
+                with self._lock:
+                    self._pending.discard(domain)
+
+    def stats(self):
+        """Return cache counters and refresher activity"""
+        data = self.verdicts.stats()
+        data['resolver'] = type(self.resolver).__name__ if self.resolver else None
+        data['pending'] = len(self._pending)
+        data['checked'] = self.checked
+        data['dropped'] = self.dropped
+        return data
+
+
+email_domains = DomainVerdictCache()
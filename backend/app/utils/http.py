@@ -0,0 +1,57 @@
+import hashlib
+from flask import request, current_app
+
+
+def make_etag(*parts):
+    """Build a strong ETag value (unquoted) from the given version parts"""
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def is_not_modified(etag=None, last_modified=None):
+    """Check the request's conditional headers against the given validators"""
+    if request.if_none_match:
+        return etag is not None and request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+
+def with_validators(response, etag=None, last_modified=None):
+    """Attach ETag / Last-Modified headers to a response"""
+    if etag is not None:
+        response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
+
+
+def not_modified_response(etag=None, last_modified=None):
+    """Return an empty 304 response carrying the validators"""
+    return with_validators(current_app.response_class(status=304), etag, last_modified)
+
+
+def json_body_response(body, status=200, etag=None, last_modified=None, variants=None):
+    """
+    Return a response for an already encoded JSON body
+
+    variants is a dict stored next to a cached body; the response
+    compressor keeps each compressed encoding of the body there.
+    """
+    response = current_app.response_class(body, status=status, mimetype='application/json')
+    response.compressed_variants = variants
+    return with_validators(response, etag, last_modified)
+
+
+def payload_response(payload):
+    """Return a response for a CachedPayload, reusing its compressed variants"""
+    return json_body_response(payload.body, etag=payload.etag, last_modified=payload.last_modified,
+                              variants=payload.variants)
+
+
+def conditional_json(data, status=200):
+    """jsonify data with a content-hash ETag, answering 304 when it matches"""
+    body = current_app.json.dumps_bytes(data)
+    etag = hashlib.sha1(body).hexdigest()
+    if is_not_modified(etag):
+        return not_modified_response(etag)
+    return json_body_response(body, status=status, etag=etag)
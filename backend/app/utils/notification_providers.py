@@ -0,0 +1,136 @@
+import smtplib
+import threading
+from email.message import EmailMessage
+import requests
+
+
+class ConsoleProvider:
+    """Prints messages instead of delivering them (development default)"""
+
+    def __init__(self, app, channel):
+        self.channel = channel
+
+    def send(self, message):
+        print(f"Sending {self.channel} to: {message.recipient}")
+        if message.subject:
+            print(f"Subject: {message.subject}")
+        print(f"Body: {message.body}")
+
+    def send_many(self, messages):
+        """Deliver messages in order; return one error string (or None on success) per message"""
+        errors = []
+        for message in messages:
+            try:
+                self.send(message)
+                errors.append(None)
+            except Exception as e:
+                errors.append(str(e))
+        return errors
+
+
+class MemoryProvider(ConsoleProvider):
+    """
+    Local stand-in that records messages in self.sent
+
+    Setting fail_next to n makes the next n deliveries fail, which is
+    enough to exercise the retry path without a real provider.
+    """
+
+    def __init__(self, app, channel):
+        super().__init__(app, channel)
+        self.sent = []
+        self.fail_next = 0
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        with self._lock:
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                raise RuntimeError('Simulated delivery failure')
+            self.sent.append(message)
+
+
+class SMTPProvider(ConsoleProvider):
+    """Sends email over SMTP (MAIL_* settings), one connection per batch"""
+
+    def __init__(self, app, channel):
+        super().__init__(app, channel)
+        self.server = app.config.get('MAIL_SERVER')
+        self.port = app.config.get('MAIL_PORT', 587)
+        self.use_tls = app.config.get('MAIL_USE_TLS', True)
+        self.username = app.config.get('MAIL_USERNAME')
+        self.password = app.config.get('MAIL_PASSWORD')
+        self.sender = app.config.get('MAIL_DEFAULT_SENDER') or self.username
+        self.timeout = app.config.get('NOTIFICATION_PROVIDER_TIMEOUT', 10)
+
+    def _connect(self):
+        connection = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        if self.use_tls:
+            connection.starttls()
+        if self.username:
+            connection.login(self.username, self.password)
+        return connection
+
+    def _build(self, message):
+        email = EmailMessage()
+        email['From'] = self.sender
+        email['To'] = message.recipient
+        email['Subject'] = message.subject or ''
+        email.set_content(message.body)
+        return email
+
+    def send(self, message):
+        with self._connect() as connection:
+            connection.send_message(self._build(message))
+
+    def send_many(self, messages):
+        try:
+            connection = self._connect()
+        except Exception as e:
+            return [str(e)] * len(messages)
+        errors = []
+        with connection:
+            for message in messages:
+                try:
+                    connection.send_message(self._build(message))
+                    errors.append(None)
+                except Exception as e:
+                    errors.append(str(e))
+        return errors
+
+
+class HTTPSMSProvider(ConsoleProvider):
+    """Sends SMS by POSTing JSON to SMS_API_URL (any HTTP gateway, or a local stand-in server)"""
+
+    def __init__(self, app, channel):
+        super().__init__(app, channel)
+        self.url = app.config.get('SMS_API_URL')
+        self.api_key = app.config.get('SMS_API_KEY')
+        self.sender = app.config.get('SMS_SENDER_ID')
+        self.timeout = app.config.get('NOTIFICATION_PROVIDER_TIMEOUT', 10)
+        self._session = requests.Session()
+
+    def send(self, message):
+        headers = {'Authorization': f'Bearer {self.api_key}'} if self.api_key else {}
+        response = self._session.post(self.url, timeout=self.timeout, headers=headers, json={
+            'to': message.recipient,
+            'from': self.sender,
+            'message': message.body
+        })
+        response.raise_for_status()
+
+
+PROVIDERS = {
+    'console': ConsoleProvider,
+    'memory': MemoryProvider,
+    'smtp': SMTPProvider,
+    'http': HTTPSMSProvider
+}
+
+
+def create_provider(app, channel, name):
+    """Build the provider configured for a channel"""
+    try:
+        return PROVIDERS[name](app, channel)
+    except KeyError:
+        raise ValueError(f"Unknown notification provider '{name}' for {channel}")
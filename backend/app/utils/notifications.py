@@ -0,0 +1,381 @@
+import atexit
+import hashlib
+import random
+import threading
+import time
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import event, select, update, text, or_, literal_column
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app import db
+from app.models.notification import Notification
+from app.utils.notification_providers import create_provider
+
+
+CHANNELS = ('email', 'sms')
+COALESCE_CHUNK_SIZE = 500
+
+# What a provider needs to deliver a claimed row, detached from the session
+OutboxMessage = namedtuple('OutboxMessage', ['id', 'channel', 'recipient', 'subject', 'body', 'attempts',
+                                             'coalesce_key'])
+
+
+def recipient_digest(recipient):
+    """Fixed-length hex digest of a recipient, so coalesce keys stay within the column whatever its length"""
+    return hashlib.sha256(recipient.encode('utf-8')).hexdigest()
+
+
+def enqueue_notification(channel, recipient, body, subject=None, coalesce_key=None, debounce=None,
+                         commit=False):
+    """
+    Add a notification to the outbox
+
+    The row joins the caller's transaction, so it is only delivered if that
+    transaction commits. Pass commit=True when there is nothing else to
+    commit. With a coalesce_key the message goes through
+    enqueue_coalesced() and the return value is the outbox row ID;
+    otherwise it is the new Notification.
+    """
+    if coalesce_key is not None:
+        ids = enqueue_coalesced([{'channel': channel, 'recipient': recipient, 'subject': subject,
+                                  'body': body, 'coalesce_key': coalesce_key}], debounce, commit)
+        return ids[0] if ids else None
+    if channel not in CHANNELS:
+        raise ValueError(f"Unknown notification channel '{channel}'")
+    notification = Notification(channel=channel, recipient=recipient, subject=subject, body=body)
+    db.session.add(notification)
+    _queued(db.session, created=1)
+    if commit:
+        db.session.commit()
+    return notification
+
+
+def enqueue_coalesced(messages, debounce=None, commit=False):
+    """
+    Add messages to the outbox, merging them per coalesce_key
+
+    Each message is a dict with channel, recipient, subject, body and
+    coalesce_key. A key that already has an undelivered row updates that
+    row in place (latest content wins) instead of adding one. A message
+    identical to the pending one is dropped. New rows become due after
+    the debounce window (NOTIFICATION_DEBOUNCE seconds by default), and
+    later updates do not push that out, so a burst of events is sent as one
+    digest at most one window after the first event. Returns the IDs of the
+    rows inserted or updated.
+    """
+    debounce = notification_dispatcher.debounce if debounce is None else debounce
+    due_at = datetime.utcnow() + timedelta(seconds=debounce)
+    
+    # Merge repeats within this batch first: one statement cannot touch a row twice
+    latest = {}
+    coalesced = deduplicated = 0
+    for message in messages:
+        if message['channel'] not in CHANNELS:
+            raise ValueError(f"Unknown notification channel '{message['channel']}'")
+        previous = latest.get(message['coalesce_key'])
+        if previous is not None:
+            if (previous['body'], previous.get('subject')) == (message['body'], message.get('subject')):
+                deduplicated += 1
+            else:
+                coalesced += 1
+        latest[message['coalesce_key']] = message
+    rows = [dict(message, next_attempt_at=due_at) for message in latest.values()]
+    
+    ids = []
+    created = 0
+    for start in range(0, len(rows), COALESCE_CHUNK_SIZE):
+        stmt = insert(Notification).values(rows[start:start + COALESCE_CHUNK_SIZE])
+        excluded = stmt.excluded
+        result = db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[Notification.coalesce_key],
+            index_where=text("status = 'pending'"),
+            set_={'subject': excluded.subject, 'body': excluded.body, 'last_error': None},
+            where=or_(Notification.body != excluded.body, Notification.subject.is_distinct_from(excluded.subject))
+        ).returning(Notification.id, literal_column('xmax = 0')))
+        for notification_id, inserted in result:
+            ids.append(notification_id)
+            created += bool(inserted)
+    
+    # Returned but not inserted: merged into a pending row; not returned: identical to it
+    _queued(db.session, created=created, coalesced=coalesced + len(ids) - created,
+            deduplicated=deduplicated + len(rows) - len(ids))
+    if commit:
+        db.session.commit()
+    return ids
+
+
+def _queued(session, created=0, coalesced=0, deduplicated=0):
+    """Count queued messages and wake the dispatcher once the transaction commits"""
+    counts = session.info.setdefault('notifications_enqueued', [0, 0, 0])
+    counts[0] += created
+    counts[1] += coalesced
+    counts[2] += deduplicated
+    notification_dispatcher.ensure_started()
+
+
+@event.listens_for(Session, 'after_commit')
+def _wake_dispatcher(session):
+    counts = session.info.pop('notifications_enqueued', None)
+    if counts:
+        notification_dispatcher.record_enqueued(*counts)
+        if counts[0] or counts[1]:
+            notification_dispatcher.wake()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_enqueued(session):
+    session.info.pop('notifications_enqueued', None)
+
+
+class NotificationDispatcher:
+    """
+    Background delivery of the notifications outbox
+
+    A dispatcher thread claims due rows in batches. Claiming is a single
+    UPDATE over a FOR UPDATE SKIP LOCKED selection, so several workers can
+    drain the same table without delivering a row twice. The claim also
+    leases each row for NOTIFICATION_LEASE seconds, so rows from a worker
+    that died mid-delivery are picked up again. Each channel has its own
+    thread pool, sized by NOTIFICATION_<CHANNEL>_CONCURRENCY, which limits
+    the connections to each provider. Failed deliveries are retried with
+    exponential backoff until NOTIFICATION_MAX_ATTEMPTS is reached. A failed
+    row whose coalesce_key got a newer pending message while it was being
+    sent is marked superseded instead, since the newer row carries the latest
+    content.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = False
+        self.providers = {}
+        self._pools = {}
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self.debounce = 60
+        self.created = 0
+        self.coalesced = 0
+        self.deduplicated = 0
+        self.sent = 0
+        self.retried = 0
+        self.superseded = 0
+        self.failed = 0
+        self.delivery_seconds = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('NOTIFICATION_DISPATCHER_ENABLED', True)
+        self.batch_size = app.config.get('NOTIFICATION_BATCH_SIZE', 50)
+        self.poll_interval = app.config.get('NOTIFICATION_POLL_INTERVAL', 5)
+        self.lease = app.config.get('NOTIFICATION_LEASE', 300)
+        self.max_attempts = app.config.get('NOTIFICATION_MAX_ATTEMPTS', 5)
+        self.retry_base = app.config.get('NOTIFICATION_RETRY_BASE', 30)
+        self.retry_max = app.config.get('NOTIFICATION_RETRY_MAX', 3600)
+        self.debounce = app.config.get('NOTIFICATION_DEBOUNCE', 60)
+        self.concurrency = {
+            'email': app.config.get('NOTIFICATION_EMAIL_CONCURRENCY', 4),
+            'sms': app.config.get('NOTIFICATION_SMS_CONCURRENCY', 4)
+        }
+        self.providers = {
+            'email': create_provider(app, 'email', app.config.get('NOTIFICATION_EMAIL_PROVIDER', 'console')),
+            'sms': create_provider(app, 'sms', app.config.get('NOTIFICATION_SMS_PROVIDER', 'console'))
+        }
+        # Rows enqueued by other processes are drained once this worker serves a request
+        app.before_request(self.ensure_started)
+        app.extensions['notification_dispatcher'] = self
+
+    def ensure_started(self):
+        """Start the dispatcher thread in this process if it is not running"""
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._start_pools()
+            self._thread = threading.Thread(target=self._run, name='notification-dispatcher', daemon=True)
+            self._thread.start()
+            atexit.register(self.shutdown)
+
+    def _start_pools(self):
+        self._pools = {channel: ThreadPoolExecutor(max_workers=self.concurrency[channel],
+                                                   thread_name_prefix=f'notify-{channel}')
+                       for channel in CHANNELS}
+
+    def record_enqueued(self, created, coalesced, deduplicated):
+        """Count committed messages: new outbox rows, merges into pending rows and dropped duplicates"""
+        with self._lock:
+            self.created += created
+            self.coalesced += coalesced
+            self.deduplicated += deduplicated
+
+    def wake(self):
+        """Check the outbox now instead of at the next poll"""
+        self._wake.set()
+
+    def _claim(self):
+        now = datetime.utcnow()
+        due = select(Notification.id)\
+            .where(Notification.status.in_(['pending', 'sending']), Notification.next_attempt_at <= now)\
+            .order_by(Notification.next_attempt_at)\
+            .limit(self.batch_size)\
+            .with_for_update(skip_locked=True)
+        rows = db.session.execute(
+            update(Notification)
+            .where(Notification.id.in_(due))
+            .values(status='sending', attempts=Notification.attempts + 1,
+                    next_attempt_at=now + timedelta(seconds=self.lease))
+            .returning(Notification.id, Notification.channel, Notification.recipient,
+                       Notification.subject, Notification.body, Notification.attempts,
+                       Notification.coalesce_key)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.session.commit()
+        return [OutboxMessage(*row) for row in rows]
+
+    def _deliver(self, messages):
+        by_channel = defaultdict(list)
+        for message in messages:
+            by_channel[message.channel].append(message)
+        futures = []
+        for channel, group in by_channel.items():
+            # Spread the group over the channel's pool, one chunk per allowed connection
+            chunks = self.concurrency[channel]
+            for i in range(chunks):
+                chunk = group[i::chunks]
+                if chunk:
+                    futures.append((chunk, self._pools[channel].submit(self.providers[channel].send_many, chunk)))
+        results = []
+        for chunk, future in futures:
+            try:
+                errors = future.result()
+            except Exception as e:
+                errors = [str(e)] * len(chunk)
+            results.extend(zip(chunk, errors))
+        return results
+
+    def _backoff(self, attempts):
+        delay = min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+        return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+    def _record(self, results):
+        now = datetime.utcnow()
+        finished = []
+        retries = []
+        for message, error in results:
+            if error is None:
+                finished.append({'id': message.id, 'status': 'sent', 'sent_at': now, 'last_error': None})
+            elif message.attempts >= self.max_attempts:
+                finished.append({'id': message.id, 'status': 'failed', 'last_error': error})
+            else:
+                retries.append((message, {'id': message.id, 'status': 'pending', 'last_error': error,
+                                          'next_attempt_at': now + self._backoff(message.attempts)}))
+        
+        # Deliveries are committed on their own, so nothing that goes wrong with the retries can undo them
+        if finished:
+            db.session.execute(update(Notification), finished)
+            db.session.commit()
+            sent = sum(1 for row in finished if row['status'] == 'sent')
+            self.sent += sent
+            self.failed += len(finished) - sent
+        if retries:
+            superseded = self._requeue(retries)
+            self.superseded += superseded
+            self.retried += len(retries) - superseded
+
+    def _requeue(self, retries):
+        """
+        Put failed rows back to pending for another attempt; return how many were superseded
+
+        The partial unique index allows one pending row per coalesce_key. If a
+        message for the key was queued while this row was being sent, that
+        newer row already holds the latest content, so the failed row is
+        marked superseded rather than made pending again.
+        """
+        keys = {message.coalesce_key for message, _ in retries if message.coalesce_key is not None}
+        pending = set(db.session.scalars(
+            select(Notification.coalesce_key)
+            .where(Notification.status == 'pending', Notification.coalesce_key.in_(keys))
+        )) if keys else set()
+        updates = [dict(row, status='superseded') if message.coalesce_key in pending else row
+                   for message, row in retries]
+        try:
+            with db.session.begin_nested():
+                db.session.execute(update(Notification), updates)
+        except IntegrityError:
+            # A message for one of the keys was queued after the check: settle the rows one at a time
+            for i, row in enumerate(updates):
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(update(Notification), [row])
+                except IntegrityError:
+                    updates[i] = dict(row, status='superseded')
+                    db.session.execute(update(Notification), [updates[i]])
+        db.session.commit()
+        return sum(1 for row in updates if row['status'] == 'superseded')
+
+    def dispatch_once(self):
+        """Claim and deliver one batch; return the number of notifications processed"""
+        with self.app.app_context():
+            messages = self._claim()
+            if messages and not self._pools:
+                # Called directly (tests, scripts) without the dispatcher thread
+                with self._lock:
+                    if not self._pools:
+                        self._start_pools()
+            if messages:
+                started = time.monotonic()
+                results = self._deliver(messages)
+                self.delivery_seconds += time.monotonic() - started
+                self._record(results)
+            return len(messages)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                processed = self.dispatch_once()
+            except Exception as e:
+                self.app.logger.error('Notification dispatch failed: %s', e)
+                processed = 0
+            if processed < self.batch_size:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def shutdown(self, timeout=5):
+        """Stop the dispatcher; undelivered rows stay in the outbox for the next worker"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        for pool in self._pools.values():
+            pool.shutdown(wait=False)
+        self._pools = {}
+
+    def stats(self):
+        """Return queueing and delivery counters for this worker"""
+        queued = self.created + self.coalesced + self.deduplicated
+        return {
+            'enabled': self.enabled,
+            'providers': {channel: type(provider).__name__ for channel, provider in self.providers.items()},
+            'debounce_seconds': self.debounce,
+            'queued': queued,
+            'created': self.created,
+            'coalesced': self.coalesced,
+            'deduplicated': self.deduplicated,
+            # Share of queued messages that did not become a delivery of their own
+            'volume_reduction': round(1 - self.created / queued, 4) if queued else None,
+            'sent': self.sent,
+            'retried': self.retried,
+            'superseded': self.superseded,
+            'failed': self.failed,
+            'delivered_per_second': round(self.sent / self.delivery_seconds, 1) if self.delivery_seconds else None
+        }
+
+
+notification_dispatcher = NotificationDispatcher()
@@ -0,0 +1,98 @@
+import hashlib
+import os
+import threading
+from sqlalchemy import select
+from app import db
+
+
+class NumberSpaceExhausted(RuntimeError):
+    """Raised when every number in an allocator's space has been handed out"""
+
+
+class BlockNumberAllocator:
+    """
+    Allocates unique, non-sequential-looking reference numbers
+
+    Each worker reserves a block of serials with one nextval() on a database
+    sequence and hands numbers out of it locally. Serials are mapped onto the
+    number space with a keyed permutation: a Feistel network over the
+    smallest even-width binary domain that covers 10**digits, cycle-walked
+    back into range. It is a bijection, so distinct serials always give
+    distinct numbers, and without REFERENCE_NUMBER_KEY the next number
+    cannot be derived from earlier ones.
+    """
+
+    rounds = 6
+
+    def __init__(self, sequence_name, prefix, digits, block_size=100):
+        self.sequence = db.Sequence(sequence_name, start=1, metadata=db.metadata)
+        self.prefix = prefix
+        self.digits = digits
+        self.modulus = 10 ** digits
+        self.half_bits = ((self.modulus - 1).bit_length() + 1) // 2
+        self.half_mask = (1 << self.half_bits) - 1
+        self.key = None
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._pid = None
+        self._next = 0
+        self._end = 0
+
+    def init_app(self, app):
+        secret = app.config.get('REFERENCE_NUMBER_KEY') or app.config['SECRET_KEY']
+        # One derived key per allocator, so tracking and quote numbers use unrelated permutations
+        self.key = hashlib.sha256(f"{secret}:{self.prefix}".encode('utf-8')).digest()
+
+    def _round(self, i, half):
+        digest = hashlib.blake2b(half.to_bytes(8, 'big'), key=self.key, digest_size=8,
+                                 person=i.to_bytes(16, 'big')).digest()
+        return int.from_bytes(digest, 'big') & self.half_mask
+
+    def _permute(self, value):
+        left, right = value >> self.half_bits, value & self.half_mask
+        for i in range(self.rounds):
+            left, right = right, left ^ self._round(i, right)
+        return (left << self.half_bits) | right
+
+    def _reserve_block(self):
+        with db.engine.connect() as conn:
+            block = conn.execute(select(self.sequence.next_value())).scalar()
+        start = (block - 1) * self.block_size
+        if start + self.block_size > self.modulus:
+            raise NumberSpaceExhausted(f"{self.prefix} number space exhausted")
+        self._next, self._end = start, start + self.block_size
+
+    def _format(self, serial):
+        number = self._permute(serial)
+        while number >= self.modulus:
+            number = self._permute(number)
+        return f"{self.prefix}{number:0{self.digits}d}"
+
+    def allocate_many(self, count):
+        """Return count unique numbers, reserving new blocks as needed"""
+        if self.key is None:
+            raise RuntimeError(f"{self.prefix} number allocator used before init_app()")
+        numbers = []
+        with self._lock:
+            if self._pid != os.getpid():
+                # Never share a block with a forked parent or sibling
+                self._pid = os.getpid()
+                self._next = self._end = 0
+            while len(numbers) < count:
+                if self._next >= self._end:
+                    self._reserve_block()
+                take = min(count - len(numbers), self._end - self._next)
+                numbers.extend(self._format(serial) for serial in range(self._next, self._next + take))
+                self._next += take
+        return numbers
+
+    def allocate(self):
+        """Return one unique number"""
+        return self.allocate_many(1)[0]
+
+
+# Widths differ from every earlier format (legacy random RD + 7 digits and
+# QT + 8 characters, then RD + 9 and QT + 10 digits) so allocated numbers can
+# never collide with existing rows.
+tracking_numbers = BlockNumberAllocator('tracking_number_block_seq', 'RD', 10)
+quote_numbers = BlockNumberAllocator('quote_number_block_seq', 'QT', 12)
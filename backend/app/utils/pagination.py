@@ -0,0 +1,76 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import text, tuple_
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(created_at, row_id, direction):
+    """Encode a (created_at, id) position into an opaque cursor string"""
+    raw = json.dumps([created_at.isoformat(), row_id, direction], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor into (created_at, id, direction)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id, direction = json.loads(base64.urlsafe_b64decode(padded))
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+        return datetime.fromisoformat(created_at), int(row_id), direction
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Invalid pagination cursor') from e
+
+
+def keyset_page(query, model, per_page, cursor=None):
+    """
+    Fetch one page of model rows ordered by (created_at, id) descending
+
+    Uses a row-value comparison on the (created_at, id) index instead of
+    OFFSET, so every page costs the same regardless of depth.
+    Returns (items, next_cursor, prev_cursor).
+    """
+    order_key = tuple_(model.created_at, model.id)
+    direction = 'next'
+    if cursor:
+        created_at, row_id, direction = decode_cursor(cursor)
+        if direction == 'next':
+            query = query.filter(order_key < tuple_(created_at, row_id))
+        else:
+            query = query.filter(order_key > tuple_(created_at, row_id))
+
+    if direction == 'next':
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        query = query.order_by(model.created_at.asc(), model.id.asc())
+
+    items = query.limit(per_page + 1).all()
+    has_more = len(items) > per_page
+    items = items[:per_page]
+    if direction == 'prev':
+        items.reverse()
+
+    if not items:
+        return items, None, None
+
+    first, last = items[0], items[-1]
+    if direction == 'next':
+        next_cursor = encode_cursor(last.created_at, last.id, 'next') if has_more else None
+        prev_cursor = encode_cursor(first.created_at, first.id, 'prev') if cursor else None
+    else:
+        next_cursor = encode_cursor(last.created_at, last.id, 'next')
+        prev_cursor = encode_cursor(first.created_at, first.id, 'prev') if has_more else None
+    return items, next_cursor, prev_cursor
+
+
+def estimated_row_count(session, table_name):
+    """Return the planner's row estimate for a table (PostgreSQL pg_class.reltuples)"""
+    estimate = session.execute(
+        text('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)'),
+        {'table': table_name}
+    ).scalar()
+    return max(int(estimate or 0), 0)
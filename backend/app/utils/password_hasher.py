@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when a password operation cannot be done now (pool saturated, too slow or restarting)"""
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(password, password_hash):
+    return bcrypt.checkpw(password, password_hash)
+
+
+def hash_rounds(password_hash):
+    """Return the cost factor of a bcrypt hash ('$2b$12$...' -> 12), or None if unreadable"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a small process pool instead of the request thread
+
+    At most PASSWORD_POOL_SIZE hashes run at once and PASSWORD_QUEUE_LIMIT
+    more may wait. Beyond that, PasswordHasherBusy is raised at once, so a
+    login burst gets fast 503s instead of tying up every web worker. An
+    operation that takes longer than PASSWORD_TIMEOUT, or a pool whose
+    worker died, also raises PasswordHasherBusy; a broken pool is replaced
+    on the next call. The pool is created lazily in each worker process,
+    with PASSWORD_POOL_START_METHOD ('forkserver' by default, 'spawn'
+    where that is unavailable), so the hashing processes never inherit the
+    web worker's threads, locks or database connections. Without an app
+    (seed scripts, the shell), hashing runs inline.
+    """
+
+    def __init__(self, app=None):
+        self.rounds = 12
+        self.pool_size = 2
+        self.queue_limit = 16
+        self.timeout = 10
+        self.start_method = 'forkserver'
+        self.enabled = False
+        self._executor = None
+        self._pid = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.timeouts = 0
+        self.broken_pools = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.rounds = app.config.get('BCRYPT_ROUNDS', 12)
+        self.pool_size = app.config.get('PASSWORD_POOL_SIZE', 2)
+        self.queue_limit = app.config.get('PASSWORD_QUEUE_LIMIT', 16)
+        self.timeout = app.config.get('PASSWORD_TIMEOUT', 10)
+        self.start_method = app.config.get('PASSWORD_POOL_START_METHOD', 'forkserver')
+        self.enabled = self.pool_size > 0
+        app.extensions['password_hasher'] = self
+
+    def _mp_context(self):
+        method = self.start_method
+        if method not in multiprocessing.get_all_start_methods():
+            method = 'spawn'
+        context = multiprocessing.get_context(method)
+        if method == 'forkserver':
+            # Fork pool processes from a server that has already imported bcrypt and this module
+            context.set_forkserver_preload([__name__])
+        return context
+
+    def _get_executor(self):
+        with self._lock:
+            if self._pid != os.getpid() or self._executor is None:
+                # Never reuse a pool inherited from a forked parent
+                self._pid = os.getpid()
+                self._executor = ProcessPoolExecutor(max_workers=self.pool_size, mp_context=self._mp_context())
+                self._slots = threading.BoundedSemaphore(self.pool_size + self.queue_limit)
+            return self._executor
+
+    def _discard_executor(self, executor):
+        """Drop a broken pool so the next call starts a new one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self.broken_pools += 1
+        executor.shutdown(wait=False)
+
+    def _run(self, fn, *args):
+        if not self.enabled:
+            return fn(*args)
+        executor = self._get_executor()
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PasswordHasherBusy('Too many password operations in progress')
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            slots.release()
+            self._discard_executor(executor)
+            raise PasswordHasherBusy('Password hashing pool is restarting')
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # The slot is released when the operation finishes in the pool
+            self.timeouts += 1
+            raise PasswordHasherBusy('Password operation timed out')
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+            raise PasswordHasherBusy('Password hashing pool is restarting')
+
+    def hash(self, password):
+        """Return a bcrypt hash of password at the configured cost"""
+        return self._run(_hash, password.encode('utf-8'), self.rounds)
+
+    def verify(self, password, password_hash):
+        """Check password against a bcrypt hash"""
+        return self._run(_check, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def needs_rehash(self, password_hash):
+        """True if the hash was made with a lower cost than the configured one (never downgrades)"""
+        rounds = hash_rounds(password_hash)
+        return rounds is None or rounds < self.rounds
+
+    def stats(self):
+        """Return pool settings and the number of rejected operations"""
+        return {
+            'enabled': self.enabled,
+            'rounds': self.rounds,
+            'pool_size': self.pool_size,
+            'queue_limit': self.queue_limit,
+            'start_method': self.start_method,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts,
+            'broken_pools': self.broken_pools
+        }
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,110 @@
+from bisect import bisect_right
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+
+VOLUMETRIC_FACTOR = Decimal('166')  # CBM to kg conversion
+CENTS = Decimal('0.01')
+MILLIS = Decimal('0.001')
+HUNDRED = Decimal('100')
+NUMERIC_PRECISION = 10  # Total digits of the Numeric(10, 2) / Numeric(10, 3) columns
+
+
+class InvalidAmount(ValueError):
+    """Raised for a value that a Numeric(10, 2) / Numeric(10, 3) column cannot store"""
+
+
+def to_numeric(value, places=CENTS):
+    """
+    Round a value the way a Numeric(10, 2) / Numeric(10, 3) column stores it
+
+    Floats are converted through their shortest repr, which is also the literal
+    the database driver sends, and rounded half away from zero like PostgreSQL.
+    Values that are not numbers, not finite or too large for the column raise
+    InvalidAmount.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, Decimal):
+        try:
+            value = Decimal(repr(value)) if isinstance(value, float) else Decimal(value)
+        except (InvalidOperation, TypeError, ValueError):
+            raise InvalidAmount('must be a number')
+    if not value.is_finite():
+        raise InvalidAmount('must be a finite number')
+    limit = Decimal(10) ** (NUMERIC_PRECISION + places.as_tuple().exponent)
+    # Only in-range values are quantized; quantize fails on very large ones
+    if abs(value) < limit:
+        value = value.quantize(places, rounding=ROUND_HALF_UP)
+    if abs(value) >= limit:
+        raise InvalidAmount(f'must be less than {limit:,}')
+    return value
+
+
+def chargeable_weight(actual_weight, volume_cbm):
+    """Chargeable weight (higher of actual or volumetric), or None without an actual weight"""
+    actual_weight = to_numeric(actual_weight)
+    volume_cbm = to_numeric(volume_cbm, MILLIS)
+    if actual_weight and volume_cbm:
+        return to_numeric(max(actual_weight, volume_cbm * VOLUMETRIC_FACTOR))
+    if actual_weight:
+        return actual_weight
+    return None
+
+
+PriceResult = namedtuple('PriceResult', ['chargeable_weight', 'rate', 'total_cost'])
+
+
+class RateTable:
+    """
+    Pricing rules for one shipping method
+
+    Tier breaks are kept in a sorted list and the applicable tier is found
+    with bisect, so a lookup costs O(log tiers). Below the first break, or
+    when there are no tiers, base_rate applies. The cost is quantity x rate,
+    raised to minimum_charge and then increased by surcharge_percent. Each
+    step is rounded to cents like the Numeric(10, 2) columns.
+    """
+
+    __slots__ = ('rate_type', 'base_rate', 'breaks', 'rates', 'minimum_charge', 'surcharge_percent')
+
+    def __init__(self, rate_type, base_rate, tiers=(), minimum_charge=None, surcharge_percent=None):
+        tiers = sorted((to_numeric(min_quantity, MILLIS), to_numeric(rate)) for min_quantity, rate in tiers)
+        self.rate_type = rate_type
+        self.base_rate = to_numeric(base_rate)
+        self.breaks = [min_quantity for min_quantity, _ in tiers]
+        self.rates = [rate for _, rate in tiers]
+        self.minimum_charge = to_numeric(minimum_charge)
+        self.surcharge_percent = to_numeric(surcharge_percent)
+
+    def rate_for(self, quantity):
+        """Return the rate of the tier that quantity falls into"""
+        index = bisect_right(self.breaks, quantity) - 1
+        return self.rates[index] if index >= 0 else self.base_rate
+
+    def price(self, actual_weight, volume_cbm):
+        """Price one parcel; total_cost is None when the parcel cannot be priced"""
+        chargeable = chargeable_weight(actual_weight, volume_cbm)
+        volume_cbm = to_numeric(volume_cbm, MILLIS)
+        if self.rate_type == 'per_kg':
+            quantity = chargeable
+        elif self.rate_type == 'per_cbm':
+            quantity = volume_cbm
+        else:
+            return PriceResult(chargeable, self.base_rate, None)
+
+        rate = self.rate_for(quantity) if quantity else self.base_rate
+        if not (chargeable and rate and quantity):
+            return PriceResult(chargeable, rate, None)
+
+        cost = to_numeric(quantity * rate)
+        if self.minimum_charge and cost < self.minimum_charge:
+            cost = self.minimum_charge
+        if self.surcharge_percent:
+            cost += to_numeric(cost * self.surcharge_percent / HUNDRED)
+        return PriceResult(chargeable, rate, cost)
+
+    def price_many(self, parcels):
+        """Price a sequence of (actual_weight, volume_cbm) parcels"""
+        price = self.price
+        return [price(actual_weight, volume_cbm) for actual_weight, volume_cbm in parcels]
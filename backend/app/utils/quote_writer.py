@@ -0,0 +1,189 @@
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import insert, update
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models.quote import Quote
+
+
+def expire_quotes(today=None):
+    """Mark every open quote past its valid_until date as expired in one UPDATE"""
+    today = today or datetime.utcnow().date()
+    result = db.session.execute(
+        update(Quote)
+        .where(Quote.status.in_(['draft', 'sent']), Quote.valid_until < today)
+        .values(status='expired')
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+class QuoteWriter:
+    """
+    Write-behind persistence for calculated quotes
+
+    Requests put quote rows on a bounded queue and return at once. A
+    background thread drains the queue and writes each batch with one
+    multi-row INSERT and one commit. If the queue is full, the row is
+    written inline, so quotes are never dropped under load. If a batch
+    INSERT fails, its rows are retried one at a time so a single bad row
+    only loses itself; lost rows are logged and counted as failed. The same
+    thread runs expire_quotes() every QUOTE_SWEEP_INTERVAL seconds, the
+    first time one interval after it starts. The thread is started when the
+    process serves its first request or submits its first quote, so
+    scripts and CLI commands that only build the app never start it. Rows
+    still queued when the process exits are flushed by an atexit hook.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = True
+        self._queue = queue.Queue(maxsize=10000)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._exit_hook = False
+        self.written = 0
+        self.batches = 0
+        self.overflow_writes = 0
+        self.retried_batches = 0
+        self.failed = 0
+        self.expired = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('QUOTE_PERSIST_ENABLED', True)
+        self.batch_size = app.config.get('QUOTE_WRITE_BATCH_SIZE', 200)
+        self.flush_interval = app.config.get('QUOTE_FLUSH_INTERVAL', 1.0)
+        self.sweep_interval = app.config.get('QUOTE_SWEEP_INTERVAL', 3600)
+        self._queue = queue.Queue(maxsize=app.config.get('QUOTE_WRITE_QUEUE_SIZE', 10000))
+        # Expiry sweeps run in every serving worker, even one that never calculates a quote
+        app.before_request(self.ensure_started)
+        app.extensions['quote_writer'] = self
+
+    def ensure_started(self):
+        """Start the writer thread in this process if it is not running"""
+        # Threads do not survive a fork, so a forked worker starts its own on first use
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='quote-writer', daemon=True)
+            self._thread.start()
+            if not self._exit_hook:
+                atexit.register(self.shutdown)
+                self._exit_hook = True
+
+    def submit(self, row):
+        """Queue a quote row (a dict of Quote column values) for persistence"""
+        if not self.enabled:
+            return
+        self.ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.overflow_writes += 1
+            self._write([row])
+
+    def _drain(self, first=None):
+        rows = [] if first is None else [first]
+        while len(rows) < self.batch_size:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _write(self, rows):
+        with self.app.app_context():
+            try:
+                db.session.execute(insert(Quote), rows)
+                db.session.commit()
+                self.written += len(rows)
+                self.batches += 1
+                return
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                self.app.logger.warning('Failed to persist a batch of %d quotes, retrying one by one: %s',
+                                        len(rows), e)
+            self.retried_batches += 1
+            self._write_each(rows)
+
+    def _write_each(self, rows):
+        """Insert rows one at a time, each in a savepoint, so only the rows the database rejects are lost"""
+        written = 0
+        try:
+            for row in rows:
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(insert(Quote), [row])
+                    written += 1
+                except SQLAlchemyError as e:
+                    self.app.logger.error('Lost quote %s: %s', row.get('quote_number'), e)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            # The database itself failed: nothing from this batch was saved
+            db.session.rollback()
+            written = 0
+            self.app.logger.error('Lost %d quotes: %s', len(rows), e)
+        self.written += written
+        self.failed += len(rows) - written
+
+    def _sweep(self):
+        with self.app.app_context():
+            try:
+                self.expired += expire_quotes()
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.error('Quote expiry sweep failed: %s', e)
+
+    def _run(self):
+        next_sweep = time.monotonic() + self.sweep_interval
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                first = None
+            if first is not None:
+                self._write(self._drain(first))
+            if self.sweep_interval and time.monotonic() >= next_sweep:
+                self._sweep()
+                next_sweep = time.monotonic() + self.sweep_interval
+
+    def flush(self):
+        """Write every queued row now"""
+        rows = self._drain()
+        while rows:
+            self._write(rows)
+            rows = self._drain()
+
+    def shutdown(self, timeout=5):
+        """Stop the background thread and flush what is left"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def stats(self):
+        """Return queue depth and write counters"""
+        return {
+            'enabled': self.enabled,
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'batches': self.batches,
+            'overflow_writes': self.overflow_writes,
+            'retried_batches': self.retried_batches,
+            'failed': self.failed,
+            'expired': self.expired
+        }
+
+
+quote_writer = QuoteWriter()
@@ -0,0 +1,159 @@
+import heapq
+import math
+import threading
+import time
+
+
+def take_token(tokens, updated_at, now, capacity, per_second):
+    """
+    One token-bucket step: refill since updated_at, then try to take a token
+
+    Returns (remaining tokens, retry_after seconds); retry_after is 0 when
+    the token was taken.
+    """
+    if tokens is None:
+        tokens = capacity
+    else:
+        tokens = min(capacity, tokens + (now - updated_at) * per_second)
+    if tokens >= 1:
+        return tokens - 1, 0
+    return tokens, (1 - tokens) / per_second
+
+
+class LocalBuckets:
+    """
+    Per-process token buckets, pruned once they hold more than max_entries keys
+
+    Pruning drops buckets that have refilled completely, then the ones
+    closest to full. A throttled bucket is the furthest from full, so
+    flooding the limiter with new keys evicts those keys first and cannot
+    reset the buckets that are holding an attacker back.
+    """
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, per_second):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.get(key, (None, now, now))
+            tokens, retry_after = take_token(tokens, updated_at, now, capacity, per_second)
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / per_second)
+            if len(self._buckets) > self.max_entries:
+                self._prune(now)
+            return retry_after
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _prune(self, now):
+        # A bucket that has refilled completely carries no state worth keeping
+        for key in [key for key, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+            del self._buckets[key]
+        # Still too many: drop the buckets nearest to full, down to 90% so pruning does not run on every call
+        excess = len(self._buckets) - int(self.max_entries * 0.9)
+        if excess > 0:
+            for key, _ in heapq.nsmallest(excess, self._buckets.items(), key=lambda item: item[1][2]):
+                del self._buckets[key]
+
+
+class RedisBuckets:
+    """Token buckets stored in Redis and shared by every worker (requires the redis package)"""
+
+    # Same step as take_token(), run atomically on the server with its clock
+    CONSUME_SCRIPT = """
+    local capacity, per_second = tonumber(ARGV[1]), tonumber(ARGV[2])
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+    local tokens = capacity
+    if state[1] then
+        tokens = math.min(capacity, tonumber(state[1]) + (now - tonumber(state[2])) * per_second)
+    end
+    local retry_after = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        retry_after = (1 - tokens) / per_second
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / per_second))
+    return tostring(retry_after)
+    """
+
+
+    def __init__(self, url):
+        import redis
+        self._consume = redis.Redis.from_url(url).register_script(self.CONSUME_SCRIPT)
+
+    def consume(self, key, capacity, per_second):
+        """Take a token from the bucket stored under key; return seconds to wait, or 0"""
+        return float(self._consume(keys=[key], args=[capacity, per_second]))
+
+
+def create_buckets(url, max_entries=100000):
+    """Build the bucket store for a backend URL: a redis:// URL is shared, anything else stays in this process"""
+    if url and not url.startswith('memory://'):
+        return RedisBuckets(url)
+    return LocalBuckets(max_entries)
+
+
+class LoginRateLimiter:
+    """
+    Token-bucket throttling for login attempts, keyed by client IP and by email
+
+    Each key gets a bucket of LOGIN_*_BURST attempts that refills at
+    LOGIN_*_PER_MINUTE. Buckets live in this process unless
+    RATE_LIMIT_BACKEND_URL is a redis:// URL. Then all workers draw on the
+    same buckets. The IP is request.remote_addr, which is only the client's
+    address behind a reverse proxy when TRUSTED_PROXIES is set.
+    """
+
+    key_prefix = 'login-rate:'
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.limits = {}
+        self.buckets = LocalBuckets()
+        self.rejected = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('LOGIN_RATE_LIMIT_ENABLED', True)
+        self.limits = {
+            'ip': (app.config.get('LOGIN_IP_BURST', 20), app.config.get('LOGIN_IP_PER_MINUTE', 10) / 60),
+            'email': (app.config.get('LOGIN_EMAIL_BURST', 5), app.config.get('LOGIN_EMAIL_PER_MINUTE', 2) / 60)
+        }
+        self.buckets = create_buckets(app.config.get('RATE_LIMIT_BACKEND_URL'),
+                                      app.config.get('LOGIN_RATE_LIMIT_MAX_KEYS', 100000))
+        app.extensions['login_rate_limiter'] = self
+
+    def _consume(self, kind, value):
+        capacity, per_second = self.limits[kind]
+        return self.buckets.consume(f"{self.key_prefix}{kind}:{value}", capacity, per_second)
+
+    def check(self, ip, email):
+        """Take one attempt from the IP and email buckets; return whole seconds to wait, or 0"""
+        if not self.enabled:
+            return 0
+        retry_after = self._consume('ip', ip or 'unknown')
+        if not retry_after and email:
+            retry_after = self._consume('email', email.strip().lower())
+        if retry_after:
+            self.rejected += 1
+            return max(1, math.ceil(retry_after))
+        return 0
+
+    def stats(self):
+        """Return limiter settings and the number of rejected attempts"""
+        return {
+            'enabled': self.enabled,
+            'shared_backend': type(self.buckets).__name__ if isinstance(self.buckets, RedisBuckets) else None,
+            'rejected': self.rejected
+        }
+
+
+login_limiter = LoginRateLimiter()
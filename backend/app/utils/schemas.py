@@ -0,0 +1,264 @@
+"""
+Declarative schemas for JSON request bodies
+
+Schemas validate and convert what clients send. Responses are not
+described here; they are still built by the models' to_dict() methods
+and the views.
+"""
+import re
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from functools import wraps
+from flask import request, jsonify
+from app.utils.pricing import to_numeric, CENTS, InvalidAmount
+
+INTEGER_PATTERN = re.compile(r'[+-]?[0-9]+')
+# Range of the PostgreSQL integer columns these values are stored in
+INTEGER_MIN, INTEGER_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+class ValidationError(ValueError):
+    """Raised by Schema.load with a {field: message} dict of every problem found"""
+
+    def __init__(self, errors):
+        super().__init__('Invalid request')
+        self.errors = errors
+
+
+class Field(ABC):
+    """
+    Base request field
+
+    A field is compiled into a single converter function when its schema
+    class is created. The converter takes the raw JSON value and returns the
+    cleaned value, or raises ValueError with the message reported to the
+    client. Empty values ('' and None) count as missing.
+    """
+
+    def __init__(self, required=False, default=None, choices=None):
+        self.required = required
+        self.default = default
+        self.choices = frozenset(choices) if choices else None
+
+    @abstractmethod
+    def converter(self):
+        """Return the function that converts one non-empty raw value"""
+
+    def compile(self):
+        convert = self.converter()
+        choices = self.choices
+        if choices is None:
+            return convert
+        allowed = ', '.join(sorted(str(choice) for choice in choices))
+
+        def convert_choice(value):
+            value = convert(value)
+            if value not in choices:
+                raise ValueError(f'must be one of: {allowed}')
+            return value
+        return convert_choice
+
+
+class String(Field):
+    def __init__(self, max_length=None, strip=True, upper=False, lower=False, **kwargs):
+        super().__init__(**kwargs)
+        self.max_length = max_length
+        self.strip = strip
+        self.upper = upper
+        self.lower = lower
+
+    def converter(self):
+        max_length, strip, upper, lower = self.max_length, self.strip, self.upper, self.lower
+
+        def convert(value):
+            if not isinstance(value, str):
+                raise ValueError('must be a string')
+            if strip:
+                value = value.strip()
+            if upper:
+                value = value.upper()
+            elif lower:
+                value = value.lower()
+            if max_length is not None and len(value) > max_length:
+                raise ValueError(f'must be at most {max_length} characters')
+            return value
+        return convert
+
+
+class Integer(Field):
+    def __init__(self, minimum=None, maximum=None, **kwargs):
+        super().__init__(**kwargs)
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def converter(self):
+        minimum, maximum = self.minimum, self.maximum
+
+        def convert(value):
+            if isinstance(value, bool):
+                raise ValueError('must be an integer')
+            if isinstance(value, float) and value.is_integer():
+                value = int(value)
+            elif isinstance(value, str) and INTEGER_PATTERN.fullmatch(value.strip()):
+                value = int(value)
+            elif not isinstance(value, int):
+                raise ValueError('must be an integer')
+            if not INTEGER_MIN <= value <= INTEGER_MAX:
+                raise ValueError('is out of range')
+            if minimum is not None and value < minimum:
+                raise ValueError(f'must be at least {minimum}')
+            if maximum is not None and value > maximum:
+                raise ValueError(f'must be at most {maximum}')
+            return value
+        return convert
+
+
+class Number(Field):
+    """Numeric value rounded to a column's precision (places, a Decimal quantum such as CENTS)"""
+
+    def __init__(self, places=CENTS, minimum=None, **kwargs):
+        super().__init__(**kwargs)
+        self.places = places
+        self.minimum = Decimal(str(minimum)) if minimum is not None else None
+
+    def converter(self):
+        places, minimum = self.places, self.minimum
+
+        def convert(value):
+            if isinstance(value, bool) or not isinstance(value, (int, float, str, Decimal)):
+                raise ValueError('must be a number')
+            try:
+                value = to_numeric(value, places)
+            except InvalidAmount as e:
+                raise ValueError(str(e))
+            if minimum is not None and value < minimum:
+                raise ValueError(f'must not be less than {minimum}')
+            return value
+        return convert
+
+
+class Boolean(Field):
+    def converter(self):
+        def convert(value):
+            if not isinstance(value, bool):
+                raise ValueError('must be true or false')
+            return value
+        return convert
+
+
+class List(Field):
+    """JSON array whose items are each converted with another field"""
+
+    def __init__(self, item, non_empty=False, max_items=None, **kwargs):
+        super().__init__(**kwargs)
+        self.item = item
+        self.non_empty = non_empty
+        self.max_items = max_items
+
+    def converter(self):
+        convert_item, non_empty, max_items = self.item.compile(), self.non_empty, self.max_items
+
+        def convert(value):
+            if not isinstance(value, list):
+                raise ValueError('must be a list')
+            if non_empty and not value:
+                raise ValueError('must not be empty')
+            if max_items is not None and len(value) > max_items:
+                raise ValueError(f'must have at most {max_items} items')
+            items = []
+            for i, item in enumerate(value):
+                try:
+                    items.append(convert_item(item))
+                except ValueError as e:
+                    raise ValueError(f'item {i} {e}')
+            return items
+        return convert
+
+
+class Any(Field):
+    """Passes the raw JSON value through (for fields the view checks itself)"""
+
+    def converter(self):
+        return lambda value: value
+
+
+class Nested(Field):
+    """JSON object loaded with another Schema"""
+
+    def __init__(self, schema, **kwargs):
+        super().__init__(**kwargs)
+        self.schema = schema
+
+    def converter(self):
+        load = self.schema.load
+
+        def convert(value):
+            try:
+                return load(value)
+            except ValidationError as e:
+                raise ValueError('; '.join(f'{name} {message}' for name, message in e.errors.items()))
+        return convert
+
+
+class Schema:
+    """
+    Declarative description of a JSON request body
+
+    Subclasses list their fields as class attributes. The fields are
+    compiled into converter functions once, when the class is created, so
+    loading a request is one loop over prebuilt closures. load() returns a
+    dict with every declared field (missing optional fields get their
+    default) and ignores keys the schema does not declare.
+    """
+
+    _compiled = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = {}
+        for klass in reversed(cls.__mro__):
+            fields.update((name, value) for name, value in vars(klass).items() if isinstance(value, Field))
+        cls._compiled = tuple((name, field.required, field.default, field.compile())
+                              for name, field in fields.items())
+
+    @classmethod
+    def load(cls, data):
+        """Validate and convert a decoded JSON body; raise ValidationError listing every bad field"""
+        if not isinstance(data, dict):
+            raise ValidationError({'body': 'must be a JSON object'})
+        result = {}
+        errors = {}
+        for name, required, default, convert in cls._compiled:
+            value = data.get(name)
+            if value is None or value == '':
+                if required:
+                    errors[name] = 'is required'
+                result[name] = default
+                continue
+            try:
+                result[name] = convert(value)
+            except ValueError as e:
+                errors[name] = str(e)
+        if errors:
+            raise ValidationError(errors)
+        return result
+
+
+def validation_error_response(errors):
+    """The 400 response returned for every request body that fails its schema"""
+    summary = '; '.join(f'{name} {message}' for name, message in errors.items())
+    return jsonify({'error': f'Invalid request: {summary}', 'fields': errors}), 400
+
+
+def use_schema(schema):
+    """Decorator: load the JSON body with schema and pass the result to the view as data"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                data = schema.load(request.get_json(silent=True))
+            except ValidationError as e:
+                return validation_error_response(e.errors)
+            return fn(data=data, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,76 @@
+import csv
+import io
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select
+from app import db
+from app.models.shipment import Shipment
+from app.models.profiles import PROFILES
+
+
+CSV_COLUMNS = ['id', 'tracking_number', 'consignment_number', 'description', 'cartons',
+               'actual_weight', 'volume_cbm', 'chargeable_weight', 'rate', 'total_cost', 'currency',
+               'current_status', 'origin', 'destination', 'created_at', 'estimated_delivery',
+               'actual_delivery', 'shipping_method']
+
+
+def export_query(status=None, created_from=None, created_to=None, shipping_method_id=None,
+                 include_events=False):
+    """Build the filtered export select (created_from/created_to are inclusive dates)"""
+    query = select(Shipment).options(*PROFILES[Shipment]['detail' if include_events else 'list']())
+    if status:
+        query = query.where(Shipment.current_status == status)
+    if shipping_method_id:
+        query = query.where(Shipment.shipping_method_id == shipping_method_id)
+    if created_from:
+        query = query.where(Shipment.created_at >= datetime.combine(created_from, datetime.min.time()))
+    if created_to:
+        query = query.where(Shipment.created_at < datetime.combine(created_to + timedelta(days=1),
+                                                                    datetime.min.time()))
+    return query.order_by(Shipment.id)
+
+
+def iter_shipments(query, batch_size, include_events=False):
+    """Yield serialized shipments through a server-side cursor, batch_size rows at a time"""
+    # Executed 2.0-style: the legacy Query API refuses yield_per together with its row uniquing
+    for shipment in db.session.execute(query.execution_options(yield_per=batch_size)).scalars():
+        yield shipment.to_dict(include_events=include_events)
+
+
+FLUSH_BYTES = 64 * 1024
+
+
+def generate_ndjson(rows):
+    """Yield one JSON document per line, encoded like API responses, in chunks of about FLUSH_BYTES"""
+    dumps = current_app.json.dumps_bytes
+    lines = []
+    size = 0
+    for row in rows:
+        line = dumps(row) + b'\n'
+        lines.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield b''.join(lines)
+            lines = []
+            size = 0
+    if lines:
+        yield b''.join(lines)
+
+
+def generate_csv(rows, include_events=False):
+    """Yield CSV text in chunks; events, if included, go into a JSON-encoded column"""
+    columns = CSV_COLUMNS + (['tracking_events'] if include_events else [])
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    for row in rows:
+        method = row.get('shipping_method')
+        row['shipping_method'] = method['name'] if method else None
+        if include_events:
+            row['tracking_events'] = current_app.json.dumps(row['tracking_events'])
+        writer.writerow(row)
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
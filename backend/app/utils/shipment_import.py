@@ -0,0 +1,168 @@
+import codecs
+import csv
+import json
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError, DataError
+from app import db
+from app.models.shipment import Shipment
+from app.models.tracking_event import TrackingEvent
+from app.utils.number_allocator import tracking_numbers
+from app.utils.catalog import shipping_methods
+from app.utils.pricing import MILLIS, InvalidAmount
+from app.utils.schemas import Schema, String, Integer, Number, ValidationError
+
+
+class ShipmentSchema(Schema):
+    """Fields of a new shipment, shared by single creation and the bulk import"""
+    shipping_method_id = Integer()
+    consignment_number = String(max_length=100)
+    description = String()
+    cartons = Integer(minimum=0)
+    actual_weight = Number(minimum=0)
+    volume_cbm = Number(places=MILLIS, minimum=0)
+    origin = String(max_length=255)
+    destination = String(max_length=255)
+
+
+class RowError(ValueError):
+    """Raised when an import row is invalid"""
+
+
+def iter_rows(stream, content_type):
+    """Yield raw row dicts from an NDJSON or CSV request stream without buffering it"""
+    text_stream = codecs.getreader('utf-8')(stream)
+    if content_type.startswith('text/csv'):
+        for row in csv.DictReader(text_stream):
+            yield row
+        return
+    for line in text_stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield RowError('Invalid JSON')
+            continue
+        yield row if isinstance(row, dict) else RowError('Row must be a JSON object')
+
+
+def parse_row(row, method_ids):
+    """Validate a raw row and return the column values for a new shipment"""
+    if isinstance(row, RowError):
+        raise row
+    try:
+        values = ShipmentSchema.load(row)
+    except ValidationError as e:
+        raise RowError('; '.join(f'{name} {message}' for name, message in e.errors.items()))
+
+    if values['shipping_method_id'] is not None and values['shipping_method_id'] not in method_ids:
+        raise RowError('Invalid shipping method')
+
+    # Same weight rules as single shipment creation, on a transient instance
+    shipment = Shipment(actual_weight=values['actual_weight'], volume_cbm=values['volume_cbm'])
+    try:
+        values['chargeable_weight'] = shipment.calculate_chargeable_weight()
+    except InvalidAmount as e:
+        raise RowError(f'Invalid weight: {e}')
+    return values
+
+
+def _insert_rows(chunk):
+    """
+    Insert parsed rows and their creation events in the current transaction
+
+    chunk is a list of (row_number, values) pairs. Returns the per-row results.
+    """
+    numbers = tracking_numbers.allocate_many(len(chunk))
+    now = datetime.utcnow()
+    shipment_rows = []
+    for (_, values), tracking_number in zip(chunk, numbers):
+        shipment_rows.append(dict(values, tracking_number=tracking_number, current_status='pending',
+                                  created_at=now, updated_at=now))
+
+    created = db.session.execute(
+        insert(Shipment).returning(Shipment.id, Shipment.tracking_number, sort_by_parameter_order=True),
+        shipment_rows
+    ).all()
+
+    db.session.execute(insert(TrackingEvent), [{
+        'shipment_id': shipment_id,
+        'event_type': 'Shipment Created',
+        'location': values['origin'],
+        'description': 'Shipment registered in system',
+        'is_current': True,
+        'event_time': now,
+        'created_at': now
+    } for (shipment_id, _), (_, values) in zip(created, chunk)])
+
+    return [{'row': row_number, 'status': 'created', 'id': shipment_id, 'tracking_number': tracking_number}
+            for (row_number, _), (shipment_id, tracking_number) in zip(chunk, created)]
+
+
+def _row_error(error):
+    """Client-facing message for a row the database rejected (the driver's text stays in the log)"""
+    if isinstance(error, IntegrityError):
+        return 'Rejected by a database constraint'
+    if isinstance(error, DataError):
+        return 'A value does not fit its column'
+    return 'Could not be saved'
+
+
+def insert_chunk(chunk):
+    """Insert a chunk of parsed rows and their creation events in one transaction"""
+    results = _insert_rows(chunk)
+    db.session.commit()
+    return results
+
+
+def insert_each(chunk):
+    """
+    Insert a chunk row by row, each in its own savepoint
+
+    Used after a chunk insert fails: the rows the database accepts are still
+    committed and only the rejected ones are reported as errors.
+    """
+    results = []
+    for row_number, values in chunk:
+        try:
+            with db.session.begin_nested():
+                results.extend(_insert_rows([(row_number, values)]))
+        except SQLAlchemyError as e:
+            current_app.logger.warning('Shipment import row %d rejected: %s', row_number, e)
+            results.append({'row': row_number, 'status': 'error', 'error': _row_error(e)})
+    db.session.commit()
+    return results
+
+
+def import_shipments(stream, content_type, chunk_size=500, max_rows=None):
+    """Stream rows from the request body into shipments, committing every chunk_size rows"""
+    method_ids = set(shipping_methods.snapshot().by_id)
+    results = []
+    chunk = []
+
+    def flush():
+        try:
+            results.extend(insert_chunk(chunk))
+        except SQLAlchemyError:
+            db.session.rollback()
+            results.extend(insert_each(chunk))
+        chunk.clear()
+
+    for row_number, row in enumerate(iter_rows(stream, content_type), start=1):
+        if max_rows and row_number > max_rows:
+            results.append({'row': row_number, 'status': 'error', 'error': f'Row limit of {max_rows} exceeded'})
+            break
+        try:
+            chunk.append((row_number, parse_row(row, method_ids)))
+        except RowError as e:
+            results.append({'row': row_number, 'status': 'error', 'error': str(e)})
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+
+    results.sort(key=lambda result: result['row'])
+    return results
@@ -1,37 +1,33 @@
-import os
-# Note: For production, integrate with Twilio or Africa's Talking
+from app.utils.notifications import enqueue_notification, enqueue_coalesced, recipient_digest
+# Delivery happens in the background dispatcher (app/utils/notifications.py);
+# the provider is chosen with NOTIFICATION_SMS_PROVIDER (console, http, memory)
 
 
-def send_sms(phone, message):
+def send_sms(phone, message, coalesce_key=None, commit=False):
     """
-    Send SMS using configured SMS service
-    For production, integrate with Twilio or Africa's Talking
+    Queue an SMS in the notifications outbox and return the Notification
+
+    The row is committed with the caller's transaction (or immediately
+    with commit=True) and delivered by the dispatcher. See
+    enqueue_notification() for coalesce_key.
     """
-    try:
-        # Placeholder for SMS sending logic
-        print(f"Sending SMS to: {phone}")
-        print(f"Message: {message}")
-        
-        # TODO: Implement actual SMS sending
-        # Example with Twilio:
-        # from twilio.rest import Client
-        # client = Client(account_sid, auth_token)
-        # message = client.messages.create(
-        #     body=message,
-        #     from_=twilio_phone_number,
-        #     to=phone
-        # )
-        
-        return True
-    except Exception as e:
-        print(f"Error sending SMS: {str(e)}")
-        return False
+    return enqueue_notification('sms', phone, message, coalesce_key=coalesce_key, commit=commit)
+
+
+def tracking_update_sms(phone, tracking_number, status):
+    """Build the outbox message for a tracking update SMS"""
+    return {
+        'channel': 'sms',
+        'recipient': phone,
+        'subject': None,
+        'body': f"Golden Sail: Your shipment {tracking_number} is now {status}. Track: http://gs.link/{tracking_number}",
+        'coalesce_key': f"tracking:{tracking_number}:sms:{recipient_digest(phone)}"
+    }
 
 
 def send_tracking_update_sms(phone, tracking_number, status):
-    """Send tracking update notification via SMS"""
-    message = f"Golden Sail: Your shipment {tracking_number} is now {status}. Track: http://gs.link/{tracking_number}"
-    return send_sms(phone, message)
+    """Queue a tracking update notification SMS, coalesced per shipment and recipient"""
+    return enqueue_coalesced([tracking_update_sms(phone, tracking_number, status)])
 
 
 def send_delivery_notification_sms(phone, tracking_number):
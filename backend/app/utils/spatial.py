@@ -0,0 +1,92 @@
+import heapq
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_unit_vectors(latitudes, longitudes):
+    """Convert degrees of latitude/longitude to points on the unit sphere (N x 3)"""
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lon = np.radians(np.asarray(longitudes, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def chord_to_km(chord):
+    """Great-circle (haversine) distance in km for a straight-line distance between unit vectors"""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.asarray(chord) / 2, 1.0))
+
+
+class KDTree:
+    """
+    Static k-d tree over 3D points for k-nearest-neighbour queries
+
+    Points are lat/lon converted to unit vectors, so straight-line (chord)
+    distance orders results exactly like great-circle distance and there is
+    no wrap-around at the antimeridian or the poles. Nodes are stored in
+    flat lists; leaves hold up to leaf_size points and are scanned with
+    NumPy.
+    """
+
+    def __init__(self, points, leaf_size=16):
+        self.points = np.asarray(points, dtype=float).reshape(-1, 3)
+        self.order = np.arange(len(self.points))
+        self.leaf_size = leaf_size
+        # Per node: slice of self.order, split dimension/value and children (-1 for leaves)
+        self.start, self.end, self.dim, self.split, self.left, self.right = [], [], [], [], [], []
+        if len(self.points):
+            self._build()
+
+    def __len__(self):
+        return len(self.points)
+
+    def _add_node(self, start, end):
+        for values, value in ((self.start, start), (self.end, end), (self.dim, -1), (self.split, 0.0),
+                              (self.left, -1), (self.right, -1)):
+            values.append(value)
+        return len(self.start) - 1
+
+    def _build(self):
+        stack = [self._add_node(0, len(self.points))]
+        while stack:
+            node = stack.pop()
+            start, end = self.start[node], self.end[node]
+            if end - start <= self.leaf_size:
+                continue
+            members = self.order[start:end]
+            coords = self.points[members]
+            dim = int(np.argmax(coords.max(axis=0) - coords.min(axis=0)))
+            mid = (end - start) // 2
+            self.order[start:end] = members[np.argpartition(coords[:, dim], mid)]
+            self.dim[node] = dim
+            self.split[node] = float(self.points[self.order[start + mid], dim])
+            self.left[node] = self._add_node(start, start + mid)
+            self.right[node] = self._add_node(start + mid, end)
+            stack.extend((self.left[node], self.right[node]))
+
+    def query(self, point, k=1):
+        """Return up to k (chord distance, point index) pairs, nearest first"""
+        if not len(self.points) or k < 1:
+            return []
+        point = np.asarray(point, dtype=float)
+        best = []  # max-heap of (-squared distance, index)
+
+        def visit(node):
+            if self.left[node] < 0:
+                members = self.order[self.start[node]:self.end[node]]
+                distances = ((self.points[members] - point) ** 2).sum(axis=1)
+                for distance, index in zip(distances.tolist(), members.tolist()):
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, index))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, index))
+                return
+            diff = point[self.dim[node]] - self.split[node]
+            near, far = (self.left[node], self.right[node]) if diff < 0 else (self.right[node], self.left[node])
+            visit(near)
+            if len(best) < k or diff * diff < -best[0][0]:
+                visit(far)
+
+        visit(0)
+        return [(distance ** 0.5, index) for distance, index in sorted((-d, i) for d, i in best)]
@@ -1,14 +1,28 @@
 import re
+from flask import current_app, has_app_context
 from email_validator import validate_email, EmailNotValidError
+from app.utils.email_domains import email_domains
 
 
 def validate_email_address(email):
-    """Validate email address format"""
+    """
+    Validate email address format
+    
+    EMAIL_DELIVERABILITY_MODE picks the domain check: 'cached' (default)
+    rejects only domains with a cached undeliverable verdict, 'off' checks
+    syntax only and 'inline' runs the DNS lookup in the request.
+    """
+    mode = current_app.config.get('EMAIL_DELIVERABILITY_MODE', 'cached') if has_app_context() else 'inline'
     try:
-        valid = validate_email(email)
-        return True, valid.email
+        valid = validate_email(email, check_deliverability=(mode == 'inline'))
     except EmailNotValidError as e:
         return False, str(e)
+    
+    if mode == 'cached':
+        verdict = email_domains.get(valid.ascii_domain)
+        if verdict is not None and not verdict.deliverable:
+            return False, verdict.message
+    return True, valid.normalized
 
 
 def validate_phone_number(phone):
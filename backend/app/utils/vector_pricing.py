@@ -0,0 +1,81 @@
+import numpy as np
+from app.utils.pricing import to_numeric, CENTS, MILLIS
+
+
+INT64_MAX = np.iinfo(np.int64).max
+
+
+def _scaled(values, places, scale):
+    """Convert values to integers in units of 10**-scale, rounded like the scalar path"""
+    return [int(to_numeric(v, places).scaleb(scale)) if v is not None else 0 for v in values]
+
+
+def _round_div(numerator, divisor):
+    """Integer division rounding half up (all operands are non-negative)"""
+    return (numerator + divisor // 2) // divisor
+
+
+def price_parcels(parcels, tables):
+    """
+    Price N parcels against M rate tables with array arithmetic
+
+    parcels is a list of (actual_weight, volume_cbm) pairs and tables a list of
+    app.utils.pricing.RateTable. All arithmetic runs on integers in the
+    column's smallest unit (cents, grams, litres), so results match
+    RateTable.price exactly. Returns (chargeable, totals, rates) where
+    chargeable is an N-vector of cents (-1 for None), and totals and rates
+    are N x M matrices of cents (-1 where a table cannot price the parcel).
+    """
+    actual = _scaled([p[0] for p in parcels], CENTS, 2)
+    volume = _scaled([p[1] for p in parcels], MILLIS, 3)
+    largest_rate = max((int(rate.scaleb(2)) for table in tables
+                        for rate in table.rates + [table.base_rate] if rate), default=0)
+
+    # Fall back to exact Python integers if products could overflow int64
+    peak = max(max(actual, default=0) * 10, max(volume, default=0) * 166) * max(largest_rate, 1) * 10000
+    dtype = np.int64 if peak < INT64_MAX // 2 else object
+
+    actual = np.array(actual, dtype=dtype)
+    volume = np.array(volume, dtype=dtype)
+    has_actual = (actual > 0).astype(bool)
+    has_volume = (volume > 0).astype(bool)
+
+    # Weights in grams: max(actual, volume * 166) when both are present, else actual
+    grams = np.where(has_volume, np.maximum(actual * 10, volume * 166), actual * 10)
+    chargeable = np.where(has_actual, _round_div(grams, 10), 0)
+
+    totals = np.full((len(parcels), len(tables)), -1, dtype=dtype)
+    rates = np.full((len(parcels), len(tables)), -1, dtype=dtype)
+    for j, table in enumerate(tables):
+        if table.rate_type == 'per_kg':
+            # Quantities compared with tier breaks in thousandths, costs computed from cents
+            quantity_millis, quantity, divisor, has_quantity = chargeable * 10, chargeable, 100, has_actual
+        elif table.rate_type == 'per_cbm':
+            quantity_millis, quantity, divisor, has_quantity = volume, volume, 1000, has_volume
+        else:
+            if table.base_rate:
+                rates[:, j] = int(table.base_rate.scaleb(2))
+            continue
+
+        base_rate = int(table.base_rate.scaleb(2)) if table.base_rate else 0
+        if table.breaks:
+            breaks = np.array([int(b.scaleb(3)) for b in table.breaks], dtype=dtype)
+            tier_rates = np.array([int(r.scaleb(2)) for r in table.rates], dtype=dtype)
+            index = np.searchsorted(breaks, quantity_millis, side='right') - 1
+            rate = np.where(index >= 0, tier_rates[np.maximum(index, 0)], base_rate)
+            rate = np.where(has_quantity, rate, base_rate)
+        else:
+            rate = np.full(len(parcels), base_rate, dtype=dtype)
+
+        cost = _round_div(quantity * rate, divisor)
+        if table.minimum_charge:
+            cost = np.maximum(cost, int(table.minimum_charge.scaleb(2)))
+        if table.surcharge_percent:
+            cost = cost + _round_div(cost * int(table.surcharge_percent.scaleb(2)), 10000)
+
+        valid = has_actual & has_quantity & (rate > 0).astype(bool)
+        totals[:, j] = np.where(valid, cost, -1)
+        rates[:, j] = rate
+
+    chargeable = np.where(has_actual, chargeable, -1)
+    return chargeable, totals, rates
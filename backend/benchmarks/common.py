@@ -0,0 +1,98 @@
+"""
+Shared setup for the benchmark scripts
+
+Run the scripts from the backend directory as modules, e.g.
+``python -m benchmarks.export``. Scripts that need a database use the
+PostgreSQL database in BENCHMARK_DATABASE_URL; its tables are dropped and
+recreated, so point it at a scratch database.
+"""
+import os
+import sys
+import time
+from datetime import datetime
+
+
+def create_bench_app(**config):
+    """Testing app on BENCHMARK_DATABASE_URL with freshly created tables"""
+    url = os.getenv('BENCHMARK_DATABASE_URL')
+    if not url:
+        sys.exit('Set BENCHMARK_DATABASE_URL to a scratch PostgreSQL database (its tables are dropped)')
+    os.environ['TEST_DATABASE_URL'] = url
+    from app import create_app, db
+    app = create_app('testing')
+    app.config.update(config)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    return app
+
+
+def best_of(fn, repeat=3):
+    """Run fn repeat times and return (fastest wall time in seconds, last result)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def print_table(headers, rows):
+    """Print rows as aligned columns"""
+    rows = [[str(value) for value in row] for row in rows]
+    widths = [max(len(str(header)), *(len(row[i]) for row in rows)) for i, header in enumerate(headers)]
+    print('  '.join(str(header).ljust(width) for header, width in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(value.ljust(width) for value, width in zip(row, widths)))
+
+
+def seed_shipping_method(name='Air', type='air', rate_type='per_kg', base_rate=10):
+    """Insert a shipping method and return its ID (inside an app context)"""
+    from app import db
+    from app.models.shipping_method import ShippingMethod
+    method = ShippingMethod(name=name, type=type, rate_type=rate_type, base_rate=base_rate)
+    db.session.add(method)
+    db.session.commit()
+    return method.id
+
+
+def seed_shipments(count, method_id, events=0, prefix='BM', chunk_size=5000):
+    """Bulk insert count shipments with events tracking events each; return their tracking numbers"""
+    from sqlalchemy import insert
+    from app import db
+    from app.models.shipment import Shipment
+    from app.models.tracking_event import TrackingEvent
+    now = datetime.utcnow()
+    numbers = [f'{prefix}{i:010d}' for i in range(count)]
+    for start in range(0, count, chunk_size):
+        chunk = numbers[start:start + chunk_size]
+        ids = db.session.scalars(insert(Shipment).returning(Shipment.id, sort_by_parameter_order=True), [
+            {'tracking_number': number, 'shipping_method_id': method_id, 'current_status': 'in_transit',
+             'consignment_number': f'C-{number}', 'description': 'Household goods', 'cartons': 3,
+             'actual_weight': 12.5, 'volume_cbm': 0.125, 'chargeable_weight': 20.83,
+             'origin': 'Guangzhou', 'destination': 'Nairobi', 'created_at': now, 'updated_at': now}
+            for number in chunk
+        ]).all()
+        if events:
+            db.session.execute(insert(TrackingEvent), [
+                {'shipment_id': shipment_id, 'event_type': 'In transit', 'location': f'Hub {i}',
+                 'description': 'Scanned at sorting facility', 'event_time': now, 'created_at': now}
+                for shipment_id in ids for i in range(events)
+            ])
+        db.session.commit()
+    return numbers
+
+
+def admin_headers(app, client):
+    """Create an admin user and return the Authorization header for its access token"""
+    from app import db
+    from app.models.user import User
+    with app.app_context():
+        admin = User(email='bench-admin@example.com', full_name='Benchmark Admin', role='admin')
+        admin.set_password('Benchmark123')
+        db.session.add(admin)
+        db.session.commit()
+    response = client.post('/api/auth/login', json={'email': 'bench-admin@example.com', 'password': 'Benchmark123'})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
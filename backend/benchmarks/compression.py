@@ -0,0 +1,67 @@
+"""
+Response compression: ratio and cost per encoding and level
+
+Compresses a tracking payload with --events events and an admin page of
+100 shipments with gzip and brotli at several levels, then times warm
+cached GET /api/tracking/<number> requests with identity, gzip and br
+(the compressed variants are stored next to the cached body).
+
+    BENCHMARK_DATABASE_URL=postgresql://localhost/bench python -m benchmarks.compression
+"""
+import argparse
+import timeit
+from benchmarks.common import create_bench_app, seed_shipping_method, seed_shipments, admin_headers, print_table
+
+LEVELS = [('gzip', 1), ('gzip', 6), ('gzip', 9), ('br', 4), ('br', 9), ('br', 11)]
+
+
+def per_call_us(fn, number):
+    """Best of 5 runs of number calls, in microseconds per call"""
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--events', type=int, default=60)
+    parser.add_argument('--number', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    from app.utils.compression import compression, brotli
+
+    with app.app_context():
+        method_id = seed_shipping_method()
+        tracking_number, = seed_shipments(1, method_id, events=args.events, prefix='BC')
+        seed_shipments(100, method_id, prefix='BL')
+    client = app.test_client()
+    headers = admin_headers(app, client)
+    bodies = [
+        (f'tracking payload, {args.events} events', client.get(f'/api/tracking/{tracking_number}').data),
+        ('admin page, 100 shipments', client.get('/api/admin/shipments?per_page=100', headers=headers).data),
+    ]
+
+    rows = []
+    for label, body in bodies:
+        rows.append((label, 'identity', '-', f'{len(body):,}', '1.000', '-'))
+        for encoding, level in LEVELS:
+            if encoding == 'br' and brotli is None:
+                continue
+            data = compression.compress(body, encoding, level)
+            number = max(args.number // (50 if level >= 9 and encoding == 'br' else 1), 5)
+            us = per_call_us(lambda: compression.compress(body, encoding, level), number)
+            rows.append((label, encoding, level, f'{len(data):,}', f'{len(data) / len(body):.3f}', f'{us:.0f}'))
+    print_table(('body', 'encoding', 'level', 'bytes', 'ratio', 'us'), rows)
+
+    rows = []
+    for encoding in ('identity', 'gzip', 'br'):
+        request = lambda: client.get(f'/api/tracking/{tracking_number}', headers={'Accept-Encoding': encoding})
+        response = request()  # stores the compressed variant
+        rows.append((encoding, response.headers.get('Content-Encoding', 'identity'), f'{len(response.data):,}',
+                     f'{per_call_us(request, args.requests):.0f}'))
+    print()
+    print_table(('accept', 'served', 'bytes', 'us/request (cached)'), rows)
+
+
+if __name__ == '__main__':
+    main()
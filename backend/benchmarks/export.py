@@ -0,0 +1,55 @@
+"""
+Shipment export throughput (rows/sec)
+
+Seeds --rows shipments with --events tracking events each, then streams
+GET /api/admin/shipments/export through the test client for each format,
+with and without events, at each EXPORT_BATCH_SIZE in --batch-sizes. The
+body is consumed chunk by chunk as a client would read it; the best of
+--repeat runs is reported.
+
+    BENCHMARK_DATABASE_URL=postgresql://localhost/bench python -m benchmarks.export --rows 50000
+"""
+import argparse
+from benchmarks.common import create_bench_app, best_of, print_table, seed_shipping_method, seed_shipments, \
+    admin_headers
+
+
+def stream(client, url, headers):
+    """Read a streamed response to the end; return the number of body bytes"""
+    response = client.get(url, headers=headers, buffered=False)
+    assert response.status_code == 200, response.status_code
+    size = sum(len(chunk) for chunk in response.response)
+    response.close()
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--events', type=int, default=3)
+    parser.add_argument('--batch-sizes', default='500,1000,5000')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    with app.app_context():
+        seed_shipments(args.rows, seed_shipping_method(), events=args.events)
+    client = app.test_client()
+    headers = admin_headers(app, client)
+
+    results = []
+    for export_format in ('csv', 'ndjson'):
+        for include_events in (False, True):
+            for batch_size in (int(size) for size in args.batch_sizes.split(',')):
+                app.config['EXPORT_BATCH_SIZE'] = batch_size
+                url = f'/api/admin/shipments/export?format={export_format}&include_events={include_events}'
+                seconds, size = best_of(lambda: stream(client, url, headers), args.repeat)
+                results.append((export_format, include_events, batch_size, f'{seconds:.3f}',
+                                f'{args.rows / seconds:,.0f}', f'{size / seconds / 1e6:.1f}'))
+
+    print(f'{args.rows} shipments, {args.events} events each, best of {args.repeat}')
+    print_table(('format', 'events', 'batch', 'seconds', 'rows/sec', 'MB/sec'), results)
+
+
+if __name__ == '__main__':
+    main()
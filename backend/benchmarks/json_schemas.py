@@ -0,0 +1,72 @@
+"""
+JSON encoding and request schemas: per-operation and per-request cost
+
+Times FastJSONProvider against Flask's DefaultJSONProvider on a tracking
+payload with --events events, Schema.load() for the quote schemas, and
+warm (cached) requests to the tracking and quote endpoints through the
+test client.
+
+    BENCHMARK_DATABASE_URL=postgresql://localhost/bench python -m benchmarks.json_schemas
+"""
+import argparse
+import timeit
+from benchmarks.common import create_bench_app, seed_shipping_method, seed_shipments, print_table
+
+
+def per_call_us(fn, number):
+    """Best of 5 runs of number calls, in microseconds per call"""
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--events', type=int, default=20)
+    parser.add_argument('--number', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    from flask.json.provider import DefaultJSONProvider
+    from app.models.profiles import query_profile
+    from app.models.shipment import Shipment
+    from app.routes.quotes import QuoteSchema, BulkQuoteSchema
+    from app.utils.json_provider import FastJSONProvider
+
+    with app.app_context():
+        method_id = seed_shipping_method()
+        numbers = seed_shipments(10, method_id, events=args.events)
+        shipment = query_profile(Shipment, 'tracking').filter_by(tracking_number=numbers[0]).one()
+        payload = {'shipment': shipment.to_dict(include_events=True)}
+
+    fast, default = FastJSONProvider(app), DefaultJSONProvider(app)
+    encoded = fast.dumps_bytes(payload)
+    rows = [
+        ('encode (stdlib)', per_call_us(lambda: default.dumps(payload).encode('utf-8'), args.number)),
+        ('encode (FastJSONProvider)', per_call_us(lambda: fast.dumps_bytes(payload), args.number)),
+        ('decode (stdlib)', per_call_us(lambda: default.loads(encoded), args.number)),
+        ('decode (FastJSONProvider)', per_call_us(lambda: fast.loads(encoded), args.number)),
+    ]
+
+    quote = {'shipping_method_id': method_id, 'actual_weight': '12.5', 'volume_cbm': 0.25}
+    bulk = {'parcels': [{'actual_weight': i + 0.5, 'volume_cbm': i / 100} for i in range(100)]}
+    rows += [
+        ('QuoteSchema.load', per_call_us(lambda: QuoteSchema.load(quote), args.number)),
+        ('BulkQuoteSchema.load (100 parcels)', per_call_us(lambda: BulkQuoteSchema.load(bulk), args.number // 10)),
+    ]
+
+    client = app.test_client()
+    requests = [
+        ('GET /api/tracking/<number>', lambda: client.get(f'/api/tracking/{numbers[0]}')),
+        ('POST /api/tracking/batch (10)', lambda: client.post('/api/tracking/batch', json={'tracking_numbers': numbers})),
+        ('POST /api/quotes/calculate', lambda: client.post('/api/quotes/calculate', json=quote)),
+    ]
+    for label, request in requests:
+        assert request().status_code == 200  # warm the caches
+        rows.append((f'{label}, cached', per_call_us(request, args.requests)))
+
+    print(f'Tracking payload: {args.events} events, {len(encoded):,} bytes')
+    print_table(('operation', 'us'), [(label, f'{us:.1f}') for label, us in rows])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Nearest-warehouse search: KDTree build and query time versus brute force
+
+Builds app.utils.spatial.KDTree over N random points on the sphere for
+each N in --sizes, times k-nearest queries against a NumPy brute-force
+scan of every point, and checks that both return the same neighbours.
+No database is needed.
+
+    python -m benchmarks.nearest --sizes 100,10000,100000 --queries 500
+"""
+import argparse
+import time
+import numpy as np
+from benchmarks.common import best_of, print_table
+from app.utils.spatial import KDTree, to_unit_vectors
+
+
+def random_points(rng, count):
+    # Uniform on the sphere: latitude from arcsin of a uniform value
+    latitudes = np.degrees(np.arcsin(rng.uniform(-1, 1, count)))
+    longitudes = rng.uniform(-180, 180, count)
+    return to_unit_vectors(latitudes, longitudes)
+
+
+def brute_force(points, point, k):
+    distances = ((points - point) ** 2).sum(axis=1)
+    nearest = np.argpartition(distances, k - 1)[:k] if k < len(points) else np.arange(len(points))
+    return nearest[np.argsort(distances[nearest], kind='stable')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000,10000,100000')
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results = []
+    for size in (int(size) for size in args.sizes.split(',')):
+        points = random_points(rng, size)
+        targets = random_points(rng, args.queries)
+        build, tree = best_of(lambda: KDTree(points), 3)
+
+        started = time.perf_counter()
+        found = [[index for _, index in tree.query(target, args.k)] for target in targets]
+        tree_us = (time.perf_counter() - started) / args.queries * 1e6
+        started = time.perf_counter()
+        expected = [brute_force(points, target, args.k).tolist() for target in targets]
+        brute_us = (time.perf_counter() - started) / args.queries * 1e6
+
+        mismatches = sum(1 for a, b in zip(found, expected) if a != b)
+        results.append((size, f'{build * 1000:.1f}', f'{tree_us:.0f}', f'{brute_us:.0f}',
+                        f'{brute_us / tree_us:.1f}x', mismatches))
+
+    print(f'k={args.k}, {args.queries} queries per size')
+    print_table(('points', 'build ms', 'tree us/query', 'brute us/query', 'speedup', 'mismatches'), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Tracking-notification coalescing: volume reduction and outbox throughput
+
+Replays a burst of tracking updates through the admin API: --updates
+status changes to one shipment, then --scans bulk-status scans of
+--shipments shipments, all owned by one customer with an email address
+and a phone number. The dispatcher is then drained with the memory
+providers, and the script reports how many messages were queued and how
+many deliveries they became. It also times enqueue_coalesced() for
+--messages messages spread over --keys coalescing keys.
+
+    BENCHMARK_DATABASE_URL=postgresql://localhost/bench python -m benchmarks.notifications
+"""
+import argparse
+import time
+from benchmarks.common import create_bench_app, seed_shipping_method, seed_shipments, admin_headers, print_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--updates', type=int, default=20)
+    parser.add_argument('--scans', type=int, default=3)
+    parser.add_argument('--shipments', type=int, default=9)
+    parser.add_argument('--messages', type=int, default=10000)
+    parser.add_argument('--keys', type=int, default=1000)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    from app import db
+    from app.models.shipment import Shipment
+    from app.models.user import User
+    from app.utils.notifications import notification_dispatcher, enqueue_coalesced
+
+    client = app.test_client()
+    headers = admin_headers(app, client)
+    with app.app_context():
+        owner = User(email='owner@example.com', full_name='Owner', phone='+254700000000')
+        owner.set_password('Owner12345')
+        db.session.add(owner)
+        db.session.commit()
+        numbers = seed_shipments(args.shipments, seed_shipping_method())
+        Shipment.query.update({Shipment.user_id: owner.id})
+        db.session.commit()
+        first_id = Shipment.query.filter_by(tracking_number=numbers[0]).one().id
+
+    # Everything queued is due at once, so draining does not wait out the debounce window
+    notification_dispatcher.debounce = 0
+    providers = notification_dispatcher.providers
+    started = time.perf_counter()
+    for i in range(args.updates):
+        response = client.put(f'/api/admin/shipments/{first_id}/status', headers=headers,
+                              json={'status': f'update-{i}', 'event_type': 'Update', 'location': 'Hub'})
+        assert response.status_code == 200, response.get_json()
+    for i in range(args.scans):
+        response = client.post('/api/admin/shipments/bulk-status', headers=headers,
+                               json={'tracking_numbers': numbers, 'status': f'scan-{i}'})
+        assert response.status_code == 200, response.get_json()
+    burst = time.perf_counter() - started
+    while notification_dispatcher.dispatch_once():
+        pass
+    stats = notification_dispatcher.stats()
+    deliveries = sum(len(provider.sent) for provider in providers.values())
+
+    print(f'Burst: {args.updates} updates to one shipment, {args.scans} bulk scans of {args.shipments} '
+          f'shipments ({burst * 1000:.0f} ms)')
+    print_table(('queued', 'created', 'coalesced', 'deduplicated', 'deliveries', 'volume_reduction'),
+                [(stats['queued'], stats['created'], stats['coalesced'], stats['deduplicated'], deliveries,
+                  stats['volume_reduction'])])
+
+    messages = [{'channel': 'email', 'recipient': f'user{i % args.keys}@example.com', 'subject': 'Update',
+                 'body': f'Status {i}', 'coalesce_key': f'bench:{i % args.keys}'} for i in range(args.messages)]
+    with app.app_context():
+        started = time.perf_counter()
+        enqueue_coalesced(messages, commit=True)
+        elapsed = time.perf_counter() - started
+    print()
+    print_table(('messages', 'keys', 'enqueue ms', 'messages/sec'),
+                [(args.messages, args.keys, f'{elapsed * 1000:.0f}', f'{args.messages / elapsed:,.0f}')])
+
+
+if __name__ == '__main__':
+    main()
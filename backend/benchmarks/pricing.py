@@ -0,0 +1,63 @@
+"""
+Pricing micro-benchmark: RateTable.price_many versus vector price_parcels
+
+Prices N parcels against --tables tiered rate tables, once with the
+scalar Decimal path (one price_many call per table) and once with the
+integer numpy path used by POST /api/quotes/bulk, for each N in --sizes.
+No database is needed. tests/test_vector_pricing.py checks that both
+paths return the same results.
+
+    python -m benchmarks.pricing --sizes 1,10,100,1000,10000
+"""
+import argparse
+import random
+from decimal import Decimal
+from benchmarks.common import best_of, print_table
+from app.utils.pricing import RateTable
+from app.utils.vector_pricing import price_parcels
+
+
+def make_tables(count, rng):
+    tables = []
+    for i in range(count):
+        if i % 2 == 0:
+            tiers = [(0, '12.50'), (45, '11.00'), (100, '9.75'), (300, '8.40'), (1000, '7.10')]
+            tables.append(RateTable('per_kg', '14.00', tiers, minimum_charge='25.00', surcharge_percent='4.50'))
+        else:
+            tiers = [(0, '650.00'), (2, '610.00'), (5, '575.00'), (15, '540.00')]
+            tables.append(RateTable('per_cbm', '700.00', tiers, minimum_charge='120.00', surcharge_percent='7.00'))
+    rng.shuffle(tables)
+    return tables
+
+
+def make_parcels(count, rng):
+    # Decimals already rounded to column precision, as ParcelSchema hands them to the view
+    return [(Decimal(rng.randint(1, 200000)).scaleb(-2), Decimal(rng.randint(0, 20000)).scaleb(-3))
+            for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1,10,100,1000,10000')
+    parser.add_argument('--tables', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tables = make_tables(args.tables, rng)
+    results = []
+    for size in (int(size) for size in args.sizes.split(',')):
+        parcels = make_parcels(size, rng)
+        scalar, _ = best_of(lambda: [table.price_many(parcels) for table in tables], args.repeat)
+        vector, _ = best_of(lambda: price_parcels(parcels, tables), args.repeat)
+        prices = size * len(tables)
+        results.append((size, f'{scalar * 1000:.2f}', f'{vector * 1000:.2f}',
+                        f'{prices / scalar:,.0f}', f'{prices / vector:,.0f}', f'{scalar / vector:.1f}x'))
+
+    print(f'{args.tables} rate tables, best of {args.repeat}')
+    print_table(('parcels', 'scalar ms', 'vector ms', 'scalar prices/s', 'vector prices/s', 'speedup'), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""shipments created_at not null and keyset index
+
+Keyset pagination orders shipments by (created_at, id) and puts
+created_at into its cursors, so the column may not be NULL. Rows without
+one take updated_at, or the migration time when that is missing too.
+
+Revision ID: 1a78cee33a30
+Revises: e0a5d663b275
+Create Date: 2026-10-18 09:37:02.118745
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1a78cee33a30'
+down_revision = 'e0a5d663b275'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "UPDATE shipments SET created_at = COALESCE(updated_at, now() at time zone 'utc') "
+        "WHERE created_at IS NULL"
+    )
+    op.alter_column('shipments', 'created_at',
+                    existing_type=sa.DateTime(),
+                    nullable=False,
+                    server_default=sa.text("(now() at time zone 'utc')"))
+    op.create_index('ix_shipments_created_at_id', 'shipments', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_shipments_created_at_id', table_name='shipments')
+    op.alter_column('shipments', 'created_at',
+                    existing_type=sa.DateTime(),
+                    nullable=True,
+                    server_default=None)
@@ -0,0 +1,26 @@
+"""quotes status and valid_until index
+
+Serves the quote writer's periodic expiry UPDATE.
+
+Revision ID: 3d89321836f1
+Revises: b5fa489fe7e2
+Create Date: 2026-10-18 09:40:18.004377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d89321836f1'
+down_revision = 'b5fa489fe7e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_quotes_status_valid_until', 'quotes', ['status', 'valid_until'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_quotes_status_valid_until', table_name='quotes')
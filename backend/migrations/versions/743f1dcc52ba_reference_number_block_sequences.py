@@ -0,0 +1,29 @@
+"""reference number block sequences
+
+Each worker reserves blocks of tracking and quote number serials with
+one nextval() on these sequences (app.utils.number_allocator).
+
+Revision ID: 743f1dcc52ba
+Revises: 1a78cee33a30
+Create Date: 2026-10-18 09:37:32.466950
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '743f1dcc52ba'
+down_revision = '1a78cee33a30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(sa.schema.CreateSequence(sa.Sequence('tracking_number_block_seq', start=1)))
+    op.execute(sa.schema.CreateSequence(sa.Sequence('quote_number_block_seq', start=1)))
+
+
+def downgrade():
+    op.execute(sa.schema.DropSequence(sa.Sequence('quote_number_block_seq')))
+    op.execute(sa.schema.DropSequence(sa.Sequence('tracking_number_block_seq')))
@@ -0,0 +1,45 @@
+"""warehouse shipping types table
+
+One row per (warehouse, shipping type), filled from the comma-separated
+warehouses.shipping_method_types column, which the model keeps in sync
+from now on. Also indexes warehouses.country for the directory filter.
+
+Revision ID: 90943a2ca0f0
+Revises: fa3d0aee681c
+Create Date: 2026-10-18 09:42:09.771628
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '90943a2ca0f0'
+down_revision = 'fa3d0aee681c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('warehouse_shipping_types',
+    sa.Column('warehouse_id', sa.Integer(), nullable=False),
+    sa.Column('shipping_type', sa.String(length=20), nullable=False),
+    sa.ForeignKeyConstraint(['warehouse_id'], ['warehouses.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('warehouse_id', 'shipping_type')
+    )
+    op.create_index('ix_warehouse_shipping_types_type_warehouse', 'warehouse_shipping_types',
+                    ['shipping_type', 'warehouse_id'], unique=False)
+    op.create_index(op.f('ix_warehouses_country'), 'warehouses', ['country'], unique=False)
+    # Same splitting as Warehouse.parse_shipping_types: trimmed, no blanks, no repeats
+    op.execute(
+        "INSERT INTO warehouse_shipping_types (warehouse_id, shipping_type) "
+        "SELECT DISTINCT warehouses.id, btrim(t.shipping_type) "
+        "FROM warehouses CROSS JOIN unnest(string_to_array(warehouses.shipping_method_types, ',')) AS t(shipping_type) "
+        "WHERE btrim(t.shipping_type) <> ''"
+    )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_warehouses_country'), table_name='warehouses')
+    op.drop_index('ix_warehouse_shipping_types_type_warehouse', table_name='warehouse_shipping_types')
+    op.drop_table('warehouse_shipping_types')
@@ -0,0 +1,43 @@
+"""notifications outbox
+
+Emails and SMS are queued here and delivered by the background
+dispatcher, which claims due rows by (status, next_attempt_at).
+
+Revision ID: ab56ebee37b4
+Revises: d1b169951dba
+Create Date: 2026-10-18 09:44:01.700117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ab56ebee37b4'
+down_revision = 'd1b169951dba'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notifications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('channel', sa.String(length=10), nullable=False),
+    sa.Column('recipient', sa.String(length=255), nullable=False),
+    sa.Column('subject', sa.String(length=255), nullable=True),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notifications_status_next_attempt_at', 'notifications',
+                    ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_notifications_status_next_attempt_at', table_name='notifications')
+    op.drop_table('notifications')
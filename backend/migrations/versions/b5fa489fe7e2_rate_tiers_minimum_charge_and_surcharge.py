@@ -0,0 +1,42 @@
+"""rate tiers, minimum charge and surcharge
+
+Existing methods keep pricing as before: no tiers, so base_rate applies to
+every quantity, and no minimum charge or surcharge.
+
+Revision ID: b5fa489fe7e2
+Revises: e2766242341b
+Create Date: 2026-10-18 09:38:47.552888
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5fa489fe7e2'
+down_revision = 'e2766242341b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('shipping_methods', sa.Column('minimum_charge', sa.Numeric(precision=10, scale=2), nullable=True))
+    op.add_column('shipping_methods', sa.Column('surcharge_percent', sa.Numeric(precision=5, scale=2), nullable=True))
+    op.create_table('rate_tiers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('shipping_method_id', sa.Integer(), nullable=False),
+    sa.Column('min_quantity', sa.Numeric(precision=12, scale=3), nullable=False),
+    sa.Column('rate', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['shipping_method_id'], ['shipping_methods.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('shipping_method_id', 'min_quantity', name='uq_rate_tiers_method_min_quantity')
+    )
+    op.create_index(op.f('ix_rate_tiers_shipping_method_id'), 'rate_tiers', ['shipping_method_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_rate_tiers_shipping_method_id'), table_name='rate_tiers')
+    op.drop_table('rate_tiers')
+    op.drop_column('shipping_methods', 'surcharge_percent')
+    op.drop_column('shipping_methods', 'minimum_charge')
@@ -0,0 +1,32 @@
+"""notifications coalesce key
+
+Messages sharing a coalesce_key merge into one pending row; the partial
+unique index allows at most one pending row per key. Existing rows keep
+a NULL key and are never merged.
+
+Revision ID: c3985d7c2171
+Revises: ab56ebee37b4
+Create Date: 2026-10-18 09:44:32.949617
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3985d7c2171'
+down_revision = 'ab56ebee37b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('notifications', sa.Column('coalesce_key', sa.String(length=255), nullable=True))
+    op.create_index('uq_notifications_pending_coalesce_key', 'notifications', ['coalesce_key'], unique=True,
+                    postgresql_where=sa.text("status = 'pending'"))
+
+
+def downgrade():
+    op.drop_index('uq_notifications_pending_coalesce_key', table_name='notifications',
+                  postgresql_where=sa.text("status = 'pending'"))
+    op.drop_column('notifications', 'coalesce_key')
@@ -0,0 +1,29 @@
+"""warehouse coordinates
+
+Warehouses without coordinates are left out of nearest-warehouse search
+until they are set.
+
+Revision ID: d1b169951dba
+Revises: 90943a2ca0f0
+Create Date: 2026-10-18 09:42:18.817819
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd1b169951dba'
+down_revision = '90943a2ca0f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('warehouses', sa.Column('latitude', sa.Numeric(precision=9, scale=6), nullable=True))
+    op.add_column('warehouses', sa.Column('longitude', sa.Numeric(precision=9, scale=6), nullable=True))
+
+
+def downgrade():
+    op.drop_column('warehouses', 'longitude')
+    op.drop_column('warehouses', 'latitude')
@@ -0,0 +1,32 @@
+"""catalog versions
+
+One row per in-process catalog (shipping methods, warehouses); writers
+bump its version and workers rebuild their snapshot when it moves.
+
+Revision ID: e2766242341b
+Revises: 743f1dcc52ba
+Create Date: 2026-10-18 09:38:31.320256
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2766242341b'
+down_revision = '743f1dcc52ba'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('catalog_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('catalog_versions')
@@ -0,0 +1,27 @@
+"""users auth_version
+
+Tokens carry the version they were issued under and are rejected once it
+is bumped. Existing users start at 0, like new ones.
+
+Revision ID: fa3d0aee681c
+Revises: 3d89321836f1
+Create Date: 2026-10-18 09:40:22.538995
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fa3d0aee681c'
+down_revision = '3d89321836f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('auth_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('users', 'auth_version')
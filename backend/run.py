@@ -5,7 +5,8 @@ Main application entry point
 """
 import os
 from app import create_app, db
-from app.models import User, ShippingMethod, Shipment, TrackingEvent, Quote, Warehouse, Address
+from app.models import User, ShippingMethod, Shipment, TrackingEvent, Quote, Warehouse, Address, CatalogVersion, RateTier, \
+    WarehouseShippingType, Notification
 
 app = create_app()
 
@@ -20,7 +21,11 @@ def make_shell_context():
         'TrackingEvent': TrackingEvent,
         'Quote': Quote,
         'Warehouse': Warehouse,
-        'Address': Address
+        'Address': Address,
+        'CatalogVersion': CatalogVersion,
+        'RateTier': RateTier,
+        'WarehouseShippingType': WarehouseShippingType,
+        'Notification': Notification
     }
 
 if __name__ == '__main__':
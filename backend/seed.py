@@ -3,6 +3,7 @@
 Database seed script
 Populates database with initial data for testing
 """
+from flask_migrate import stamp
 from app import create_app, db
 from app.models import User, ShippingMethod, Warehouse, Shipment, TrackingEvent
 from datetime import datetime, timedelta
@@ -18,6 +19,7 @@ def seed_database():
         
         print("Creating all tables...")
         db.create_all()
+        stamp()  # the new tables match the latest migration
         
         # Create Admin User
         print("Creating admin user...")
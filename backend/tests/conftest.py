@@ -0,0 +1,70 @@
+"""
+Test fixtures
+
+The tests run against PostgreSQL (the models use its dialect features).
+Point TEST_DATABASE_URL at an empty database; its tables are dropped and
+recreated for the test session.
+"""
+import itertools
+import pytest
+from sqlalchemy import event
+from app import create_app, db
+from app.models.user import User
+
+_emails = itertools.count(1)
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """Create a user and return (id, email, password)"""
+    def make(role='customer', password='Password123'):
+        email = f'user{next(_emails)}@example.com'
+        with app.app_context():
+            user = User(email=email, full_name='Test User', role=role)
+            user.set_password(password)
+            db.session.add(user)
+            db.session.commit()
+            return user.id, email, password
+    return make
+
+
+@pytest.fixture
+def login(client):
+    """Log in and return the Authorization header for the access token"""
+    def login(email, password):
+        response = client.post('/api/auth/login', json={'email': email, 'password': password})
+        assert response.status_code == 200, response.get_json()
+        return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    return login
+
+
+@pytest.fixture
+def queries(app):
+    """List of the SQL statements executed while the test runs"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', record)
@@ -0,0 +1,46 @@
+from app import db
+from app.models.user import User
+from app.utils.password_hasher import password_hasher, hash_rounds
+
+
+def user_queries(statements):
+    return [statement for statement in statements if 'FROM users' in statement or 'UPDATE users' in statement]
+
+
+def test_token_check_runs_no_user_queries(client, make_user, login, queries):
+    _, email, password = make_user(role='admin')
+    headers = login(email, password)
+    assert client.get('/api/admin/cache/stats', headers=headers).status_code == 200
+
+    queries.clear()
+    response = client.get('/api/admin/cache/stats', headers=headers)
+
+    assert response.status_code == 200
+    assert user_queries(queries) == []
+
+
+def test_rehash_at_login_keeps_other_sessions(app, client, make_user, login, monkeypatch):
+    user_id, email, password = make_user(role='admin')
+    first = login(email, password)
+
+    monkeypatch.setattr(password_hasher, 'rounds', password_hasher.rounds + 1)
+    login(email, password)
+
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        assert hash_rounds(user.password_hash) == password_hasher.rounds
+        assert user.auth_version == 0
+    assert client.get('/api/admin/cache/stats', headers=first).status_code == 200
+
+
+def test_password_change_ends_existing_sessions(app, client, make_user, login):
+    user_id, email, password = make_user(role='admin')
+    headers = login(email, password)
+
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        user.set_password('Another456')
+        db.session.commit()
+
+    response = client.get('/api/admin/cache/stats', headers=headers)
+    assert response.status_code == 401
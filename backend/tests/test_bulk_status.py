@@ -0,0 +1,58 @@
+"""Bulk status updates notify owners the same way single status updates do"""
+import itertools
+import pytest
+from app import db
+from app.models.notification import Notification
+from app.models.shipment import Shipment
+
+_numbers = itertools.count(1)
+
+
+@pytest.fixture
+def admin_headers(make_user, login):
+    _, email, password = make_user(role='admin')
+    return login(email, password)
+
+
+@pytest.fixture
+def owner(make_user):
+    user_id, email, _ = make_user()
+    return user_id, email
+
+
+def make_shipment(app, user_id, status):
+    with app.app_context():
+        shipment = Shipment(tracking_number=f'BS{next(_numbers):08d}', user_id=user_id, current_status=status)
+        db.session.add(shipment)
+        db.session.commit()
+        return shipment.id, shipment.tracking_number
+
+
+def queued_for(app, email):
+    with app.app_context():
+        return sorted(n.subject for n in Notification.query.filter_by(recipient=email))
+
+
+def test_bulk_update_only_notifies_shipments_whose_status_changed(app, client, admin_headers, owner):
+    user_id, email = owner
+    moved_id, moved = make_shipment(app, user_id, 'pending')
+    same_id, _ = make_shipment(app, user_id, 'in_transit')
+
+    response = client.post('/api/admin/shipments/bulk-status', headers=admin_headers,
+                           json={'shipment_ids': [moved_id, same_id], 'status': 'in_transit'})
+
+    assert response.status_code == 200
+    assert response.get_json()['updated'] == 2
+    assert queued_for(app, email) == [f'Shipment Update: {moved}']
+
+
+def test_single_and_bulk_updates_agree(app, client, admin_headers, owner):
+    user_id, email = owner
+    single_id, _ = make_shipment(app, user_id, 'delivered')
+    bulk_id, _ = make_shipment(app, user_id, 'delivered')
+
+    client.put(f'/api/admin/shipments/{single_id}/status', headers=admin_headers, json={'status': 'delivered'})
+    client.post('/api/admin/shipments/bulk-status', headers=admin_headers,
+                json={'shipment_ids': [bulk_id], 'status': 'delivered'})
+
+    assert queued_for(app, email) == []
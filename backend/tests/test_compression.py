@@ -0,0 +1,129 @@
+"""Response compression: Accept-Encoding negotiation and cached compressed variants"""
+import gzip
+import json
+import pytest
+from flask import Flask, Response
+from app.utils.compression import ResponseCompressor, brotli
+from app.utils.http import json_body_response
+
+BODY = json.dumps({'warehouses': [{'id': i, 'name': f'Depot {i}', 'country': 'Kenya'} for i in range(100)]}).encode()
+needs_brotli = pytest.mark.skipif(brotli is None, reason='Brotli package not installed')
+
+
+@pytest.fixture
+def variants():
+    """Compressed variants stored next to the cached body served at /cached"""
+    return {}
+
+
+@pytest.fixture
+def compressor():
+    return ResponseCompressor()
+
+
+@pytest.fixture
+def http(compressor, variants):
+    app = Flask(__name__)
+    app.config.update(COMPRESSION_MIN_SIZE=512)
+    compressor.init_app(app)
+
+    @app.route('/large')
+    def large():
+        return json_body_response(BODY, etag='abc')
+
+    @app.route('/small')
+    def small():
+        return json_body_response(b'{"ok": true}', etag='abc')
+
+    @app.route('/cached')
+    def cached():
+        return json_body_response(BODY, etag='abc', variants=variants)
+
+    @app.route('/stream')
+    def stream():
+        return Response((BODY for _ in range(2)), mimetype='application/json')
+
+    return app.test_client()
+
+
+def decode(response):
+    encoding = response.headers.get('Content-Encoding')
+    if encoding == 'gzip':
+        return gzip.decompress(response.get_data())
+    if encoding == 'br':
+        return brotli.decompress(response.get_data())
+    return response.get_data()
+
+
+def test_gzip_when_the_client_only_accepts_gzip(http):
+    response = http.get('/large', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert decode(response) == BODY
+    assert len(response.get_data()) < len(BODY)
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.headers['ETag'] == 'W/"abc"'
+
+
+@needs_brotli
+def test_brotli_is_preferred_when_both_are_accepted(http):
+    response = http.get('/large', headers={'Accept-Encoding': 'gzip, deflate, br'})
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert decode(response) == BODY
+
+
+@needs_brotli
+def test_quality_values_are_honoured(http):
+    response = http.get('/large', headers={'Accept-Encoding': 'br;q=0.5, gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+
+
+@pytest.mark.parametrize('accept_encoding', [None, 'identity', 'deflate'])
+def test_unsupported_or_missing_encodings_get_the_plain_body(http, accept_encoding):
+    headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+    response = http.get('/large', headers=headers)
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == BODY
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.headers['ETag'] == '"abc"'
+
+
+def test_bodies_below_the_minimum_size_are_not_compressed(http, compressor):
+    response = http.get('/small', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert compressor.stats()['skipped_small'] == 1
+
+
+def test_streamed_responses_are_not_compressed(http):
+    response = http.get('/stream', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == BODY * 2
+
+
+def test_cached_variants_are_compressed_once_per_encoding(http, compressor, variants):
+    first = http.get('/cached', headers={'Accept-Encoding': 'gzip'})
+    second = http.get('/cached', headers={'Accept-Encoding': 'gzip'})
+
+    assert first.get_data() == second.get_data()
+    assert decode(second) == BODY
+    assert set(variants) == {'gzip'}
+    stats = compressor.stats()
+    assert (stats['variants_stored'], stats['variant_hits'], stats['compressed']) == (1, 1, 2)
+
+
+@needs_brotli
+def test_each_encoding_gets_its_own_cached_variant(http, compressor, variants):
+    for accept_encoding in ('gzip', 'br', 'gzip', 'br'):
+        response = http.get('/cached', headers={'Accept-Encoding': accept_encoding})
+        assert response.headers['Content-Encoding'] == accept_encoding
+        assert decode(response) == BODY
+
+    assert set(variants) == {'gzip', 'br'}
+    assert compressor.stats()['variants_stored'] == 2
+    assert compressor.stats()['variant_hits'] == 2
@@ -0,0 +1,78 @@
+"""Conditional GET (If-None-Match -> 304) on the tracking and catalog endpoints"""
+from datetime import datetime
+import pytest
+from app import db
+from app.models.shipment import Shipment
+from app.models.shipping_method import ShippingMethod
+from app.models.tracking_event import TrackingEvent
+from app.utils.cache import tracking_cache
+
+
+@pytest.fixture
+def tracking_number(app):
+    with app.app_context():
+        method = ShippingMethod(name='Express', type='air', rate_type='per_kg', base_rate=12)
+        db.session.add(method)
+        db.session.flush()
+        shipment = Shipment(tracking_number='CG0000000001', shipping_method_id=method.id, current_status='pending')
+        db.session.add(shipment)
+        db.session.commit()
+        yield shipment.tracking_number
+        db.session.delete(shipment)
+        db.session.delete(method)
+        db.session.commit()
+    tracking_cache.local.clear()
+
+
+def add_event(app, tracking_number):
+    with app.app_context():
+        shipment = Shipment.query.filter_by(tracking_number=tracking_number).one()
+        db.session.add(TrackingEvent(shipment_id=shipment.id, event_type='In transit', location='Hub',
+                                     event_time=datetime.utcnow()))
+        db.session.commit()
+    tracking_cache.invalidate(tracking_number)
+
+
+def test_tracking_matching_etag_is_not_modified(client, tracking_number):
+    response = client.get(f'/api/tracking/{tracking_number}')
+    etag = response.headers['ETag']
+    assert response.status_code == 200 and etag
+
+    cached = client.get(f'/api/tracking/{tracking_number}', headers={'If-None-Match': etag})
+    tracking_cache.local.clear()
+    uncached = client.get(f'/api/tracking/{tracking_number}', headers={'If-None-Match': etag})
+
+    for response in (cached, uncached):
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        assert response.get_data() == b''
+
+
+def test_tracking_etag_changes_with_a_new_event(app, client, tracking_number):
+    etag = client.get(f'/api/tracking/{tracking_number}').headers['ETag']
+
+    add_event(app, tracking_number)
+    response = client.get(f'/api/tracking/{tracking_number}', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert len(response.get_json()['shipment']['tracking_events']) == 1
+
+
+def test_sparse_tracking_etag_depends_on_the_fields(client, tracking_number):
+    full = client.get(f'/api/tracking/{tracking_number}').headers['ETag']
+    sparse = client.get(f'/api/tracking/{tracking_number}?fields=current_status')
+    assert sparse.status_code == 200 and sparse.headers['ETag'] != full
+
+    response = client.get(f'/api/tracking/{tracking_number}?fields=current_status',
+                          headers={'If-None-Match': sparse.headers['ETag']})
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize('path', ['/api/shipping-methods/', '/api/warehouses/'])
+def test_catalog_matching_etag_is_not_modified(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+
+    response = client.get(path, headers={'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
@@ -0,0 +1,103 @@
+"""Sparse fieldsets (?fields=) on shipments, tracking and warehouses"""
+import pytest
+from app import db
+from app.models.shipment import Shipment
+from app.models.shipping_method import ShippingMethod
+from app.models.tracking_event import TrackingEvent
+from app.models.warehouse import Warehouse
+
+
+@pytest.fixture(scope='module', autouse=True)
+def records(app):
+    with app.app_context():
+        method = ShippingMethod(name='Fieldset Air', type='air', rate_type='per_kg', base_rate='7.50')
+        db.session.add(method)
+        db.session.flush()
+        for tracking_number in ('FS0000000001', 'FS0000000002', 'FS0000000003'):
+            shipment = Shipment(tracking_number=tracking_number, shipping_method_id=method.id,
+                                description='Spare parts', current_status='in_transit', actual_weight='4.20')
+            db.session.add(shipment)
+            db.session.flush()
+            db.session.add(TrackingEvent(shipment_id=shipment.id, event_type='in_transit', location='Guangzhou'))
+        db.session.add(Warehouse(name='Fieldset Depot', type='warehouse', country='Fieldland',
+                                 address_en='1 Sparse Road', shipping_method_types='air,sea'))
+        db.session.commit()
+
+
+@pytest.fixture
+def admin_headers(make_user, login):
+    _, email, password = make_user(role='admin')
+    return login(email, password)
+
+
+def full_shipment(app, tracking_number):
+    with app.app_context():
+        return Shipment.query.filter_by(tracking_number=tracking_number).one().to_dict()
+
+
+def test_tracking_fields_select_only_their_columns(app, client, queries):
+    response = client.get('/api/tracking/FS0000000001?fields=tracking_number,current_status,tracking_events')
+    selects = [q for q in queries if q.lstrip().startswith('SELECT') and 'FROM shipments' in q]
+
+    assert response.status_code == 200
+    shipment = response.get_json()['shipment']
+    expected = full_shipment(app, 'FS0000000001')
+    assert shipment == {field: expected[field] for field in ('tracking_number', 'current_status', 'tracking_events')}
+    assert selects and not any('shipments.description' in q for q in selects)
+
+
+def test_tracking_fields_trim_a_cached_payload(client):
+    full = client.get('/api/tracking/FS0000000002')
+    assert full.status_code == 200
+
+    response = client.get('/api/tracking/FS0000000002?fields=destination,shipping_method')
+
+    assert response.status_code == 200
+    shipment = full.get_json()['shipment']
+    assert response.get_json()['shipment'] == {'destination': shipment['destination'],
+                                               'shipping_method': shipment['shipping_method']}
+    assert response.headers['ETag'] != full.headers['ETag']
+
+
+def test_batch_tracking_applies_fields_to_every_shipment(client):
+    response = client.post('/api/tracking/batch?fields=tracking_number,actual_weight',
+                           json={'tracking_numbers': ['FS0000000002', 'fs0000000003']})
+
+    assert response.status_code == 200
+    assert response.get_json()['found'] == {
+        'FS0000000002': {'tracking_number': 'FS0000000002', 'actual_weight': 4.2},
+        'FS0000000003': {'tracking_number': 'FS0000000003', 'actual_weight': 4.2}
+    }
+
+
+def test_admin_shipment_list_fields(client, admin_headers):
+    response = client.get('/api/admin/shipments?per_page=100&fields=tracking_number', headers=admin_headers)
+
+    assert response.status_code == 200
+    shipments = response.get_json()['shipments']
+    assert shipments and all(set(s) == {'tracking_number'} for s in shipments)
+
+
+def test_warehouse_directory_fields(client):
+    response = client.get('/api/warehouses/?country=Fieldland&fields=name,shipping_method_types')
+
+    assert response.status_code == 200
+    assert response.get_json()['warehouses'] == [{'name': 'Fieldset Depot', 'shipping_method_types': ['air', 'sea']}]
+
+
+@pytest.mark.parametrize('url', [
+    '/api/tracking/FS0000000001?fields=tracking_number,password_hash',
+    '/api/warehouses/?fields=name,password_hash',
+])
+def test_unknown_fields_are_rejected(client, url):
+    response = client.get(url)
+
+    assert response.status_code == 400
+    assert 'password_hash' in response.get_json()['fields']['fields']
+
+
+def test_unknown_admin_fields_are_rejected(client, admin_headers):
+    response = client.get('/api/admin/shipments?fields=password_hash', headers=admin_headers)
+
+    assert response.status_code == 400
+    assert 'password_hash' in response.get_json()['fields']['fields']
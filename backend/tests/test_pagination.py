@@ -0,0 +1,50 @@
+"""Keyset pagination over shipments ordered by (created_at, id)"""
+from datetime import datetime
+from sqlalchemy import insert
+from app import db
+from app.models.shipment import Shipment
+from app.models.shipping_method import ShippingMethod
+from app.utils.pagination import keyset_page
+
+
+def test_created_at_is_filled_when_an_insert_omits_it(app):
+    with app.app_context():
+        method = ShippingMethod(name='Sea', type='sea', rate_type='per_cbm', base_rate=10)
+        db.session.add(method)
+        db.session.flush()
+        shipment_id = db.session.execute(
+            db.text("INSERT INTO shipments (tracking_number, shipping_method_id, current_status) "
+                    "VALUES ('PGNULL0001', :method, 'pending') RETURNING id"),
+            {'method': method.id}
+        ).scalar()
+        created_at = db.session.get(Shipment, shipment_id).created_at
+        db.session.rollback()
+    assert created_at is not None
+
+
+def test_pages_walk_forward_and_back_across_equal_timestamps(app):
+    now = datetime.utcnow()
+    with app.app_context():
+        method = ShippingMethod(name='Rail', type='rail', rate_type='per_kg', base_rate=10)
+        db.session.add(method)
+        db.session.flush()
+        ids = db.session.scalars(insert(Shipment).returning(Shipment.id, sort_by_parameter_order=True), [
+            {'tracking_number': f'PG{i:08d}', 'shipping_method_id': method.id, 'current_status': 'pending',
+             'created_at': now}
+            for i in range(7)
+        ]).all()
+        query = Shipment.query.filter(Shipment.shipping_method_id == method.id)
+
+        pages, cursor = [], None
+        while True:
+            items, next_cursor, prev_cursor = keyset_page(query, Shipment, 3, cursor)
+            pages.append(([s.id for s in items], prev_cursor))
+            if next_cursor is None:
+                break
+            cursor = next_cursor
+
+        back = [s.id for s in keyset_page(query, Shipment, 3, pages[-1][1])[0]]
+        db.session.rollback()
+
+    assert [row_id for page, _ in pages for row_id in page] == sorted(ids, reverse=True)
+    assert back == pages[-2][0]
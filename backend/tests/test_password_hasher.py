@@ -0,0 +1,38 @@
+import os
+import signal
+import bcrypt
+from app.utils.password_hasher import password_hasher
+
+
+def test_needs_rehash_only_upgrades(monkeypatch):
+    monkeypatch.setattr(password_hasher, 'rounds', 5)
+    lower = bcrypt.hashpw(b'secret', bcrypt.gensalt(4)).decode('utf-8')
+    higher = bcrypt.hashpw(b'secret', bcrypt.gensalt(6)).decode('utf-8')
+
+    assert password_hasher.needs_rehash(lower)
+    assert not password_hasher.needs_rehash(higher)
+
+
+def test_slow_hash_returns_503(client, monkeypatch):
+    monkeypatch.setattr(password_hasher, 'rounds', 12)
+    monkeypatch.setattr(password_hasher, 'timeout', 0.01)
+
+    response = client.post('/api/auth/register', json={'email': 'slow@example.com', 'password': 'Password123',
+                                                       'full_name': 'Slow Hash'})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After']
+
+
+def test_broken_pool_returns_503_and_recovers(client, make_user):
+    _, email, password = make_user()
+    assert client.post('/api/auth/login', json={'email': email, 'password': password}).status_code == 200
+
+    for pid in list(password_hasher._executor._processes):
+        os.kill(pid, signal.SIGKILL)
+    response = client.post('/api/auth/login', json={'email': email, 'password': password})
+    assert response.status_code == 503
+    assert response.headers['Retry-After']
+
+    response = client.post('/api/auth/login', json={'email': email, 'password': password})
+    assert response.status_code == 200
@@ -0,0 +1,101 @@
+"""
+Query-count regressions for the shipment list and tracking endpoints
+
+Each endpoint must run the same number of statements however many rows
+and tracking events it returns: related rows come from the eager-loading
+profiles in app.models.profiles, never from one lazy load per row.
+"""
+import itertools
+from datetime import datetime
+import pytest
+from sqlalchemy import insert
+from app import db
+from app.models.shipment import Shipment
+from app.models.shipping_method import ShippingMethod
+from app.models.tracking_event import TrackingEvent
+from app.utils.cache import tracking_cache
+
+_numbers = itertools.count(1)
+
+
+@pytest.fixture(scope='module')
+def method_id(app):
+    with app.app_context():
+        method = ShippingMethod(name='Air', type='air', rate_type='per_kg', base_rate=10)
+        db.session.add(method)
+        db.session.commit()
+        return method.id
+
+
+@pytest.fixture
+def make_shipments(app, method_id):
+    """Create shipments with the given number of tracking events each; return their tracking numbers"""
+    def make(count, events=3):
+        now = datetime.utcnow()
+        with app.app_context():
+            numbers = [f'QC{next(_numbers):08d}' for _ in range(count)]
+            ids = db.session.scalars(insert(Shipment).returning(Shipment.id, sort_by_parameter_order=True), [
+                {'tracking_number': number, 'shipping_method_id': method_id, 'current_status': 'pending',
+                 'actual_weight': 5, 'volume_cbm': 0.1, 'created_at': now, 'updated_at': now}
+                for number in numbers
+            ]).all()
+            db.session.execute(insert(TrackingEvent), [
+                {'shipment_id': shipment_id, 'event_type': 'In transit', 'location': f'Hub {i}', 'event_time': now}
+                for shipment_id in ids for i in range(events)
+            ])
+            db.session.commit()
+        return numbers
+    return make
+
+
+@pytest.fixture
+def admin_headers(client, make_user, login):
+    _, email, password = make_user(role='admin')
+    headers = login(email, password)
+    # Load the admin's auth state so the measured requests only count the endpoint's own queries
+    assert client.get('/api/admin/cache/stats', headers=headers).status_code == 200
+    return headers
+
+
+@pytest.fixture(autouse=True)
+def no_tracking_cache(monkeypatch):
+    monkeypatch.setattr(tracking_cache, 'enabled', False)
+
+
+def count(queries, request):
+    """Number of statements the request runs once the per-worker catalogs are loaded"""
+    assert request().status_code == 200
+    queries.clear()
+    response = request()
+    assert response.status_code == 200, response.get_json()
+    return len(queries)
+
+
+def test_shipment_list_query_count_is_constant(client, make_shipments, admin_headers, queries):
+    make_shipments(2)
+    small = count(queries, lambda: client.get('/api/admin/shipments?per_page=2', headers=admin_headers))
+    make_shipments(20)
+    large = count(queries, lambda: client.get('/api/admin/shipments?per_page=20', headers=admin_headers))
+
+    assert small == large
+    assert large <= 2
+
+
+def test_tracking_detail_query_count_is_constant(client, make_shipments, queries):
+    few, = make_shipments(1, events=1)
+    many, = make_shipments(1, events=25)
+
+    small = count(queries, lambda: client.get(f'/api/tracking/{few}'))
+    large = count(queries, lambda: client.get(f'/api/tracking/{many}'))
+
+    assert small == large
+    assert large <= 3
+
+
+def test_tracking_batch_query_count_is_constant(client, make_shipments, queries):
+    two, ten = make_shipments(2), make_shipments(10)
+    small = count(queries, lambda: client.post('/api/tracking/batch', json={'tracking_numbers': two}))
+    large = count(queries, lambda: client.post('/api/tracking/batch', json={'tracking_numbers': ten}))
+
+    assert small == large
+    assert large <= 2
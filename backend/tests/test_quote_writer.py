@@ -0,0 +1,111 @@
+"""Write-behind quote persistence, driven through submit(), flush() and shutdown()"""
+import atexit
+import threading
+from datetime import date, timedelta
+import pytest
+from flask import Flask
+from app import db
+from app.models.quote import Quote
+from app.utils.quote_writer import QuoteWriter
+
+
+def writer_threads():
+    return sum(thread.name == 'quote-writer' and thread.is_alive() for thread in threading.enumerate())
+
+
+@pytest.fixture
+def writer_app(app):
+    """A bare app on the test database with its own QuoteWriter, so the app's writer is left alone"""
+    writer_app = Flask(__name__)
+    writer_app.config.update(app.config, QUOTE_SWEEP_INTERVAL=3600)
+    db.init_app(writer_app)
+    return writer_app
+
+
+@pytest.fixture
+def writer(writer_app):
+    writer = QuoteWriter(writer_app)
+    yield writer
+    writer.shutdown()
+
+
+def quote_row(number, **values):
+    return dict({'quote_number': number, 'actual_weight': 10, 'volume_cbm': 0.1, 'status': 'draft'}, **values)
+
+
+def saved(app, prefix):
+    with app.app_context():
+        return sorted(db.session.scalars(db.select(Quote.quote_number).where(Quote.quote_number.like(f'{prefix}%'))))
+
+
+def test_building_the_app_does_not_start_the_thread(writer_app):
+    running = writer_threads()
+    writer = QuoteWriter(writer_app)
+    assert writer_threads() == running
+
+    writer.submit(quote_row('QT-S1'))
+    assert writer_threads() == running + 1
+    writer.shutdown()
+
+
+def test_first_request_starts_the_thread(writer, writer_app):
+    running = writer_threads()
+    writer_app.test_client().get('/')
+    assert writer_threads() == running + 1
+
+
+def test_submitted_quotes_are_written_by_shutdown(app, writer):
+    for number in ('QT-A1', 'QT-A2', 'QT-A3'):
+        writer.submit(quote_row(number))
+
+    writer.shutdown()
+
+    assert saved(app, 'QT-A') == ['QT-A1', 'QT-A2', 'QT-A3']
+    assert writer.stats()['queued'] == 0
+    assert writer.stats()['written'] == 3
+
+
+def test_flush_empties_the_queue(app, writer):
+    for i in range(50):
+        writer.submit(quote_row(f'QT-F{i:02d}'))
+
+    writer.flush()
+    assert writer.stats()['queued'] == 0
+
+    writer.shutdown()
+    assert len(saved(app, 'QT-F')) == 50
+
+
+def test_failed_batch_keeps_the_good_rows(app, writer):
+    for number in ('QT-W1', 'QT-W2', 'QT-W1', 'QT-W3'):
+        writer.submit(quote_row(number))
+
+    writer.shutdown()
+
+    assert saved(app, 'QT-W') == ['QT-W1', 'QT-W2', 'QT-W3']
+    assert writer.stats()['failed'] == 1
+    assert writer.stats()['written'] == 3
+
+
+def test_first_sweep_waits_one_interval(app, writer):
+    with app.app_context():
+        db.session.add(Quote(quote_number='QT-E1', status='draft', valid_until=date.today() - timedelta(days=1)))
+        db.session.commit()
+
+    writer.submit(quote_row('QT-E2'))
+    writer.shutdown()
+
+    with app.app_context():
+        assert db.session.scalar(db.select(Quote.status).where(Quote.quote_number == 'QT-E1')) == 'draft'
+    assert writer.stats()['expired'] == 0
+
+
+def test_exit_hook_is_registered_once(writer, monkeypatch):
+    hooks = []
+    monkeypatch.setattr(atexit, 'register', hooks.append)
+
+    writer.submit(quote_row('QT-R1'))
+    writer.shutdown()
+    writer.submit(quote_row('QT-R2'))
+
+    assert hooks == [writer.shutdown]
@@ -0,0 +1,47 @@
+"""Login throttling through LoginRateLimiter.check() and the login endpoint"""
+import itertools
+from flask import Flask
+from app.utils.rate_limit import LoginRateLimiter
+
+_addresses = itertools.count(1)
+
+
+def make_limiter(**config):
+    app = Flask(__name__)
+    app.config.update(config)
+    return LoginRateLimiter(app)
+
+
+def test_flooding_new_keys_does_not_reset_a_throttled_bucket():
+    limiter = make_limiter(LOGIN_RATE_LIMIT_MAX_KEYS=50, LOGIN_EMAIL_BURST=5, LOGIN_EMAIL_PER_MINUTE=2)
+    for i in range(5):
+        assert limiter.check(f'10.0.0.{i}', 'victim@example.com') == 0
+    assert limiter.check('10.0.0.9', 'victim@example.com') > 0
+
+    for i in range(1000):
+        limiter.check(f'10.1.{i // 250}.{i % 250}', f'flood-{i}@example.com')
+
+    assert len(limiter.buckets) <= 50
+    assert limiter.check('10.0.0.10', 'victim@example.com') > 0
+
+
+def test_ip_bucket_is_shared_by_every_email_from_that_address():
+    limiter = make_limiter(LOGIN_IP_BURST=3, LOGIN_IP_PER_MINUTE=1)
+    assert [limiter.check('10.2.0.1', f'user{i}@example.com') for i in range(3)] == [0, 0, 0]
+    assert limiter.check('10.2.0.1', 'other@example.com') > 0
+    assert limiter.check('10.2.0.2', 'other@example.com') == 0
+    assert limiter.stats()['rejected'] == 1
+
+
+def failed_login(client, forwarded_for):
+    return client.post('/api/auth/login', headers={'X-Forwarded-For': forwarded_for},
+                       json={'email': f'nobody{next(_addresses)}@example.com', 'password': 'wrong'})
+
+
+def test_clients_behind_the_proxy_get_their_own_ip_bucket(client):
+    # TestingConfig trusts one proxy, so the forwarded address is the client's
+    statuses = [failed_login(client, '203.0.113.7').status_code for _ in range(21)]
+    assert statuses[:20] == [401] * 20
+    assert statuses[20] == 429
+
+    assert failed_login(client, '203.0.113.8').status_code == 401
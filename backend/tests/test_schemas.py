@@ -0,0 +1,37 @@
+import pytest
+from app.utils.schemas import Schema, Integer, ValidationError
+
+
+class CountSchema(Schema):
+    count = Integer(minimum=0)
+
+
+@pytest.mark.parametrize('value, expected', [(5, 5), ('5', 5), (' +7 ', 7), (3.0, 3), ('0', 0)])
+def test_integer_accepts(value, expected):
+    assert CountSchema.load({'count': value}) == {'count': expected}
+
+
+@pytest.mark.parametrize('value, message', [
+    ('--5', 'must be an integer'),
+    ('1_000', 'must be an integer'),
+    ('٣', 'must be an integer'),
+    ('1.5', 'must be an integer'),
+    (True, 'must be an integer'),
+    ('-1', 'must be at least 0'),
+    (2 ** 31, 'is out of range'),
+])
+def test_integer_rejects_with_a_field_message(value, message):
+    with pytest.raises(ValidationError) as error:
+        CountSchema.load({'count': value})
+    assert error.value.errors == {'count': message}
+
+
+def test_responses_are_indented_in_debug_mode_only(app):
+    with app.test_request_context():
+        app.debug = True
+        assert b'\n  ' in app.json.response({'a': 1}).get_data()
+        app.debug = False
+        try:
+            assert app.json.response({'a': 1}).get_data() == b'{"a":1}'
+        finally:
+            app.debug = True
@@ -0,0 +1,48 @@
+"""Shipment export encodes rows the same way as the API"""
+import pytest
+from app import db
+from app.models.shipment import Shipment
+from app.models.shipping_method import ShippingMethod
+
+
+@pytest.fixture
+def admin_headers(make_user, login):
+    _, email, password = make_user(role='admin')
+    return login(email, password)
+
+
+@pytest.fixture(scope='module')
+def method_id(app):
+    with app.app_context():
+        method = ShippingMethod(name='Export Sea', type='sea', rate_type='per_cbm', base_rate='85.50')
+        db.session.add(method)
+        db.session.flush()
+        db.session.add_all([
+            Shipment(tracking_number='EX0000000001', shipping_method_id=method.id, description='广州 to Nairobi',
+                     actual_weight='12.50', volume_cbm='0.125', total_cost='10.69'),
+            Shipment(tracking_number='EX0000000002', shipping_method_id=method.id, current_status='delivered')
+        ])
+        db.session.commit()
+        return method.id
+
+
+def test_ndjson_rows_match_the_api_encoding(app, client, admin_headers, method_id):
+    response = client.get(f'/api/admin/shipments/export?format=ndjson&shipping_method_id={method_id}',
+                          headers=admin_headers)
+
+    assert response.status_code == 200
+    lines = response.get_data().splitlines()
+    with app.app_context():
+        shipments = Shipment.query.filter_by(shipping_method_id=method_id).order_by(Shipment.id)
+        assert lines == [app.json.dumps_bytes(s.to_dict(include_events=False)) for s in shipments]
+    assert '广州'.encode('utf-8') in lines[0]
+
+
+def test_csv_events_column_uses_the_api_encoding(app, client, admin_headers, method_id):
+    response = client.get(f'/api/admin/shipments/export?format=csv&include_events=true'
+                          f'&shipping_method_id={method_id}', headers=admin_headers)
+
+    assert response.status_code == 200
+    header, first = response.get_data(as_text=True).splitlines()[:2]
+    assert header.endswith(',tracking_events')
+    assert first.endswith(',[]')
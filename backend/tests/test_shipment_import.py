@@ -0,0 +1,67 @@
+"""Bulk shipment import: bad rows are reported without failing the rest of the batch"""
+import json
+import pytest
+from app import db
+from app.models.shipment import Shipment
+from app.models.shipping_method import ShippingMethod
+
+
+@pytest.fixture
+def admin_headers(make_user, login):
+    _, email, password = make_user(role='admin')
+    return login(email, password)
+
+
+@pytest.fixture
+def method_ids(app, client):
+    """Two shipping methods in the catalog; the second is then deleted behind the catalog's back"""
+    with app.app_context():
+        kept = ShippingMethod(name='Import Air', type='air', rate_type='per_kg', base_rate=10)
+        gone = ShippingMethod(name='Import Sea', type='sea', rate_type='per_cbm', base_rate=10)
+        db.session.add_all([kept, gone])
+        db.session.commit()
+        ids = kept.id, gone.id
+    assert client.get('/api/shipping-methods/').status_code == 200
+    with app.app_context():
+        # Raw SQL skips the catalog version bump, so the import still accepts the id and the insert fails
+        db.session.execute(db.text('DELETE FROM shipping_methods WHERE id = :id'), {'id': ids[1]})
+        db.session.commit()
+    return ids
+
+
+def post_rows(client, headers, lines):
+    body = '\n'.join(line if isinstance(line, str) else json.dumps(line) for line in lines)
+    return client.post('/api/admin/shipments/bulk', data=body, headers=headers,
+                       content_type='application/x-ndjson')
+
+
+def test_invalid_and_rejected_rows_do_not_fail_the_batch(app, client, admin_headers, method_ids, monkeypatch):
+    kept, gone = method_ids
+    monkeypatch.setitem(app.config, 'BULK_CHUNK_SIZE', 10)
+    response = post_rows(client, admin_headers, [
+        {'shipping_method_id': kept, 'actual_weight': 12.5, 'origin': 'Guangzhou'},
+        {'shipping_method_id': kept, 'actual_weight': 'heavy'},
+        'not json',
+        {'shipping_method_id': gone, 'actual_weight': 3},
+        {'shipping_method_id': kept, 'volume_cbm': '0.25', 'cartons': 2},
+    ])
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert (data['created'], data['failed']) == (2, 3)
+    results = {result['row']: result for result in data['results']}
+    assert [results[row]['status'] for row in range(1, 6)] == ['created', 'error', 'error', 'error', 'created']
+    assert results[2]['error'].startswith('actual_weight ')
+    assert results[3]['error'] == 'Invalid JSON'
+    assert results[4]['error'] == 'Rejected by a database constraint'
+
+    with app.app_context():
+        stored = {s.tracking_number: s for s in Shipment.query.filter_by(shipping_method_id=kept)}
+        assert set(stored) == {results[1]['tracking_number'], results[5]['tracking_number']}
+        assert stored[results[1]['tracking_number']].tracking_events[0].event_type == 'Shipment Created'
+
+
+def test_unknown_shipping_method_is_a_row_error(client, admin_headers, method_ids):
+    response = post_rows(client, admin_headers, [{'shipping_method_id': 0, 'actual_weight': 1}])
+
+    assert response.get_json()['results'] == [{'row': 1, 'status': 'error', 'error': 'Invalid shipping method'}]
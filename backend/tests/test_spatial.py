@@ -0,0 +1,73 @@
+"""Nearest-warehouse search agrees with a brute-force great-circle scan"""
+import math
+import random
+import pytest
+from app import db
+from app.models.warehouse import Warehouse
+from app.utils.spatial import KDTree, chord_to_km, to_unit_vectors
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0088 * math.asin(min(1.0, math.sqrt(a)))
+
+
+def random_point(rng):
+    # Mix in points on the poles and the antimeridian, where lat/lon boxes break down
+    latitude = rng.choice([rng.uniform(-90, 90), rng.uniform(-90, 90), rng.choice([-90.0, 90.0])])
+    longitude = rng.choice([rng.uniform(-180, 180), rng.uniform(-180, 180), rng.choice([-180.0, 180.0])])
+    return round(latitude, 6), round(longitude, 6)
+
+
+def brute_force(points, latitude, longitude, k):
+    distances = sorted(haversine_km(latitude, longitude, lat, lon) for lat, lon in points)
+    return distances[:k]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_kd_tree_matches_brute_force(seed):
+    rng = random.Random(seed)
+    points = [random_point(rng) for _ in range(rng.randint(1, 400))]
+    tree = KDTree(to_unit_vectors(*zip(*points)), leaf_size=rng.choice([1, 4, 16]))
+
+    for _ in range(25):
+        latitude, longitude = random_point(rng)
+        k = rng.randint(1, 12)
+        results = tree.query(to_unit_vectors([latitude], [longitude])[0], k)
+
+        expected = brute_force(points, latitude, longitude, k)
+        assert len(results) == len(expected)
+        for (chord, index), distance in zip(results, expected):
+            assert float(chord_to_km(chord)) == pytest.approx(distance, abs=1e-6)
+            assert haversine_km(latitude, longitude, *points[index]) == pytest.approx(distance, abs=1e-6)
+
+
+def test_empty_tree_returns_nothing():
+    assert KDTree(to_unit_vectors([], [])).query([1.0, 0.0, 0.0], 3) == []
+
+
+@pytest.fixture(scope='module')
+def located_warehouses(app):
+    rng = random.Random(7)
+    points = [random_point(rng) for _ in range(60)]
+    with app.app_context():
+        warehouses = [Warehouse(name=f'Depot {i}', type='kd_depot', latitude=lat, longitude=lon)
+                      for i, (lat, lon) in enumerate(points)]
+        db.session.add_all(warehouses)
+        db.session.add(Warehouse(name='Unlocated depot', type='kd_depot'))
+        db.session.commit()
+        return {w.id: (float(w.latitude), float(w.longitude)) for w in warehouses}
+
+
+@pytest.mark.parametrize('latitude, longitude', [(0, 0), (22.3, 114.2), (-1.29, 36.82), (89.9, -179.9), (-60, 180)])
+def test_nearest_endpoint_matches_brute_force(client, located_warehouses, latitude, longitude):
+    response = client.get(f'/api/warehouses/nearest?lat={latitude}&lon={longitude}&k=5&type=kd_depot')
+
+    assert response.status_code == 200
+    results = response.get_json()['warehouses']
+    expected = brute_force(located_warehouses.values(), latitude, longitude, 5)
+    assert [r['distance_km'] for r in results] == pytest.approx(expected, abs=1e-3)
+    for result in results:
+        assert haversine_km(latitude, longitude, *located_warehouses[result['id']]) == \
+            pytest.approx(result['distance_km'], abs=1e-3)
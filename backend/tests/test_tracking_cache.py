@@ -0,0 +1,54 @@
+"""Tracking cache invalidation across workers sharing one backend"""
+from app.utils.cache import TrackingCache, MemoryBackend, CachedPayload
+
+
+def make_worker(backend):
+    """A worker's TrackingCache that checks the shared generation on every lookup"""
+    cache = TrackingCache()
+    cache.backend = backend
+    cache.sync_interval = 0
+    return cache
+
+
+def test_invalidation_on_one_worker_clears_the_others():
+    backend = MemoryBackend()
+    first, second = make_worker(backend), make_worker(backend)
+    first.set('RD0000000001', CachedPayload(b'{"status":"pending"}', etag='"a"'))
+    assert second.get('RD0000000001').body == b'{"status":"pending"}'
+
+    first.invalidate('RD0000000001')
+
+    assert second.get('RD0000000001') is None
+    assert first.get('RD0000000001') is None
+    assert second.stats()['remote_invalidations'] == 1
+
+
+def test_invalidation_clears_every_local_entry_of_the_other_workers():
+    backend = MemoryBackend()
+    first, second = make_worker(backend), make_worker(backend)
+    second.local.set('RD0000000002', CachedPayload(b'{}'))
+
+    first.invalidate('RD0000000003')
+
+    assert second.get('RD0000000002') is None
+
+
+def test_payload_read_before_an_invalidation_is_not_stored():
+    backend = MemoryBackend()
+    first, second = make_worker(backend), make_worker(backend)
+    generation = second.generation()
+
+    first.invalidate('RD0000000004')
+    second.set('RD0000000004', CachedPayload(b'{"status":"pending"}'), generation)
+
+    assert second.get('RD0000000004') is None
+    assert first.get('RD0000000004') is None
+    assert second.stats()['stale_writes'] == 1
+
+
+def test_without_a_backend_invalidation_still_rejects_stale_writes():
+    cache = TrackingCache()
+    generation = cache.generation()
+    cache.invalidate('RD0000000005')
+    cache.set('RD0000000005', CachedPayload(b'{}'), generation)
+    assert cache.get('RD0000000005') is None
@@ -0,0 +1,49 @@
+import random
+from decimal import Decimal
+import pytest
+from app.utils.pricing import RateTable
+from app.utils.vector_pricing import price_parcels
+
+
+def cents(value):
+    return -1 if value is None else int(value.scaleb(2))
+
+
+def random_amount(rng, high, places):
+    return Decimal(rng.randint(0, high * 10 ** places)).scaleb(-places)
+
+
+def random_table(rng):
+    rate_type = rng.choice(['per_kg', 'per_kg', 'per_cbm', 'per_cbm', 'flat'])
+    high = 500 if rate_type == 'per_kg' else 5
+    tiers = [(random_amount(rng, high, 3), random_amount(rng, 50, 2)) for _ in range(rng.randint(0, 4))]
+    return RateTable(
+        rate_type,
+        rng.choice([None, random_amount(rng, 50, 2)]),
+        tiers,
+        minimum_charge=rng.choice([None, random_amount(rng, 200, 2)]),
+        surcharge_percent=rng.choice([None, random_amount(rng, 30, 2)])
+    )
+
+
+def random_parcel(rng):
+    actual_weight = rng.choice([None, 0, random_amount(rng, 2000, 2), rng.uniform(0, 2000)])
+    volume_cbm = rng.choice([None, 0, random_amount(rng, 10, 3), rng.uniform(0, 10)])
+    return actual_weight, volume_cbm
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_vector_pricing_matches_rate_table(seed):
+    rng = random.Random(seed)
+    tables = [random_table(rng) for _ in range(6)]
+    parcels = [random_parcel(rng) for _ in range(200)]
+
+    chargeable, totals, rates = price_parcels(parcels, tables)
+
+    for i, parcel in enumerate(parcels):
+        for j, table in enumerate(tables):
+            expected = table.price(*parcel)
+            assert chargeable[i] == cents(expected.chargeable_weight), (parcel, table.rate_type)
+            assert totals[i, j] == cents(expected.total_cost), (parcel, table.rate_type)
+            if expected.total_cost is not None:
+                assert rates[i, j] == cents(expected.rate), (parcel, table.rate_type)